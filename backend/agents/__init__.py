@@ -1,4 +1,4 @@
 from agents.agents import build_graph, process_candidate_answer
-from agents.functions import generate_coaching_summary, generate_first_question, judge_step
+from agents.functions import generate_coaching_summary, generate_first_question, generate_question, judge_step
 
-__all__ = ["build_graph", "generate_coaching_summary", "generate_first_question", "judge_step", "process_candidate_answer"]
\ No newline at end of file
+__all__ = ["build_graph", "generate_coaching_summary", "generate_first_question", "generate_question", "judge_step", "process_candidate_answer"]
\ No newline at end of file
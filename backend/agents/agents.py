@@ -1,43 +1,403 @@
-from langgraph.graph import StateGraph, END
-from typing import TypedDict, List, Dict, Any, Union, Literal
-from openai import OpenAI
-from .prompts import get_interviewee_prompt, get_interviewer_system_prompt, get_judge_user_and_interviewer_prompt, get_interview_couch_user_prompt
+from typing import TypedDict, List, Dict, Any, Callable, Iterator, Union, Literal, Optional, Sequence, Tuple, TYPE_CHECKING
+from .turn_log import TurnLog
+from . import scheduler
+from .prompts import get_interviewee_prompt, topic_for_round, get_interviewer_system_prompt, get_judge_system_prompt, get_judge_user_and_interviewer_prompt, get_interview_couch_user_prompt, get_key_points_messages, condensed_answer, count_tokens, split_text, truncate_text
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import contextvars
+import hashlib
 import os
-from groq import Groq
+import re
+import threading
+import time
 import config
+import deadline
+import hedging
+import metrics
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from groq import Groq
 
 # ---- Client (Ollama OpenAI-compatible) ----
 INTERVIEW_MODEL = os.getenv("INTERVIEW_MODEL", "qwen2.5:7b-instruct")
 JUDGE_MODEL     = os.getenv("JUDGE_MODEL", "qwen2.5:7b-instruct")
 COACH_MODEL     = os.getenv("COACH_MODEL", JUDGE_MODEL)  # reuse judge by default
 
-# For local Ollama models
-client = OpenAI(
-    base_url=os.getenv("OLLAMA_HOST", "http://localhost:11434/v1"),
-    api_key=os.getenv("OLLAMA_KEY", "ola")
-)
+# ---- Judge cascade ----
+# A small model scores first; JUDGE_MODEL is only called when the small model's
+# line can't be parsed, its score is borderline, the answer is long/technical,
+# or the small model call fails (e.g. the model isn't pulled), so the fast
+# model is optional: /ready doesn't wait for it.
+# Set JUDGE_FAST_MODEL="" (or equal to JUDGE_MODEL) to always use JUDGE_MODEL.
+JUDGE_FAST_MODEL        = os.getenv("JUDGE_FAST_MODEL", "qwen2.5:1.5b-instruct")
+JUDGE_ESCALATE_WORDS    = int(os.getenv("JUDGE_ESCALATE_WORDS", "200"))
+JUDGE_BORDERLINE_SCORES = {int(s) for s in os.getenv("JUDGE_BORDERLINE_SCORES", "3").split(",") if s.strip()}
+
+# ---- Long answers ----
+# Answers over JUDGE_CHUNK_THRESHOLD_TOKENS skip the cascade: they are split
+# into chunks of JUDGE_CHUNK_TOKENS, each chunk is condensed to key points by
+# JUDGE_CHUNK_MODEL in parallel, and JUDGE_MODEL scores the condensed answer.
+# At most JUDGE_CHUNK_MAX chunks are used, so judge latency stays roughly flat
+# however long the candidate talks.
+JUDGE_CHUNK_MODEL = os.getenv("JUDGE_CHUNK_MODEL", JUDGE_FAST_MODEL or JUDGE_MODEL)
+
+# Clients are created on first use, once per process. Building them at import
+# time made startup fail on missing credentials and shared sockets with every
+# forked worker, so they are dropped in the child after a fork and rebuilt there.
+_client: Optional["OpenAI"] = None
+_groq_client: Optional["Groq"] = None
+_client_lock = threading.Lock()
+
+def get_client() -> "OpenAI":
+    """OpenAI-compatible client for local Ollama models."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from openai import OpenAI
+                _client = OpenAI(
+                    base_url=os.getenv("OLLAMA_HOST", "http://localhost:11434/v1"),
+                    api_key=os.getenv("OLLAMA_KEY", "ola")
+                )
+    return _client
+
+def get_groq_client() -> "Groq":
+    """Client for GROQ services like Whisper fast inference."""
+    global _groq_client
+    if _groq_client is None:
+        with _client_lock:
+            if _groq_client is None:
+                from groq import Groq
+                _groq_client = Groq(api_key=config.GROQ_KEY)
+    return _groq_client
 
-# For GROQ services like Whisper fast infererence
-groq_client = Groq(
-    api_key=config.GROQ_KEY
-)
+def _reset_clients_after_fork():
+    global _client, _groq_client, _client_lock
+    _client = None
+    _groq_client = None
+    _client_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_clients_after_fork)
 
 # ---- STATE ----
 class InterviewState(TypedDict):
     mode: Literal["technical", "behavioral"] # "technical" | "behavioral"
-    history: List[str]             # "Q: ..." / "A: ..." lines
-    questions: List[str]           # questions asked
+    log: TurnLog                   # questions, answers and judge lines (append-only, shared snapshots)
     round: int                     # 1-based round counter
     question: str                  # current question
+    topic: str                     # topic hint the current question was asked on
     candidate_answer: str          # latest answer
     ai_feedback: str               # interviewer feedback
     judge_score: float             # per-round score (float)
     judge_feedback: str            # per-round judge line
-    all_judge_lines: List[str]     # collected judge feedback across rounds
+    judge_path: str                # which judge cascade path produced the score
+    code_report: str               # result of running submitted code, "" if none
+
+def initial_state(mode: str, log: Optional[TurnLog] = None, round_num: int = 0) -> InterviewState:
+    """A fresh state; `log.history()`, `log.questions()` and `log.judge_lines()` are the list views."""
+    return {
+        "mode": mode,
+        "log": log if log is not None else TurnLog(),
+        "round": round_num,
+        "question": "",
+        "topic": "",
+        "candidate_answer": "",
+        "ai_feedback": "",
+        "judge_score": 0.0,
+        "judge_feedback": "",
+        "judge_path": "",
+        "code_report": "",
+    }
+
+
+
+# monotonic time of the last successful call per model; the keep-alive pinger reads it
+_model_last_used: Dict[str, float] = {}
+
+def model_last_used(model: str) -> Optional[float]:
+    return _model_last_used.get(model)
+
+def all_models() -> List[str]:
+    """Every distinct model the app calls, in a stable order."""
+    models = [INTERVIEW_MODEL, JUDGE_FAST_MODEL, JUDGE_MODEL, JUDGE_CHUNK_MODEL, COACH_MODEL]
+    return list(dict.fromkeys(m for m in models if m))
+
+def required_models() -> List[str]:
+    """The models turns can't do without; the fast judge and chunk model fall back to JUDGE_MODEL."""
+    return list(dict.fromkeys([INTERVIEW_MODEL, JUDGE_MODEL, COACH_MODEL]))
+
+def _fit_prompt_budget(messages: List[Dict[str, str]], budget: int) -> List[Dict[str, str]]:
+    """Deterministically shrink the last message so the whole prompt fits `budget` estimated tokens."""
+    total = sum(count_tokens(m["content"]) for m in messages)
+    if total <= budget:
+        return messages
+    last = messages[-1]
+    room = max(16, count_tokens(last["content"]) - (total - budget))
+    return messages[:-1] + [{**last, "content": truncate_text(last["content"], room)}]
+
+def request_options() -> Dict[str, Any]:
+    """Extra request fields for the local model server (keep the model and its cache resident)."""
+    return {"extra_body": {"keep_alive": config.LLM_KEEP_ALIVE}} if config.LLM_KEEP_ALIVE else {}
+
+# Token streaming: inside `with stream_tokens(sink):`, calls made with a
+# `stream_as` channel stream their completion and pass every text delta to
+# sink(channel, delta) as it arrives (the SSE routes forward them to the
+# browser). Calls without a channel, and every call outside the block, are
+# unchanged. The sink is a context variable, like the dispatch priority.
+_token_sink: contextvars.ContextVar[Optional[Callable[[str, str], None]]] = contextvars.ContextVar("token_sink", default=None)
+
+@contextmanager
+def stream_tokens(sink: Callable[[str, str], None]) -> Iterator[None]:
+    token = _token_sink.set(sink)
+    try:
+        yield
+    finally:
+        _token_sink.reset(token)
+
+def emit_tokens(channel: str, text: str):
+    """Pass text that didn't come from a streamed call (e.g. a cached or fast result) to the current sink."""
+    sink = _token_sink.get()
+    if sink is not None and text:
+        sink(channel, text)
+
+def _read_stream(chunks, channel: str, sink: Callable[[str, str], None]) -> Tuple[str, Any]:
+    """(text, usage) of a streamed completion, passing each delta to `sink` on the way."""
+    parts, usage = [], None
+    for chunk in chunks:
+        if getattr(chunk, "usage", None) is not None:
+            usage = chunk.usage
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            sink(channel, delta)
+    return "".join(parts), usage
+
+def chat_completion(model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int, timeout: float,
+                    purpose: str = "chat", stream_as: Optional[str] = None) -> str:
+    """Single chat completion against the local model server; returns the stripped text.
+
+    Enforces PROMPT_TOKEN_BUDGET and records estimated and server-reported
+    prompt/completion tokens per `purpose` (interviewer, judge, coach, ...).
+    Waits for a dispatcher slot at the caller's priority (agents/scheduler.py).
+    Under a request deadline (deadline.py) the queue wait and the call share the
+    remaining budget, and running out raises DeadlineExceeded. Calls for
+    HEDGE_LLM_PURPOSES are hedged when slow (hedging.py). With a `stream_as`
+    channel and a token sink set (stream_tokens), the completion is streamed
+    to the sink instead, and never hedged.
+    """
+    messages = _fit_prompt_budget(messages, config.PROMPT_TOKEN_BUDGET)
+    estimate = sum(count_tokens(m["content"]) for m in messages)
+    metrics.observe(f"llm.prompt_tokens_est.{purpose}", estimate)
+
+    client = get_client()
+    if deadline.active() and hasattr(client, "with_options"):
+        client = client.with_options(max_retries=0)  # a retry would run past the deadline
+    sink = _token_sink.get() if stream_as else None
+    stream = {"stream": True, "stream_options": {"include_usage": True}} if sink is not None else {}
+
+    def attempt():
+        return client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=deadline.timeout_for(purpose, timeout),
+            **stream,
+            **request_options()
+        )
+
+    cls = scheduler.current_priority()
+    with scheduler.dispatcher.slot(cls):
+        start = time.perf_counter()
+        try:
+            if sink is not None:
+                text, usage = _read_stream(attempt(), stream_as, sink)
+            elif purpose in config.HEDGE_LLM_PURPOSES:
+                # a hedge needs a free slot of its own; it never queues
+                resp = hedging.call(f"{purpose}.{model}", attempt,
+                                    acquire=lambda: scheduler.dispatcher.try_acquire(cls),
+                                    release=lambda: scheduler.dispatcher.release(cls))
+            else:
+                resp = attempt()
+            if sink is None:
+                text, usage = resp.choices[0].message.content or "", getattr(resp, "usage", None)
+        except Exception as e:
+            if deadline.expired():
+                raise deadline.DeadlineExceeded(purpose) from e
+            raise
+    metrics.observe(f"llm.latency.{model}", time.perf_counter() - start)
+    _model_last_used[model] = time.monotonic()
+
+    if usage is not None:
+        metrics.incr(f"llm.calls.{purpose}")
+        metrics.incr(f"llm.prompt_tokens.{purpose}", usage.prompt_tokens or 0)
+        metrics.incr(f"llm.completion_tokens.{purpose}", usage.completion_tokens or 0)
+        metrics.observe(f"llm.prompt_tokens.{purpose}", usage.prompt_tokens or 0)
+        metrics.observe(f"llm.completion_tokens.{purpose}", usage.completion_tokens or 0)
+    return text.strip()
 
+_SCORE_RE = re.compile(r"score\s*[:=]?\s*([1-5])", re.IGNORECASE)
+_TECHNICAL_RE = re.compile(r"```|\bdef\s+\w+\s*\(|\bclass\s+\w+|\breturn\b|[{};]|=>|\bO\([^)]*\)")
 
+def parse_judge_score(judge_eval: str) -> Optional[int]:
+    """Score from a "Score: <1-5>. Feedback: ..." line, falling back to the first digit 1-5."""
+    m = _SCORE_RE.search(judge_eval)
+    if m:
+        return int(m.group(1))
+    return next((int(c) for c in judge_eval if c in "12345"), None)
 
+def _pre_escalation_reason(mode: str, answer: str) -> Optional[str]:
+    if len(answer.split()) > JUDGE_ESCALATE_WORDS:
+        return "long_answer"
+    if mode == "technical" and _TECHNICAL_RE.search(answer):
+        return "technical"
+    return None
 
+def judge_answer(mode: str, question: str, answer: str, ai_feedback: str, code_report: str = ""):
+    """Score one answer through the fast-model cascade. `code_report` is the
+    one-line result of running the candidate's code, if any (services.code_runner).
+
+    Returns:
+        (judge_eval, score, path): the judge's line, its parsed score (None if
+        unparseable) and the cascade path, one of "direct", "fast",
+        "escalated:<reason>" or "chunked" (see judge_long_answer).
+
+    Under stream_tokens, the line that decides the score goes to the "judge"
+    channel: the main judge's streamed, or the fast model's in one piece once
+    it stands (a fast line that gets escalated is never sent).
+    """
+    metrics.incr("judge.cascade.total")
+    if count_tokens(answer) > config.JUDGE_CHUNK_THRESHOLD_TOKENS:
+        judge_eval = judge_long_answer(mode, question, answer, ai_feedback, code_report)
+        return judge_eval, parse_judge_score(judge_eval), "chunked"
+
+    messages = [
+        {"role": "system", "content": get_judge_system_prompt()},
+        {"role": "user", "content": get_judge_user_and_interviewer_prompt(mode, question, answer, ai_feedback, code_report)}
+    ]
+
+    if not JUDGE_FAST_MODEL or JUDGE_FAST_MODEL == JUDGE_MODEL:
+        path = "direct"
+    else:
+        reason = _pre_escalation_reason(mode, answer)
+        if reason is None:
+            try:
+                fast_eval = chat_completion(JUDGE_FAST_MODEL, messages, temperature=0.2, max_tokens=80, timeout=120, purpose="judge")
+            except deadline.DeadlineExceeded:
+                raise
+            except Exception as e:
+                print(f"Fast judge {JUDGE_FAST_MODEL} failed, escalating: {e}")
+                fast_eval = None
+            fast_score = parse_judge_score(fast_eval) if fast_eval is not None else None
+            if fast_eval is None:
+                reason = "fast_error"
+            elif fast_score is None:
+                reason = "unparseable"
+            elif fast_score in JUDGE_BORDERLINE_SCORES:
+                reason = "borderline"
+            else:
+                metrics.incr("judge.cascade.fast")
+                emit_tokens("judge", fast_eval)
+                return fast_eval, fast_score, "fast"
+        path = f"escalated:{reason}"
+        metrics.incr("judge.cascade.escalated")
+        metrics.incr(f"judge.cascade.escalated.{reason}")
+
+    judge_eval = chat_completion(JUDGE_MODEL, messages, temperature=0.2, max_tokens=80, timeout=120,
+                                 purpose="judge", stream_as="judge")
+    return judge_eval, parse_judge_score(judge_eval), path
+
+def condense_answer(mode: str, question: str, answer: str) -> str:
+    """
+    Key points of a long answer, extracted chunk by chunk in parallel (the map
+    step). Chunks grow past JUDGE_CHUNK_TOKENS so the whole answer fits in
+    JUDGE_CHUNK_MAX of them; only beyond JUDGE_CHUNK_MAX_TOKENS per chunk is the
+    answer trimmed to its head and tail, and the condensed text says so.
+    """
+    tokens = count_tokens(answer)
+    size = max(config.JUDGE_CHUNK_TOKENS, min(config.JUDGE_CHUNK_MAX_TOKENS, -(-tokens // config.JUDGE_CHUNK_MAX)))
+    text = answer
+    if tokens > size * config.JUDGE_CHUNK_MAX:
+        text = truncate_text(answer, size * config.JUDGE_CHUNK_MAX)
+        metrics.incr("judge.chunk_truncated")
+        print(f"Answer of {tokens} tokens trimmed to {size * config.JUDGE_CHUNK_MAX} for key-point extraction")
+    chunks = split_text(text, size)
+    metrics.observe("judge.chunks", len(chunks))
+    metrics.observe("judge.chunk_tokens", size)
+
+    def extract(i: int) -> str:
+        messages = get_key_points_messages(mode, question, chunks[i], i + 1, len(chunks))
+        try:
+            return chat_completion(JUDGE_CHUNK_MODEL, messages, temperature=0.0,
+                                   max_tokens=config.JUDGE_CHUNK_POINTS_TOKENS, timeout=120, purpose="judge_extract")
+        except deadline.DeadlineExceeded:
+            raise
+        except Exception as e:
+            if JUDGE_CHUNK_MODEL == JUDGE_MODEL:
+                raise
+            # like the fast judge, the chunk model is optional
+            print(f"Chunk model {JUDGE_CHUNK_MODEL} failed, using {JUDGE_MODEL}: {e}")
+            metrics.incr("judge.chunk_fallback")
+            return chat_completion(JUDGE_MODEL, messages, temperature=0.0,
+                                   max_tokens=config.JUDGE_CHUNK_POINTS_TOKENS, timeout=120, purpose="judge_extract")
+
+    # each call runs in a copy of this context, so it keeps the caller's dispatch priority
+    with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, extract, i) for i in range(len(chunks))]
+        points = [f.result() for f in futures]
+    words = len(answer.split())
+    return condensed_answer(points, words, words - len(text.split()) if text is not answer else 0)
+
+def judge_long_answer(mode: str, question: str, answer: str, ai_feedback: str, code_report: str = "") -> str:
+    """Judge an over-threshold answer on its condensed key points (the reduce step); returns the judge line."""
+    start = time.perf_counter()
+    condensed = condense_answer(mode, question, answer)
+    messages = [
+        {"role": "system", "content": get_judge_system_prompt()},
+        {"role": "user", "content": get_judge_user_and_interviewer_prompt(mode, question, condensed, ai_feedback, code_report)}
+    ]
+    judge_eval = chat_completion(JUDGE_MODEL, messages, temperature=0.2, max_tokens=80, timeout=120,
+                                 purpose="judge", stream_as="judge")
+    metrics.incr("judge.cascade.chunked")
+    metrics.observe("judge.chunked_seconds", time.perf_counter() - start)
+    return judge_eval
+
+def judge_version() -> str:
+    """
+    Identifier stored on every eval row: the judge models plus a fingerprint of
+    the judge prompt template. It changes whenever either changes, so scores
+    from different judges are never mixed.
+    """
+    template = get_judge_system_prompt() + "\n" + "\n".join(
+        get_judge_user_and_interviewer_prompt(mode, "{question}", "{answer}", "{feedback}")
+        for mode in ("technical", "behavioral")
+    )
+    fingerprint = hashlib.sha1(template.encode("utf-8")).hexdigest()[:10]
+    fast = JUDGE_FAST_MODEL if JUDGE_FAST_MODEL and JUDGE_FAST_MODEL != JUDGE_MODEL else "-"
+    return f"{JUDGE_MODEL}|{fast}|{fingerprint}"
+
+def judge_path_model(path: str) -> str:
+    """Model that produced the score for a cascade path returned by judge_answer()."""
+    return JUDGE_FAST_MODEL if path == "fast" else JUDGE_MODEL
+
+def judge_cascade_stats() -> Dict[str, Any]:
+    """Cascade path counts and escalation rate for tuning the thresholds above."""
+    return {
+        "fast_model": JUDGE_FAST_MODEL,
+        "judge_model": JUDGE_MODEL,
+        "total": metrics.counter("judge.cascade.total"),
+        "fast": metrics.counter("judge.cascade.fast"),
+        "escalated": metrics.counter("judge.cascade.escalated"),
+        "chunked": metrics.counter("judge.cascade.chunked"),
+        "escalation_rate": metrics.ratio("judge.cascade.escalated", "judge.cascade.total"),
+        "reasons": {
+            r: metrics.counter(f"judge.cascade.escalated.{r}")
+            for r in ("long_answer", "technical", "fast_error", "unparseable", "borderline")
+        },
+    }
 
 # ---- NODES ----
 def interviewer_node(state: InterviewState) -> InterviewState:
@@ -52,33 +412,32 @@ def interviewer_node(state: InterviewState) -> InterviewState:
     Args:
         state: A mapping representing the current interview state. Expected keys:
             - "mode": str, interview type ("technical" or "behavioral").
-            - "history": list of str, alternating Q/A lines from prior rounds.
-            - "questions": list of str, previously asked questions.
+            - "log": TurnLog, questions/answers/judge lines from prior rounds.
             - "round": int, current round number (0-based before increment).
             - "candidate_answer": str, the user's previous answer (if any).
 
     Returns:
         InterviewState: A new state dictionary with updated fields:
-            - "history": appended with the new Q (the answer will be added later).
-            - "questions": includes the new question.
+            - "log": a snapshot with the new question appended (the answer will be added later).
             - "round": incremented round number.
             - "question": the text of the new question.
+            - "topic": the topic hint it was asked on.
             - "ai_feedback": lightweight acknowledgement string.
 
     Side Effects:
         - Calls the chat completion API to generate a question.
-        - Only updates the history with the question (answer will be added later).
+        - Only updates the log with the question (answer will be added later).
+          The input state's log is not modified.
         
     Example:
-        >>> state = {"mode": "technical", "history": [], "questions": [], "round": 0}
+        >>> state = initial_state("technical")
         >>> new_state = interviewer_node(state)
         >>> print(new_state["question"])
         Explain the difference between a list and a tuple in Python.
     """
 
     mode = state.get("mode", "")
-    history = state.get("history", [])
-    qs = state.get("questions", [])
+    log = state.get("log") or TurnLog()
     round_num = state.get("round", 0) + 1  # increment
     
     # If there's a candidate answer from previous round, provide feedback
@@ -89,29 +448,27 @@ def interviewer_node(state: InterviewState) -> InterviewState:
         ai_feedback = f"Thanks — noted. (mode: {mode}, round {round_num-1})"
     
     # Generate next question with anti-repeat + topic hint
-    resp = client.chat.completions.create(
-        model=INTERVIEW_MODEL,
-        messages=[
+    question = chat_completion(
+        INTERVIEW_MODEL,
+        [
             {"role": "system", "content": get_interviewer_system_prompt()},
-            {"role": "user", "content": get_interviewee_prompt(mode, qs, round_num)}
+            {"role": "user", "content": get_interviewee_prompt(mode, log.questions(), round_num)}
         ],
         temperature=0.7,
         max_tokens=80,
-        timeout=120
+        timeout=120,
+        purpose="interviewer",
+        stream_as="question"
     )
-    question = (resp.choices[0].message.content or "").strip()
 
     # Update history with just the question
     # (answer will be added when the user responds via the frontend)
-    history.append(f"Q: {question}")
-    qs.append(question)
-
     return {
         **state,
-        "history": history,
-        "questions": qs,
+        "log": log.ask(question),
         "round": round_num,
         "question": question,
+        "topic": topic_for_round(mode, round_num),
         "ai_feedback": ai_feedback
     }
 
@@ -128,11 +485,8 @@ def process_candidate_answer(state: InterviewState, answer: str) -> InterviewSta
     Returns:
         InterviewState: Updated state with the candidate's answer.
     """
-    # Make a copy of the current history
-    history = state.get("history", []).copy()
-    
-    # Add the answer to the history
-    history.append(f"A: {answer}")
+    # Add the answer to the history (a new snapshot; the input state's log is unchanged)
+    log = (state.get("log") or TurnLog()).answer(answer)
     
     # Generate appropriate feedback
     mode = state.get("mode", "")
@@ -141,7 +495,7 @@ def process_candidate_answer(state: InterviewState, answer: str) -> InterviewSta
     
     return {
         **state,
-        "history": history,
+        "log": log,
         "candidate_answer": answer,
         "ai_feedback": ai_feedback
     }
@@ -151,34 +505,23 @@ def judge_node(state: InterviewState) -> InterviewState:
     question = state.get("question", "")
     answer = state.get("candidate_answer", "")
     ai_feedback = state.get("ai_feedback", "")
+    code_report = state.get("code_report", "")
 
-    resp = client.chat.completions.create(
-        model=JUDGE_MODEL,
-        messages=[
-            {"role": "system", "content": "You are a concise interview judge. Reply in one short line, in English."},
-            {"role": "user", "content": get_judge_user_and_interviewer_prompt(mode, question, answer, ai_feedback)}
-        ],
-        temperature=0.2,
-        max_tokens=80,
-        timeout=120
-    )
-    judge_eval = (resp.choices[0].message.content or "").strip()
-    print(f"⚖️ Judge: {judge_eval}\n")
-
-    # naive parse: first digit 1-5
-    score = next((c for c in judge_eval if c in "12345"), "?")
-    lines = state.get("all_judge_lines", [])
-    lines.append(judge_eval)
+    judge_eval, score, path = judge_answer(mode, question, answer, ai_feedback, code_report)
+    print(f"⚖️ Judge ({path}): {judge_eval}\n")
 
     return {
         **state,
-        "judge_score": float(score),
+        "log": (state.get("log") or TurnLog()).judge(judge_eval),
+        "judge_score": float(score) if score is not None else 0.0,
         "judge_feedback": judge_eval,
-        "all_judge_lines": lines
+        "judge_path": path
     }
 
 # ---- GRAPH ----
 def build_graph():
+    # langgraph is a heavy import; keep it off the app's import path
+    from langgraph.graph import StateGraph, END
     graph = StateGraph(InterviewState)
     graph.add_node("interviewer", interviewer_node)
     graph.add_node("judge", judge_node)
@@ -188,18 +531,20 @@ def build_graph():
     return graph.compile()
 
 # ---- COACHING (after the loop) ----
-def generate_coaching_tips(mode: str, history_lines: List[str], judge_lines: List[str]) -> str:
-    resp = client.chat.completions.create(
-        model=COACH_MODEL,
-        messages=[
-            {"role": "system", "content": "You are a direct, practical interview coach. Respond in clear markdown."},
-            {"role": "user", "content": get_interview_couch_user_prompt(mode, history_lines, judge_lines)}
-        ],
-        temperature=0.3,
-        max_tokens=900,
-        timeout=180
-    )
-    md = (resp.choices[0].message.content or "").strip()
+def generate_coaching_tips(mode: str, history_lines: Sequence[str], judge_lines: Sequence[str]) -> str:
+    # long generation nobody is blocked on mid-turn: never ahead of interviewer/judge calls
+    with scheduler.priority(scheduler.NEAR_REAL_TIME):
+        md = chat_completion(
+            COACH_MODEL,
+            [
+                {"role": "system", "content": "You are a direct, practical interview coach. Respond in clear markdown."},
+                {"role": "user", "content": get_interview_couch_user_prompt(mode, history_lines, judge_lines)}
+            ],
+            temperature=0.3,
+            max_tokens=900,
+            timeout=180,
+            purpose="coach"
+        )
 
     return md
 
@@ -217,18 +562,7 @@ if __name__ == "__main__":
         rounds = 3
 
     workflow = build_graph()
-    state: InterviewState = {
-        "mode": mode,
-        "history": [],
-        "questions": [],
-        "round": 0,
-        "question": "",
-        "candidate_answer": "",
-        "ai_feedback": "",
-        "judge_score": 0.0,
-        "judge_feedback": "",
-        "all_judge_lines": []
-    }
+    state: InterviewState = initial_state(mode)
 
     for _ in range(rounds):
         result = workflow.invoke(state)
@@ -236,9 +570,9 @@ if __name__ == "__main__":
         state = InterviewState(**result)
 
     print("\n✅ Interview Finished")
-    print("History:\n", "\n".join(state.get("history", [])))
+    print("History:\n", "\n".join(state["log"].history()))
 
     # ---- Personalized tips right after history ----
-    tips_md = generate_coaching_tips(state["mode"], state["history"], state.get("all_judge_lines", []))
+    tips_md = generate_coaching_tips(state["mode"], state["log"].history(), state["log"].judge_lines())
     print("\n📈 Strong Coaching Tips\n")
     print(tips_md)
\ No newline at end of file
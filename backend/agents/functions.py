@@ -1,9 +1,14 @@
-from typing import Dict, List, Any, cast
-from agents.agents import build_graph, InterviewState, generate_coaching_tips
+from typing import Callable, Dict, List, Any, Optional, Sequence, Tuple, cast
+from agents.agents import build_graph, InterviewState, generate_coaching_tips, interviewer_node, judge_node, initial_state
+from agents.prompts import topic_for_round
+from agents.turn_log import TurnLog
+import config
+from deadline import DeadlineExceeded, reserve
 
-# Global state to maintain the graph instance
+# Global graph instance. Interview state is not kept here: each call builds
+# its own from the session history it is given, so concurrent turns of
+# different users (or of one user) never share a TurnLog.
 _graph = None
-_state = None
 
 def _get_graph():
     """Get or create the graph instance"""
@@ -14,154 +19,164 @@ def _get_graph():
 
 def generate_first_question(mode="technical") -> Dict[str, Any]:
     """Generate the first interview question using the graph's invoke method"""
-    global _state
-    
     # Initialize the workflow
     graph = _get_graph()
     
-    # Create initial state for the graph invocation
-    # Cast to InterviewState to satisfy type checking
-    initial_state = cast(InterviewState, {
-        "mode": mode,
-        "history": [],
-        "questions": [],
-        "round": 0,
-        "question": "",
-        "candidate_answer": "",  # No answer yet for the first question
-        "ai_feedback": "",
-        "judge_score": 0.0,
-        "judge_feedback": "",
-        "all_judge_lines": []
-    })
-    
-    # Invoke the graph with the initial state
+    # Invoke the graph with a fresh state
     # This will run the interviewer node and generate the first question
-    result = graph.invoke(initial_state)
+    result = graph.invoke(initial_state(mode))
     
     # Extract the question from the result
     question = result["question"]
     
-    # Update our state for subsequent operations
-    _state = {
-        "mode": mode,
-        "history": result["history"],  # This now contains only the question
-        "questions": result["questions"],
-        "round": result["round"],
-        "question": question,
-        "candidate_answer": "",
-        "ai_feedback": "",
-        "judge_score": 0.0,
-        "judge_feedback": "",
-        "all_judge_lines": []
-    }
-    
+    # only the question is kept in the log; later turns rebuild it from the stored session
     return {
         "question": question,
-        "history": _state["history"]
+        "topic": result["topic"],
+        "history": list(TurnLog().ask(question).history())
     }
 
-def judge_step(question: str, answer: str, history: List[str]) -> Dict[str, Any]:
-    """Judge the answer and generate the next question using the graph"""
-    global _state
-    
-    if _state is None:
-        # If state doesn't exist, recreate it based on history
+def generate_question(mode: str = "technical", round_num: int = 1, avoid: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    Generate one question with the interviewer node alone, without touching the
+    shared interview state or running the judge. Used for bulk (cohort) starts.
+
+    Args:
+        mode: "technical" or "behavioral".
+        round_num: round whose topic hint to use (1 for a first question).
+        avoid: questions the new one must not repeat.
+
+    Returns:
+        {"question", "topic"}
+    """
+    log = TurnLog()
+    for q in avoid or []:
+        log = log.ask(q)
+    result = interviewer_node(initial_state(mode, log, round_num - 1))
+    return {"question": result["question"], "topic": result["topic"]}
+
+def judge_step(question: str, answer: str, history: List[str], code_report: str = "",
+               on_judged: Optional[Callable[[str, str], None]] = None,
+               fallback_question: Optional[Callable[[str, str, Sequence[str]], Tuple[str, str]]] = None,
+               quick_score: Optional[Callable[[str, str, str], Optional[Tuple[int, float]]]] = None,
+               mode: Optional[str] = None) -> Dict[str, Any]:
+    """Judge the answer (and the result of running its code, if any) and generate the next question using the graph.
+
+    `history` is the session as stored ("Q: ..."/"A: ..." lines, with or
+    without this answer) and `mode` its track; the turn's log is built from
+    them, so nothing is shared between calls. Without `mode` the track is
+    guessed from the history. States passed to the graph are O(1) snapshots
+    of that log, so nothing is copied per turn.
+
+    `on_judged(judge_eval, judge_path)` is called as soon as the judge line is
+    ready, before the next question is generated, so callers can push it early.
+
+    Under a request deadline the judge leaves TURN_INTERVIEWER_RESERVE_SECONDS
+    for the next question. If the judge runs out of time, `evaluation_raw_json`
+    is None and `judge_path` is "pending". If the interviewer does,
+    `fallback_question(mode, topic, asked_questions)` supplies the next
+    question and its topic, and `question_source` is "fallback" (without a
+    fallback the DeadlineExceeded propagates). `next_topic` is the topic the
+    next question was actually asked on, for storing with it.
+
+    If `quick_score(mode, question, answer)` returns a confident (score,
+    confidence) for an answer without code, the judge isn't called:
+    `judge_path` is "provisional", `provisional` holds that pair and the caller
+    has the judge score the answer later.
+    """
+    if mode is None:
         mode = "technical"  # Default mode
         # Try to extract mode from history
         for h in history:
             if "mode: behavioral" in h:
                 mode = "behavioral"
                 break
-                
-        _state = {
-            "mode": mode,
-            "history": history.copy(),
-            "questions": [h[2:].strip() for h in history if h.startswith("Q:")],
-            "round": len([h for h in history if h.startswith("Q:")]),
-            "question": question,
-            "candidate_answer": "",
-            "ai_feedback": "",
-            "judge_score": 0.0,
-            "judge_feedback": "",
-            "all_judge_lines": []
-        }
-    
+
+    log = TurnLog.from_history(history)
+    state = initial_state(mode, log, len(log.questions()))
+    state["question"] = question
+
     # Import here to avoid circular imports
     from agents.agents import process_candidate_answer
-    
-    # First, process the candidate's answer
-    graph_state = cast(InterviewState, _state)
-    updated_state = process_candidate_answer(graph_state, answer)
-    
-    # Update our global state with the processed answer
-    _state["history"] = updated_state["history"]
-    _state["candidate_answer"] = answer
-    _state["ai_feedback"] = updated_state["ai_feedback"]
+
+    # First, process the candidate's answer (already in the log when it was saved before judging)
+    updated_state = process_candidate_answer(cast(InterviewState, state), answer)
+    if history and history[-1].startswith("A:"):
+        updated_state["log"] = log
+
+    # Update the turn's state with the processed answer
+    state["log"] = updated_state["log"]
+    state["candidate_answer"] = answer
+    state["ai_feedback"] = updated_state["ai_feedback"]
     
     # Prepare state for judge invocation
     judge_state = cast(InterviewState, {
-        "mode": _state["mode"],
-        "history": _state["history"].copy(),
-        "questions": _state["questions"].copy(),
-        "round": _state["round"],
+        **state,
         "question": question,
-        "candidate_answer": answer,
-        "ai_feedback": _state["ai_feedback"],
-        "judge_score": _state.get("judge_score", 0.0),
-        "judge_feedback": _state.get("judge_feedback", ""),
-        "all_judge_lines": _state.get("all_judge_lines", []).copy()
+        "code_report": code_report
     })
     
-    # Invoke the graph to run the judge node
-    graph = _get_graph()
-    result = graph.invoke(judge_state)
-    
-    # Extract results from the graph execution
-    judge_eval = result["judge_feedback"]
-    _state["judge_feedback"] = judge_eval
-    _state["judge_score"] = result["judge_score"]
-    _state["all_judge_lines"] = result["all_judge_lines"]
+    # Run the judge node on its own (invoking the whole graph would also ask,
+    # and throw away, an extra question first); skipped when the local scorer
+    # is confident, the caller has the answer judged later
+    provisional = quick_score(state["mode"], question, answer) if quick_score is not None and not code_report else None
+    judge_eval, judge_path = None, "provisional"
+    if provisional is None:
+        try:
+            with reserve(config.TURN_INTERVIEWER_RESERVE_SECONDS):
+                result = judge_node(judge_state)
+        except DeadlineExceeded:
+            # out of time: the caller records the score as pending and judges later
+            judge_eval, judge_path = None, "pending"
+        else:
+            # Extract results from the judge
+            judge_eval = result["judge_feedback"]
+            judge_path = result.get("judge_path", "")
+            state["judge_feedback"] = judge_eval
+            state["judge_score"] = result["judge_score"]
+            state["log"] = result["log"]
+            if on_judged is not None:
+                on_judged(judge_eval, judge_path)
     
     # The next question will be in the result if we continue the graph flow
     # Otherwise, we need to prepare for the next round
-    _state["round"] += 1
-    
-    # Use the interviewer node to generate the next question
-    interviewer_state = cast(InterviewState, {
-        "mode": _state["mode"],
-        "history": _state["history"].copy(),
-        "questions": _state["questions"].copy(),
-        "round": _state["round"],
-        "question": "",
-        "candidate_answer": "",
-        "ai_feedback": "",
-        "judge_score": 0.0,
-        "judge_feedback": "",
-        "all_judge_lines": _state["all_judge_lines"].copy()
-    })
-    
-    # Generate the next question using the interviewer node
-    next_result = graph.invoke(interviewer_state)
-    next_question = next_result["question"]
-    
-    # Update global state with the next question and history
-    _state["history"] = next_result["history"]
-    _state["questions"] = next_result["questions"]
+    state["round"] += 1
+    
+    # Generate the next question using the interviewer node (alone: the graph
+    # would also run the judge on the still-empty answer)
+    question_source = "model"
+    try:
+        next_result = interviewer_node(initial_state(state["mode"], state["log"], state["round"]))
+        next_question = next_result["question"]
+        next_topic = next_result["topic"]
+        next_log = next_result["log"]
+    except DeadlineExceeded:
+        if fallback_question is None:
+            raise
+        # on the topic the interviewer was steered to (interviewer_node asks for round + 1)
+        topic = topic_for_round(state["mode"], state["round"] + 1)
+        next_question, next_topic = fallback_question(state["mode"], topic, state["log"].questions())
+        next_log = state["log"].ask(next_question)
+        question_source = "fallback"
+    
+    # Update the turn's state with the next question and history
+    state["log"] = next_log
     
     # Prepare response with the evaluation and next question
     return {
         "evaluation_raw_json": judge_eval,
+        "judge_path": judge_path,
+        "provisional": provisional,
         "next_question": next_question,
-        "history": _state["history"]
+        "next_topic": next_topic,
+        "question_source": question_source,
+        "history": state["log"].history()
     }
 
-def generate_coaching_summary(mode: str, history: List[str]) -> str:
-    """Generate coaching tips based on the interview history"""
+def generate_coaching_summary(mode: str, history: List[str], judge_lines: Sequence[str] = ()) -> str:
+    """Generate coaching tips based on the interview history and the session's judge lines"""
     # For coaching, use the original function from agents.py
     # This leverages the existing implementation
     
-    # Extract judge lines from state if available
-    judge_lines = _state.get("all_judge_lines", []) if _state else []
-    
     # Call the existing coaching function
     return generate_coaching_tips(mode, history, judge_lines)
\ No newline at end of file
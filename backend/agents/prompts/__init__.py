@@ -1,10 +1,20 @@
 from .interviewer_system_prompt import get_interviewer_system_prompt
-from .interviewee_prompt import get_interviewee_prompt
+from .interviewee_prompt import get_interviewee_prompt, topic_for_round
 from .interview_couch_prompt import get_interview_couch_user_prompt
-from .interview_judge_prompt import get_judge_user_and_interviewer_prompt
+from .interview_judge_prompt import get_judge_system_prompt, get_judge_user_and_interviewer_prompt, get_key_points_messages, condensed_answer
+from .tokens import compact, count_tokens, split_text, truncate_lines, truncate_text
 __all__ = [
     "get_interviewer_system_prompt",
     "get_interviewee_prompt",
+    "topic_for_round",
+    "get_judge_system_prompt",
     "get_judge_user_and_interviewer_prompt",
-    "get_interview_couch_user_prompt"
+    "get_key_points_messages",
+    "condensed_answer",
+    "get_interview_couch_user_prompt",
+    "compact",
+    "count_tokens",
+    "split_text",
+    "truncate_lines",
+    "truncate_text"
 ]
\ No newline at end of file
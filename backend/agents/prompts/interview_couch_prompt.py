@@ -1,10 +1,10 @@
-from typing import List
-def get_interview_couch_user_prompt(mode: str, history_lines: List[str], judge_lines: List[str]) -> str:
-    mode_line = "BEHAVIORAL (STAR)" if mode == "behavioral" else "TECHNICAL"
-    history_block = "\n".join(history_lines) if history_lines else "(no history)"
-    judge_block = "\n".join(judge_lines) if judge_lines else "(no judge notes)"
+from typing import Sequence
+from config import COACH_HISTORY_TOKEN_BUDGET, COACH_JUDGE_TOKEN_BUDGET, PROMPT_LINE_TOKEN_BUDGET
+from .tokens import compact, truncate_lines
 
-    return f"""
+# Whitespace is normalized once here; values are substituted afterwards so
+# answers (and any code in them) keep their own formatting.
+COUCH_TEMPLATE = compact("""
         You are a concise interview coach. Session type: {mode_line}.
         Write ONLY three short markdown sections. No preface, no outro, no code fences.
 
@@ -28,4 +28,14 @@ def get_interview_couch_user_prompt(mode: str, history_lines: List[str], judge_l
 
         JUDGE:
         {judge_block}
-    """
+""")
+
+def get_interview_couch_user_prompt(mode: str, history_lines: Sequence[str], judge_lines: Sequence[str]) -> str:
+    mode_line = "BEHAVIORAL (STAR)" if mode == "behavioral" else "TECHNICAL"
+    # most recent evidence wins when a long session exceeds the budget
+    history_lines = truncate_lines(list(history_lines), COACH_HISTORY_TOKEN_BUDGET, PROMPT_LINE_TOKEN_BUDGET)
+    judge_lines = truncate_lines(list(judge_lines), COACH_JUDGE_TOKEN_BUDGET, PROMPT_LINE_TOKEN_BUDGET)
+    history_block = "\n".join(history_lines) if history_lines else "(no history)"
+    judge_block = "\n".join(judge_lines) if judge_lines else "(no judge notes)"
+
+    return COUCH_TEMPLATE.format(mode_line=mode_line, history_block=history_block, judge_block=judge_block)
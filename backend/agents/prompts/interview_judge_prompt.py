@@ -1,18 +1,67 @@
-def get_judge_user_and_interviewer_prompt(mode: str, question: str, answer: str, ai_feedback: str) -> str:
-    rubric = (
-        "Grade 1–5 on correctness, completeness, clarity, and tradeoffs. Mention Big-O when relevant."
-        if mode == "technical" else
-        "Grade 1–5 based on STAR: Was the Situation/Task/Action/Result clear and quantified?"
-    )
-    
-    return f"""
-        You are an AI judge. Evaluate this interview step in one concise line.
+from typing import Dict, List, Sequence
+
+from config import JUDGE_ANSWER_TOKEN_BUDGET
+from .tokens import compact, truncate_text
+
+# Everything static lives in the system message so consecutive judge calls
+# share one identical prefix and the model server can reuse its KV cache;
+# only the per-answer facts follow, with the (largest) answer last.
+JUDGE_SYSTEM_PROMPT = compact("""
+        You are an AI judge. Evaluate one interview step in one concise line, in English.
+
+        Rubric for TECHNICAL steps: Grade 1–5 on correctness, completeness, clarity, and tradeoffs. Mention Big-O when relevant.
+        Rubric for BEHAVIORAL steps: Grade 1–5 based on STAR: Was the Situation/Task/Action/Result clear and quantified?
 
+        Use the rubric matching the step's Mode.
+        If a Code Execution line is present, it is the result of actually running the candidate's code against tests; treat it as ground truth for correctness.
+        Reply as: "Score: <1-5>. Feedback: <one short sentence>."
+""")
+
+JUDGE_TEMPLATE = compact("""
         Mode: {mode}
         Question: {question}
-        Candidate Answer: {answer}
         Interviewer Feedback: {ai_feedback}
+        {code_line}Candidate Answer: {answer}
+""")
+
+def get_judge_system_prompt() -> str:
+    return JUDGE_SYSTEM_PROMPT
+
+def get_judge_user_and_interviewer_prompt(mode: str, question: str, answer: str, ai_feedback: str,
+                                          code_report: str = "") -> str:
+    """Per-answer part of the judge prompt; send after get_judge_system_prompt()."""
+    return JUDGE_TEMPLATE.format(
+        mode=mode,
+        question=question,
+        ai_feedback=ai_feedback,
+        code_line=f"Code Execution: {code_report}\n" if code_report else "",
+        answer=truncate_text(answer, JUDGE_ANSWER_TOKEN_BUDGET)
+    )
+
+# Long answers are judged map-reduce style: each chunk is condensed to key
+# points (map), and the judge scores the condensed answer (reduce).
+KEY_POINTS_SYSTEM_PROMPT = compact("""
+        You condense one part of a candidate's interview answer for a judge.
+        List the key points as short bullet lines: claims, approach, algorithm and code details, complexity, examples, results, and any mistakes or contradictions.
+        Keep the candidate's own terms. Do not evaluate, do not add anything the part doesn't say.
+""")
+
+KEY_POINTS_TEMPLATE = compact("""
+        Mode: {mode}
+        Question: {question}
+        Answer part {index} of {total}:
+""")
+
+def get_key_points_messages(mode: str, question: str, chunk: str, index: int, total: int) -> List[Dict[str, str]]:
+    """Messages asking for the key points of one chunk (1-based `index`) of a long answer."""
+    header = KEY_POINTS_TEMPLATE.format(mode=mode, question=question, index=index, total=total)
+    return [
+        {"role": "system", "content": KEY_POINTS_SYSTEM_PROMPT},
+        {"role": "user", "content": header + "\n" + chunk},
+    ]
 
-        {rubric}
-        Reply as: "Score: <1-5>. Feedback: <one short sentence>."   
-    """.strip()
\ No newline at end of file
+def condensed_answer(points: Sequence[str], words: int, omitted_words: int = 0) -> str:
+    """The candidate answer as the judge sees it on the long-answer path."""
+    parts = "\n".join(f"[Part {i}]\n{p.strip()}" for i, p in enumerate(points, 1))
+    note = f" About {omitted_words} words from the middle were cut before extraction." if omitted_words else ""
+    return f"(Key points extracted from a {words}-word answer, in order.{note})\n{parts}"
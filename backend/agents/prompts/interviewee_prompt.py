@@ -1,4 +1,6 @@
-from typing import List
+from typing import Sequence
+from config import PROMPT_LINE_TOKEN_BUDGET
+from .tokens import compact, truncate_text
 
 TECH_TOPICS = [
     "data structures & algorithms",
@@ -19,9 +21,28 @@ BEHAV_TOPICS = [
     "prioritization and ambiguity",
 ]
 
-def get_interviewee_prompt(mode: str, recent_questions: List[str], round_num: int) -> str:
+# Per-round user message. The static rules live in the system prompt; here the
+# mode's style guide (static per mode) comes first and the parts that change
+# every round come last, so consecutive calls share the longest possible prefix.
+INTERVIEWEE_TEMPLATE = compact("""
+    # Style Guide
+    {style}
+
+    # Context Controls
+    - DO NOT repeat, rephrase, or closely resemble any of the following recent questions:
+    {recent_block}
+    - Focus of this round: {topic_hint}
+
+    Produce one new, in-depth {mode} interview question only.
+""")
+
+def topic_for_round(mode: str, round_num: int) -> str:
+    """Topic the interviewer is steered towards in a given 1-based round."""
     topics = TECH_TOPICS if mode == "technical" else BEHAV_TOPICS
-    topic_hint = topics[(round_num - 1) % len(topics)]
+    return topics[(round_num - 1) % len(topics)]
+
+def get_interviewee_prompt(mode: str, recent_questions: Sequence[str], round_num: int) -> str:
+    topic_hint = topic_for_round(mode, round_num)
     style = (
         "Ask ONE concise TECHNICAL interview question.\n"
         "- Focus on correctness, tradeoffs, and depth.\n"
@@ -31,22 +52,5 @@ def get_interviewee_prompt(mode: str, recent_questions: List[str], round_num: in
         "- Use STAR-friendly phrasing (Situation, Task, Action, Result).\n"
         "- Keep it short (≤25 words)."
     )
-    recent_block = "\n".join("- " + q for q in recent_questions[-3:]) if recent_questions else "(none)"
-    return f"""
-    You are an AI Interviewer.  
-    Your sole job is to generate **exactly ONE interview question in English**.  
-    Do not include explanations, prefacing text, or anything besides the raw question.
-
-    # Style Guide
-    {style}
-
-    # Context Controls
-    - Focus of this round: {topic_hint}
-    - DO NOT repeat, rephrase, or closely resemble any of the following recent questions:
-    {recent_block}
-
-    # Output Rule
-    Produce one new, in-depth {mode} interview question only.  
-    Return only the question text.
-
-""".strip()
\ No newline at end of file
+    recent_block = "\n".join("- " + truncate_text(q, PROMPT_LINE_TOKEN_BUDGET) for q in recent_questions[-3:]) if recent_questions else "(none)"
+    return INTERVIEWEE_TEMPLATE.format(style=style, topic_hint=topic_hint, recent_block=recent_block, mode=mode)
@@ -0,0 +1,169 @@
+import contextvars
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import config
+import deadline
+import metrics
+
+# Priority dispatch in front of the model server. Every chat_completion()
+# takes a slot here first, tagged with the caller's priority class:
+#
+#   INTERACTIVE     a candidate is waiting on it (interviewer and judge turns)
+#   NEAR_REAL_TIME  wanted soon but not blocking a turn (coaching summaries)
+#   BATCH           background work (cohort starts, warm-up pings, tools.rescore)
+#
+# At most LLM_MAX_CONCURRENT calls run at once. Near-real-time and batch calls
+# have their own caps and may never take the last LLM_INTERACTIVE_RESERVED
+# slots, so however much background work is queued, interactive calls wait
+# for at most those caps' worth of running calls. When a slot frees, the
+# waiting call with the most urgent class goes first (oldest first within a
+# class). A call rises one class per LLM_PRIORITY_AGING_SECONDS waited; once
+# aged to interactive it may use the reserved slots too, so background work
+# is delayed under load but never starved.
+#
+# The priority is a context variable: wrap background work in
+# `with priority(BATCH):`. Threads started inside don't inherit it, so set it
+# in the thread's own function.
+#
+# The dispatcher is per process, and so are all of these limits. Each server
+# worker has its own, and a tool run in its own process (tools.rescore) is
+# capped only by its own dispatcher's LLM_BATCH_MAX_CONCURRENT. The server's
+# reserved interactive slots don't hold any of those calls back.
+
+INTERACTIVE, NEAR_REAL_TIME, BATCH = 0, 1, 2
+CLASS_NAMES = ("interactive", "near_real_time", "batch")
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("llm_priority", default=INTERACTIVE)
+
+def current_priority() -> int:
+    return _priority.get()
+
+@contextmanager
+def priority(cls: int) -> Iterator[None]:
+    """Run the block's model calls at class `cls`, or less urgent if the caller already is."""
+    token = _priority.set(max(_priority.get(), cls))
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class _Waiter:
+    __slots__ = ("cls", "arrived", "seq")
+
+    def __init__(self, cls: int, arrived: float, seq: int):
+        self.cls = cls
+        self.arrived = arrived
+        self.seq = seq
+
+
+class Dispatcher:
+    """Concurrency slots shared by all priority classes; see the module comment."""
+
+    def __init__(self, max_concurrent: int, class_limits: List[int], reserved: int, aging_seconds: float):
+        self.max_concurrent = max(1, max_concurrent)
+        self.class_limits = class_limits
+        self.reserved = min(max(0, reserved), self.max_concurrent - 1)
+        self.aging_seconds = aging_seconds
+        self.running = [0, 0, 0]
+        self._waiting: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def _effective(self, w: _Waiter, now: float) -> int:
+        if self.aging_seconds <= 0:
+            return w.cls
+        return max(INTERACTIVE, w.cls - int((now - w.arrived) / self.aging_seconds))
+
+    def _eligible(self, w: _Waiter, now: float) -> bool:
+        free = self.max_concurrent - sum(self.running)
+        if free <= 0 or self.running[w.cls] >= self.class_limits[w.cls]:
+            return False
+        return free > self.reserved or self._effective(w, now) == INTERACTIVE
+
+    def _next(self, now: float) -> Optional[_Waiter]:
+        candidates = [w for w in self._waiting if self._eligible(w, now)]
+        return min(candidates, key=lambda w: (self._effective(w, now), w.seq)) if candidates else None
+
+    def acquire(self, cls: int):
+        """Wait for a slot; under a request deadline, raises DeadlineExceeded once it passes."""
+        start = time.monotonic()
+        with self._cond:
+            w = _Waiter(cls, start, next(self._seq))
+            self._waiting.append(w)
+            try:
+                while self._next(time.monotonic()) is not w:
+                    # wake at least once per aging step so promotions take effect
+                    wait = self.aging_seconds if self.aging_seconds > 0 else None
+                    left = deadline.remaining()
+                    if left is not None:
+                        if left <= 0:
+                            metrics.incr(f"llm.queue_deadline.{CLASS_NAMES[cls]}")
+                            raise deadline.DeadlineExceeded("dispatch")
+                        wait = left if wait is None else min(wait, left)
+                    self._cond.wait(wait)
+            finally:
+                self._waiting.remove(w)
+                self._cond.notify_all()  # the next waiter in line may fit in a remaining slot
+            self.running[cls] += 1
+        waited = time.monotonic() - start
+        metrics.observe(f"llm.queue_wait.{CLASS_NAMES[cls]}", waited)
+        metrics.incr(f"llm.dispatched.{CLASS_NAMES[cls]}")
+        if self._effective(w, start + waited) != cls:
+            metrics.incr(f"llm.dispatched_aged.{CLASS_NAMES[cls]}")
+
+    def try_acquire(self, cls: int) -> bool:
+        """Take a slot only if one is free right now and nobody is waiting (used for hedged calls)."""
+        with self._cond:
+            if self._waiting or not self._eligible(_Waiter(cls, time.monotonic(), -1), time.monotonic()):
+                return False
+            self.running[cls] += 1
+        metrics.incr(f"llm.dispatched.{CLASS_NAMES[cls]}")
+        return True
+
+    def release(self, cls: int):
+        with self._cond:
+            self.running[cls] -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, cls: int) -> Iterator[None]:
+        self.acquire(cls)
+        try:
+            yield
+        finally:
+            self.release(cls)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._cond:
+            waiting = [0, 0, 0]
+            for w in self._waiting:
+                waiting[w.cls] += 1
+            return {name: {"running": self.running[i], "waiting": waiting[i], "limit": self.class_limits[i]}
+                    for i, name in enumerate(CLASS_NAMES)}
+
+
+def _build() -> Dispatcher:
+    total = config.LLM_MAX_CONCURRENT
+    return Dispatcher(
+        total,
+        [total, config.LLM_NEAR_REAL_TIME_MAX_CONCURRENT, config.LLM_BATCH_MAX_CONCURRENT],
+        config.LLM_INTERACTIVE_RESERVED,
+        config.LLM_PRIORITY_AGING_SECONDS,
+    )
+
+dispatcher = _build()
+
+def scheduler_stats() -> Dict[str, Dict[str, int]]:
+    return dispatcher.stats()
+
+def _reset_after_fork():
+    global dispatcher
+    dispatcher = _build()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,139 @@
+from array import array
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+# Append-only log of an interview's questions, answers and judge lines.
+#
+# A TurnLog is an immutable view: (shared store, prefix counts). Appending
+# returns a new TurnLog; when the log is the newest one on its store that is an
+# O(1) append to the shared arrays, so every older TurnLog (a snapshot) keeps
+# seeing exactly its own prefix without any copying. Appending to an older
+# snapshot copies its prefix into a fresh store first (copy on divergence).
+# The "Q: ..."/"A: ..." history, the question list and the judge lines are
+# lazy read-only sequences over the store, rendered only when read.
+#
+# Stores are not locked: each turn builds its own log from the stored session
+# (agents/functions.judge_step), so a store is only appended to by one thread.
+
+QUESTION, ANSWER, JUDGE = 0, 1, 2
+_HISTORY = 3  # index over QUESTION and ANSWER entries
+_PREFIX = ("Q: ", "A: ")
+
+class _Store:
+    __slots__ = ("kinds", "texts", "positions")
+
+    def __init__(self):
+        self.kinds = array("B")
+        self.texts: List[str] = []
+        # entry positions per kind, plus one index for the Q/A history
+        self.positions = (array("I"), array("I"), array("I"), array("I"))
+
+
+class LogView(Sequence):
+    """Read-only, lazily rendered sequence over one index of a TurnLog."""
+    __slots__ = ("_store", "_index", "_len", "_prefixed")
+
+    def __init__(self, store: _Store, index: int, length: int, prefixed: bool):
+        self._store = store
+        self._index = index
+        self._len = length
+        self._prefixed = prefixed
+
+    def _render(self, pos: int) -> str:
+        text = self._store.texts[pos]
+        return _PREFIX[self._store.kinds[pos]] + text if self._prefixed else text
+
+    def __len__(self) -> int:
+        return self._len
+
+    @overload
+    def __getitem__(self, i: int) -> str: ...
+    @overload
+    def __getitem__(self, i: slice) -> List[str]: ...
+    def __getitem__(self, i: Union[int, slice]):
+        positions = self._store.positions[self._index]
+        if isinstance(i, slice):
+            return [self._render(positions[j]) for j in range(*i.indices(self._len))]
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("log index out of range")
+        return self._render(positions[i])
+
+    def __iter__(self) -> Iterator[str]:
+        positions = self._store.positions[self._index]
+        for j in range(self._len):
+            yield self._render(positions[j])
+
+    def __repr__(self) -> str:
+        return f"LogView({list(self)!r})"
+
+
+class TurnLog:
+    """Immutable, structurally shared interview log. See the module comment."""
+    __slots__ = ("_store", "_n", "_counts")
+
+    def __init__(self, _store: Optional[_Store] = None, _n: int = 0, _counts: Tuple[int, int, int, int] = (0, 0, 0, 0)):
+        self._store = _store if _store is not None else _Store()
+        self._n = _n
+        self._counts = _counts
+
+    @classmethod
+    def from_history(cls, history: Iterable[str], judge_lines: Iterable[str] = ()) -> "TurnLog":
+        """Build a log from stored "Q: ..."/"A: ..." lines (and judge lines, appended after them)."""
+        log = cls()
+        for line in history:
+            if line.startswith("Q:"):
+                log = log.ask(line[2:].strip())
+            elif line.startswith("A:"):
+                log = log.answer(line[2:].strip())
+        for line in judge_lines:
+            log = log.judge(line)
+        return log
+
+    def _append(self, kind: int, text: str) -> "TurnLog":
+        store = self._store
+        if len(store.kinds) != self._n:
+            store = self._diverge()
+        pos = len(store.kinds)
+        store.kinds.append(kind)
+        store.texts.append(text)
+        store.positions[kind].append(pos)
+        counts = list(self._counts)
+        counts[kind] += 1
+        if kind != JUDGE:
+            store.positions[_HISTORY].append(pos)
+            counts[_HISTORY] += 1
+        return TurnLog(store, pos + 1, tuple(counts))
+
+    def _diverge(self) -> _Store:
+        """A private copy of this log's prefix, for appending to a non-latest snapshot."""
+        store = _Store()
+        store.kinds = self._store.kinds[:self._n]
+        store.texts = self._store.texts[:self._n]
+        store.positions = tuple(p[:c] for p, c in zip(self._store.positions, self._counts))
+        return store
+
+    def ask(self, question: str) -> "TurnLog":
+        return self._append(QUESTION, question)
+
+    def answer(self, answer: str) -> "TurnLog":
+        return self._append(ANSWER, answer)
+
+    def judge(self, line: str) -> "TurnLog":
+        return self._append(JUDGE, line)
+
+    def history(self) -> LogView:
+        """The "Q: ..."/"A: ..." lines, oldest first."""
+        return LogView(self._store, _HISTORY, self._counts[_HISTORY], True)
+
+    def questions(self) -> LogView:
+        return LogView(self._store, QUESTION, self._counts[QUESTION], False)
+
+    def judge_lines(self) -> LogView:
+        return LogView(self._store, JUDGE, self._counts[JUDGE], False)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __repr__(self) -> str:
+        return f"TurnLog(entries={self._n}, questions={self._counts[QUESTION]}, answers={self._counts[ANSWER]})"
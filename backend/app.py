@@ -1,7 +1,15 @@
-from flask import Flask
+import hmac
+from flask import Flask, jsonify, request
 from flask_cors import CORS
+import metrics
+from agents.agents import judge_cascade_stats
+from agents.scheduler import scheduler_stats
+from services.admission import admission_stats
+from services import warmup, audio_store, pending_evals
+from config import METRICS_TOKEN, WARMUP_ON_START
 from routes.auth_routes import auth_bp
 from routes.interview import bp
+from routes.interview_ws import sock
 app = Flask(__name__)
 
 FRONTEND_ORIGIN = "http://localhost:5173"  # <-- your Vite port
@@ -16,5 +24,46 @@ CORS(
 
 app.register_blueprint(auth_bp, url_prefix="/api/auth")
 app.register_blueprint(bp, url_prefix="/api/interview")
+sock.init_app(app)
+
+LOOPBACK = ("127.0.0.1", "::1")
+
+def metrics_allowed() -> bool:
+    """With METRICS_TOKEN set, the caller must present it as a bearer token; without it, only loopback callers."""
+    if METRICS_TOKEN:
+        auth = request.headers.get("Authorization", "")
+        return hmac.compare_digest(auth.encode("utf-8"), f"Bearer {METRICS_TOKEN}".encode("utf-8"))
+    return request.remote_addr in LOOPBACK
+
+@app.get("/metrics")
+def metrics_route():
+    if not metrics_allowed():
+        return jsonify({"error": "Forbidden"}), 403
+    return jsonify({
+        **metrics.snapshot(),
+        "judge_cascade": judge_cascade_stats(),
+        "admission": admission_stats(),
+        "llm_scheduler": scheduler_stats(),
+        "audio_store": audio_store.audio_store_stats(),
+    })
+
+@app.get("/ready")
+def ready_route():
+    """Readiness probe for the load balancer: 200 once every model and the database are warm, else 503."""
+    report = warmup.readiness()
+    return jsonify(report), (200 if report["ready"] else 503)
+
+# background threads start in each worker process on its first request, never at
+# import: a thread started in a preloading master would not survive the fork
+if WARMUP_ON_START:
+    # warm models in the background
+    app.before_request(warmup.start)
+
+# evict stored recordings by age and quota in the background
+app.before_request(audio_store.start)
+
+# judge again pending evals whose background job never finished
+app.before_request(pending_evals.start)
+
 if __name__ == "__main__":
     app.run(host="127.0.0.1", port=5000, debug=True)
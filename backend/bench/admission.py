@@ -0,0 +1,74 @@
+"""
+Load-shedding check for the interview blueprint's admission control.
+
+Replaces the Supabase and model calls behind /start with stand-ins that sleep
+for --backend-latency seconds, fires a burst of concurrent requests from
+several users through the Flask test client, and reports how many were
+admitted, how many got 429, and the latency of the admitted ones.
+
+Usage (from backend/):
+    python -m bench.admission [--users 30] [--per-user 3] [--backend-latency 0.5]
+"""
+import argparse
+import statistics
+import threading
+import time
+from collections import Counter
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=30)
+    parser.add_argument("--per-user", type=int, default=3)
+    parser.add_argument("--backend-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    import routes.interview as interview
+    from app import app
+    from services.admission import admission_stats
+
+    def slow_first_question(mode):
+        time.sleep(args.backend_latency)
+        return "Stand-in question?", "stand-in", ["Q: Stand-in question?"]
+
+    interview.get_user_id_from_auth = lambda header: (True, header.split()[-1]) if header else (False, "missing")
+    interview.create_session = lambda user_id, track, n: f"session-{user_id}"
+    interview.insert_question = lambda session_id, turn, q, topic=None: "qa"
+    interview.first_question_logic = slow_first_question
+
+    statuses = Counter()
+    latencies = []
+    retry_after = Counter()
+    lock = threading.Lock()
+
+    def fire(user: str):
+        with app.test_client() as client:
+            t0 = time.perf_counter()
+            resp = client.post("/api/interview/start", json={"track": "technical"},
+                               headers={"Authorization": f"Bearer {user}"})
+            elapsed = time.perf_counter() - t0
+        with lock:
+            statuses[resp.status_code] += 1
+            if resp.status_code == 200:
+                latencies.append(elapsed)
+            elif resp.status_code == 429:
+                retry_after[resp.headers.get("Retry-After")] += 1
+
+    threads = [threading.Thread(target=fire, args=(f"user{u}",))
+               for u in range(args.users) for _ in range(args.per_user)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+
+    print(f"{len(threads)} requests in {wall:.2f}s: {dict(statuses)}")
+    if latencies:
+        latencies.sort()
+        print(f"admitted latency: p50 {statistics.median(latencies):.2f}s, max {latencies[-1]:.2f}s")
+    if retry_after:
+        print(f"Retry-After values: {dict(retry_after)}")
+    print(f"gates after run: {admission_stats()}")
+
+if __name__ == "__main__":
+    main()
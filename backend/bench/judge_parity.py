@@ -0,0 +1,109 @@
+"""
+Long-answer judging: parity with the direct path, and latency against length.
+
+Parity: judges normal-length answers both through judge_answer() (the
+cascade, which they never leave) and through judge_long_answer() (chunked
+map-reduce forced on), then reports how often the two scores agree exactly
+and within one point. Answers are scripted personas from bench.simulate, or
+stored answers with --from-db N.
+
+Latency: builds answers of --lengths words and times the chunked path
+against a single judge call holding the whole untruncated answer.
+
+Usage (from backend/, model server running):
+    python -m bench.judge_parity [--answers 40] [--lengths 300,1500,4000,8000]
+    python -m bench.judge_parity --stand-in
+"""
+import argparse
+import random
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+import config
+from agents import agents as ag
+from agents.prompts import interview_judge_prompt
+from agents.prompts import count_tokens
+from bench.simulate import StandInClient, scripted_answer, _TECH_POINTS, _FILLER
+
+def sample_answers(n: int, seed: int) -> List[Tuple[str, str, str]]:
+    """(mode, question, answer) triples from the scripted personas."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        persona = ("strong", "average", "weak", "rambling")[i % 4]
+        mode = "technical" if i % 2 == 0 else "behavioral"
+        question = f"Stand-in {mode} question {i}?"
+        out.append((mode, question, scripted_answer(persona, mode, question, rng)))
+    return out
+
+def db_answers(n: int) -> List[Tuple[str, str, str]]:
+    from db.supabase_db import get_answered_qas_page
+    rows = get_answered_qas_page(None, n)
+    return [((qa.get("sessions") or {}).get("track") or "technical", qa["question"], qa["answer"]) for qa in rows]
+
+def long_answer(words: int, rng: random.Random) -> str:
+    out: List[str] = []
+    while len(out) < words:
+        out.extend((rng.choice(_TECH_POINTS) + ".").split() if rng.random() < 0.6 else rng.choice(_FILLER).split())
+    return " ".join(out[:words])
+
+def parity(answers: List[Tuple[str, str, str]]) -> Dict[str, float]:
+    diffs = []
+    for mode, question, answer in answers:
+        _, direct, path = ag.judge_answer(mode, question, answer, "")
+        assert path != "chunked", "normal-length answer took the long-answer path"
+        chunked = ag.parse_judge_score(ag.judge_long_answer(mode, question, answer, ""))
+        if direct is not None and chunked is not None:
+            diffs.append(chunked - direct)
+    n = len(diffs) or 1
+    return {
+        "compared": len(diffs),
+        "exact": sum(d == 0 for d in diffs) / n,
+        "within_1": sum(abs(d) <= 1 for d in diffs) / n,
+        "mean_shift": statistics.fmean(diffs) if diffs else 0.0,
+    }
+
+def direct_seconds(mode: str, question: str, answer: str) -> float:
+    """One judge call with the whole answer in the prompt (no truncation, no chunking)."""
+    messages = [
+        {"role": "system", "content": ag.get_judge_system_prompt()},
+        {"role": "user", "content": ag.get_judge_user_and_interviewer_prompt(mode, question, answer, "")},
+    ]
+    start = time.perf_counter()
+    ag.chat_completion(ag.JUDGE_MODEL, messages, temperature=0.2, max_tokens=80, timeout=600, purpose="judge")
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, default=40)
+    parser.add_argument("--from-db", type=int, default=0, help="use this many stored answers instead of personas")
+    parser.add_argument("--lengths", default="300,1500,4000,8000", help="answer lengths (words) for the latency table")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--stand-in", action="store_true", help="use a local fake model server")
+    parser.add_argument("--stand-in-tps", type=float, default=400.0)
+    parser.add_argument("--stand-in-prefill-tps", type=float, default=2000.0)
+    args = parser.parse_args()
+
+    if args.stand_in:
+        ag._client = StandInClient(args.stand_in_tps, args.stand_in_prefill_tps, args.seed)
+
+    answers = db_answers(args.from_db) if args.from_db else sample_answers(args.answers, args.seed)
+    answers = [a for a in answers if count_tokens(a[2]) <= config.JUDGE_CHUNK_THRESHOLD_TOKENS]
+    print(f"parity on {len(answers)} normal-length answers: {parity(answers)}")
+
+    # direct baseline: lift the prompt caps so the whole answer is prefilled
+    interview_judge_prompt.JUDGE_ANSWER_TOKEN_BUDGET = 10 ** 9
+    config.PROMPT_TOKEN_BUDGET = 10 ** 9
+    rng = random.Random(args.seed)
+    print(f"{'words':>6} {'tokens':>7} {'direct':>8} {'chunked':>8}")
+    for words in (int(w) for w in args.lengths.split(",")):
+        answer = long_answer(words, rng)
+        direct = direct_seconds("technical", "Design a rate limiter.", answer)
+        start = time.perf_counter()
+        ag.judge_long_answer("technical", "Design a rate limiter.", answer, "")
+        chunked = time.perf_counter() - start
+        print(f"{words:>6} {count_tokens(answer):>7} {direct:>7.2f}s {chunked:>7.2f}s")
+
+if __name__ == "__main__":
+    main()
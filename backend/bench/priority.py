@@ -0,0 +1,109 @@
+"""
+Interactive latency under background load, with and without priority dispatch.
+
+Stands in a model server that runs --server-slots calls at a time (FIFO, like
+a local server with a fixed number of parallel sequences). A steady stream of
+interactive calls (short judge/interviewer-sized completions) runs alone,
+then again next to a flood of batch calls and near-real-time coaching calls
+(long completions). The flood is run twice: with every call admitted straight
+through to the server, and through the agents/scheduler.py dispatcher using
+the LLM_* settings. Reports interactive p50/p95/max latency and queue wait
+per class.
+
+Usage (from backend/):
+    python -m bench.priority [--interactive 40] [--batch 60] [--server-slots 4]
+"""
+import argparse
+import statistics
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+
+import agents.agents as ag
+from agents import scheduler
+import config
+import metrics
+
+class SlottedServer:
+    """Mimics client.chat.completions.create with a fixed number of parallel slots (FIFO)."""
+
+    def __init__(self, slots: int, seconds_per_token: float):
+        self.slots = threading.Semaphore(slots)
+        self.seconds_per_token = seconds_per_token
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model: str, messages: List[Dict[str, str]], max_tokens: int, **_):
+        with self.slots:
+            time.sleep(max_tokens * self.seconds_per_token)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="Score: 4. Feedback: ok."))],
+            usage=SimpleNamespace(prompt_tokens=50, completion_tokens=max_tokens),
+        )
+
+def call(cls: int, max_tokens: int, purpose: str, latencies: List[float], lock: threading.Lock):
+    with scheduler.priority(cls):
+        start = time.perf_counter()
+        ag.chat_completion("stand-in", [{"role": "user", "content": "x"}], temperature=0.0,
+                           max_tokens=max_tokens, timeout=60, purpose=purpose)
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+def run(label: str, args, flood: bool) -> Dict[str, float]:
+    metrics.reset()
+    interactive: List[float] = []
+    background: List[float] = []
+    lock = threading.Lock()
+    threads = []
+    if flood:
+        for i in range(args.batch):
+            cls = scheduler.NEAR_REAL_TIME if i % 4 == 0 else scheduler.BATCH
+            threads.append(threading.Thread(target=call, args=(cls, 900, "background", background, lock)))
+    for t in threads:
+        t.start()
+    time.sleep(0.05)  # let the flood queue up first
+
+    turns = []
+    for _ in range(args.interactive):
+        t = threading.Thread(target=call, args=(scheduler.INTERACTIVE, 80, "judge", interactive, lock))
+        t.start()
+        turns.append(t)
+        time.sleep(args.interval)
+    for t in turns:
+        t.join()
+    for t in threads:
+        t.join()
+
+    interactive.sort()
+    out = {
+        "p50": statistics.median(interactive),
+        "p95": interactive[int(0.95 * (len(interactive) - 1))],
+        "max": interactive[-1],
+    }
+    waits = {name: metrics.percentile(f"llm.queue_wait.{name}", 95) for name in scheduler.CLASS_NAMES}
+    print(f"{label:<28} interactive p50 {out['p50']:.2f}s  p95 {out['p95']:.2f}s  max {out['max']:.2f}s  "
+          f"queue wait p95 " + ", ".join(f"{k} {v:.2f}s" for k, v in waits.items()))
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interactive", type=int, default=40, help="interactive calls, one every --interval")
+    parser.add_argument("--interval", type=float, default=0.1)
+    parser.add_argument("--batch", type=int, default=60, help="background calls queued at once")
+    parser.add_argument("--server-slots", type=int, default=config.LLM_MAX_CONCURRENT)
+    parser.add_argument("--seconds-per-token", type=float, default=0.002)
+    args = parser.parse_args()
+
+    ag._client = SlottedServer(args.server_slots, args.seconds_per_token)
+    scheduled = scheduler.dispatcher
+    unlimited = 10 ** 6
+
+    run("interactive only", args, flood=False)
+    scheduler.dispatcher = scheduler.Dispatcher(unlimited, [unlimited] * 3, 0, 0)
+    run("flood, no dispatch", args, flood=True)
+    scheduler.dispatcher = scheduled
+    run("flood, priority dispatch", args, flood=True)
+    print(f"dispatcher: {scheduler.scheduler_stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Headless synthetic interviews for model throughput comparisons.
+
+Runs many interviews concurrently (asyncio tasks, model calls on a bounded
+thread pool) by driving the graph's nodes directly: interviewer_node asks,
+a candidate persona answers, judge_node scores, and generate_coaching_tips
+runs once at the end. Each --config is run in turn with the same personas
+and reports per-node latency, completion tokens/sec per purpose, judge
+cascade paths and the score distribution per persona.
+
+Personas are scripted (strong, average, weak, rambling) or, with
+--llm-candidate MODEL, answered by a model. --stand-in replaces the model
+server with a local fake whose latency scales with --stand-in-tps, so the
+harness itself can be checked without GPUs.
+
+Usage (from backend/, model server running):
+    python -m bench.simulate --interviews 200 --concurrency 32 \\
+        --config base:interview=qwen2.5:7b-instruct,judge=qwen2.5:7b-instruct \\
+        --config q4:interview=qwen2.5:7b-instruct-q4_K_M,judge=qwen2.5:7b-instruct-q4_K_M,fast=
+    python -m bench.simulate --stand-in --interviews 1000 --concurrency 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import metrics
+from agents import agents as ag
+
+PURPOSES = ("interviewer", "judge", "coach", "candidate")
+
+# ---- candidate personas ----
+_FILLER = ("so basically", "I think", "um", "you know", "in my experience", "to be honest")
+_TECH_POINTS = ("use a hash map for O(1) lookups", "sort first, then two pointers, O(n log n)",
+                "handle the empty input and duplicates", "a heap keeps the top k in O(n log k)",
+                "trade memory for speed with caching", "BFS finds the shortest path in unweighted graphs")
+_STAR_POINTS = ("the situation was a missed deadline on a team project", "my task was to coordinate the fix",
+                "I split the work and set daily check-ins", "we shipped two days early and cut bugs by 30%",
+                "I asked for feedback and changed my approach", "the result was a 20% faster release")
+
+def scripted_answer(persona: str, mode: str, question: str, rng: random.Random) -> str:
+    points = _TECH_POINTS if mode == "technical" else _STAR_POINTS
+    if persona == "strong":
+        return ". ".join(rng.sample(points, 4)) + "."
+    if persona == "average":
+        return ". ".join(rng.sample(points, 2)) + "."
+    if persona == "weak":
+        return f"{rng.choice(_FILLER)}, I'm not sure, maybe {rng.choice(points).split()[-1]}?"
+    # rambling: long, few concrete points
+    words = [rng.choice(_FILLER) for _ in range(120)] + list(rng.sample(points, 2))
+    rng.shuffle(words)
+    return " ".join(words)
+
+def llm_answer(model: str, persona: str, mode: str, question: str) -> str:
+    style = {"strong": "an excellent, concise", "average": "an average, somewhat vague",
+             "weak": "a weak, unsure", "rambling": "a long, rambling"}[persona]
+    return ag.chat_completion(model, [
+        {"role": "system", "content": f"You are a job candidate giving {style} answer. Reply with the answer only."},
+        {"role": "user", "content": f"{mode.title()} interview question: {question}"},
+    ], temperature=0.9, max_tokens=200, timeout=120, purpose="candidate")
+
+# ---- stand-in model server ----
+class StandInClient:
+    """Mimics client.chat.completions.create: sleeps for prefill + decode time, returns plausible text."""
+
+    def __init__(self, tokens_per_sec: float, prefill_tokens_per_sec: float, seed: int):
+        self.tps = tokens_per_sec
+        self.prefill_tps = prefill_tokens_per_sec
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model: str, messages: List[Dict[str, str]], max_tokens: int, **_):
+        prompt = " ".join(m["content"] for m in messages)
+        system = messages[0]["content"] if messages else ""
+        with self.lock:
+            r = self.rng.random()
+        if "condense" in system.lower():
+            # key-point extraction for long answers: keep the distinct technical-looking words of the part
+            part = prompt.split("Answer part", 1)[-1].split("\n", 1)[-1]
+            text = "- " + " ".join(dict.fromkeys(re.findall(r"[a-z]{4,}", part.lower())))
+            text = text[:max_tokens * 4]
+        elif "judge" in system.lower():
+            answer = prompt.rsplit("Candidate Answer:", 1)[-1]
+            score = max(1, min(5, 1 + len(set(re.findall(r"[a-z]{4,}", answer.lower()))) // 8 + (r > 0.8)))
+            text = f"Score: {score}. Feedback: stand-in judge line."
+        elif "coach" in system.lower() or "tips" in prompt.lower():
+            text = "- Practice structuring answers.\n- Quantify results.\n- State complexity."
+        else:
+            text = "Stand-in question about " + random.Random(prompt).choice(_TECH_POINTS + _STAR_POINTS) + "?"
+        completion = min(max_tokens, max(1, len(text) // 4))
+        prompt_tokens = len(prompt) // 4
+        time.sleep(prompt_tokens / self.prefill_tps + completion / self.tps)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+            usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion),
+        )
+
+# ---- one interview ----
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.node_seconds: Dict[str, List[float]] = {"interviewer": [], "judge": [], "coach": [], "candidate": []}
+        self.scores: Dict[str, List[int]] = {}
+        self.paths: Dict[str, int] = {}
+        self.failures = 0
+
+    def timed(self, node: str, fn, *args):
+        start = time.perf_counter()
+        out = fn(*args)
+        with self.lock:
+            self.node_seconds[node].append(time.perf_counter() - start)
+        return out
+
+async def run_interview(rec: Recorder, persona: str, mode: str, rounds: int, coach: bool,
+                        llm_candidate: Optional[str], seed: int):
+    rng = random.Random(seed)
+    state = ag.initial_state(mode)
+    try:
+        for _ in range(rounds):
+            state = await asyncio.to_thread(rec.timed, "interviewer", ag.interviewer_node, state)
+            if llm_candidate:
+                answer = await asyncio.to_thread(rec.timed, "candidate", llm_answer, llm_candidate, persona, mode, state["question"])
+            else:
+                answer = scripted_answer(persona, mode, state["question"], rng)
+            state = ag.process_candidate_answer(state, answer)
+            state = await asyncio.to_thread(rec.timed, "judge", ag.judge_node, state)
+            with rec.lock:
+                if state["judge_score"]:
+                    rec.scores.setdefault(persona, []).append(int(state["judge_score"]))
+                rec.paths[state["judge_path"]] = rec.paths.get(state["judge_path"], 0) + 1
+        if coach:
+            await asyncio.to_thread(rec.timed, "coach", ag.generate_coaching_tips,
+                                    mode, state["log"].history(), state["log"].judge_lines())
+    except Exception as e:
+        with rec.lock:
+            rec.failures += 1
+        print(f"Interview failed ({persona}/{mode}): {e}")
+
+# ---- per-config run ----
+def parse_config(spec: str) -> Dict[str, str]:
+    """'name:interview=M,judge=M,fast=M,coach=M' -> dict; omitted keys keep the current env models."""
+    name, _, rest = spec.partition(":")
+    cfg = {"name": name, "interview": ag.INTERVIEW_MODEL, "judge": ag.JUDGE_MODEL,
+           "fast": ag.JUDGE_FAST_MODEL, "coach": ag.COACH_MODEL}
+    for part in filter(None, rest.split(",")):
+        key, _, value = part.partition("=")
+        if key not in cfg or key == "name":
+            raise SystemExit(f"Unknown config key {key!r} in {spec!r}")
+        cfg[key] = value
+    return cfg
+
+def apply_config(cfg: Dict[str, str]):
+    ag.INTERVIEW_MODEL = cfg["interview"]
+    ag.JUDGE_MODEL = cfg["judge"]
+    ag.JUDGE_FAST_MODEL = cfg["fast"]
+    ag.COACH_MODEL = cfg["coach"]
+
+def _latency_summary(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    a = np.asarray(values) * 1000
+    return {"n": int(a.size), "p50_ms": round(float(np.percentile(a, 50)), 1),
+            "p95_ms": round(float(np.percentile(a, 95)), 1), "mean_ms": round(float(a.mean()), 1)}
+
+def _score_summary(values: List[int]) -> Dict[str, Any]:
+    a = np.asarray(values, dtype=np.int64)
+    hist = np.bincount(a, minlength=6)[1:6]
+    return {"n": int(a.size), "mean": round(float(a.mean()), 3), "std": round(float(a.std()), 3),
+            "distribution": {str(s): int(c) for s, c in zip(range(1, 6), hist)}}
+
+async def run_config(cfg: Dict[str, str], args) -> Dict[str, Any]:
+    apply_config(cfg)
+    rec = Recorder()
+    before = {p: metrics.counter(f"llm.completion_tokens.{p}") for p in PURPOSES}
+    personas = args.personas.split(",")
+    modes = args.modes.split(",")
+
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=args.concurrency))
+    gate = asyncio.Semaphore(args.concurrency)
+
+    async def one(i: int):
+        async with gate:
+            await run_interview(rec, personas[i % len(personas)], modes[(i // len(personas)) % len(modes)],
+                                args.rounds, not args.no_coach, args.llm_candidate, args.seed + i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.interviews)))
+    wall = time.perf_counter() - start
+
+    tokens = {p: metrics.counter(f"llm.completion_tokens.{p}") - before[p] for p in PURPOSES}
+    return {
+        "config": cfg,
+        "interviews": args.interviews,
+        "failures": rec.failures,
+        "wall_seconds": round(wall, 2),
+        "interviews_per_sec": round(args.interviews / wall, 3),
+        "completion_tokens_per_sec": {p: round(t / wall, 1) for p, t in tokens.items() if t},
+        "completion_tokens_per_sec_total": round(sum(tokens.values()) / wall, 1),
+        "node_latency": {n: s for n, v in rec.node_seconds.items() if (s := _latency_summary(v))},
+        "judge_paths": rec.paths,
+        "scores": {p: _score_summary(v) for p, v in sorted(rec.scores.items())},
+    }
+
+def print_report(r: Dict[str, Any]):
+    cfg = r["config"]
+    print(f"\n== {cfg['name']}: interview={cfg['interview']} judge={cfg['judge']} "
+          f"fast={cfg['fast'] or '-'} coach={cfg['coach']}")
+    print(f"{r['interviews']} interviews in {r['wall_seconds']} s ({r['interviews_per_sec']}/s), "
+          f"{r['failures']} failed, {r['completion_tokens_per_sec_total']} completion tok/s")
+    for node, s in r["node_latency"].items():
+        print(f"  {node:<12} n={s['n']:<6} p50 {s['p50_ms']:8.1f} ms  p95 {s['p95_ms']:8.1f} ms")
+    print(f"  judge paths: {r['judge_paths']}")
+    for persona, s in r["scores"].items():
+        print(f"  {persona:<9} mean {s['mean']:.2f} ± {s['std']:.2f}  {s['distribution']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", action="append", default=[],
+                        help="name:interview=M,judge=M,fast=M,coach=M (repeatable; default: current env models)")
+    parser.add_argument("--interviews", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16, help="interviews in flight at once")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--personas", default="strong,average,weak,rambling")
+    parser.add_argument("--modes", default="technical,behavioral")
+    parser.add_argument("--no-coach", action="store_true")
+    parser.add_argument("--llm-candidate", metavar="MODEL", help="answer with this model instead of scripted personas")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stand-in", action="store_true", help="fake model server, no GPU needed")
+    parser.add_argument("--stand-in-tps", type=float, default=400, help="stand-in decode tokens/sec")
+    parser.add_argument("--stand-in-prefill-tps", type=float, default=20000)
+    parser.add_argument("--out", help="also write the results as JSON here")
+    args = parser.parse_args()
+
+    if args.stand_in:
+        ag._client = StandInClient(args.stand_in_tps, args.stand_in_prefill_tps, args.seed)
+
+    results = []
+    for spec in args.config or ["current:"]:
+        cfg = parse_config(spec)
+        result = asyncio.run(run_config(cfg, args))
+        print_report(result)
+        results.append(result)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Startup-time guard for the Flask app.
+
+Imports `app` in fresh interpreters with every credential removed and fails
+if the import errors, takes longer than the budget, or pulls in an SDK that
+should only be loaded on first use.
+
+Usage (from backend/):
+    python -m bench.startup [--runs 5] [--budget-ms 1500]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# SDKs that must stay off the import path; clients are built lazily per process
+LAZY_MODULES = ["openai", "groq", "supabase", "langgraph"]
+
+CREDENTIAL_VARS = [
+    "SUPABASE_URL", "SUPABASE_SERVICE_KEY", "GROQ_KEY",
+    "OPENAI_API_KEY", "OLLAMA_KEY", "OLLAMA_HOST",
+]
+
+PROBE = f"""
+import json, sys, time
+t0 = time.perf_counter()
+import app
+elapsed = time.perf_counter() - t0
+print(json.dumps({{
+    "import_ms": elapsed * 1000,
+    "loaded": [m for m in {LAZY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+def run_once() -> dict:
+    # blank rather than unset, so load_dotenv() can't re-populate them from a local .env
+    env = {**os.environ, **{k: "" for k in CREDENTIAL_VARS}}
+    # the background warm-up thread loads the SDKs on purpose; measure the import alone
+    env["WARMUP_ON_START"] = "0"
+    proc = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=60
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import app failed without credentials:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", "1500")))
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    times = [r["import_ms"] for r in results]
+    median = statistics.median(times)
+    loaded = sorted({m for r in results for m in r["loaded"]})
+
+    print(f"import app: median {median:.0f} ms, min {min(times):.0f} ms, max {max(times):.0f} ms over {args.runs} runs")
+    failures = []
+    if loaded:
+        failures.append(f"eagerly imported: {', '.join(loaded)}")
+    if median > args.budget_ms:
+        failures.append(f"median {median:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+    if failures:
+        raise SystemExit("FAIL: " + "; ".join(failures))
+    print("OK")
+
+if __name__ == "__main__":
+    main()
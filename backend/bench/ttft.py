@@ -0,0 +1,147 @@
+"""
+Time-to-first-token benchmark: legacy vs prefix-stable prompt layout.
+
+Sends the same sequence of judge and interviewer requests to the local model
+server twice, once laid out the old way (short inline judge system message,
+rubric/question/answer interleaved; topic hint before the static rules) and
+once with the current layout (all static content in one leading prefix), and
+reports TTFT percentiles for each. Requests are streamed so the first content
+delta marks the end of prefill.
+
+Usage (from backend/, model server running):
+    python -m bench.ttft [--rounds 20] [--judge-model M] [--interview-model M]
+"""
+import argparse
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from agents.agents import JUDGE_MODEL, INTERVIEW_MODEL, get_client, request_options
+from agents.prompts import (
+    get_interviewer_system_prompt, get_interviewee_prompt,
+    get_judge_system_prompt, get_judge_user_and_interviewer_prompt, topic_for_round
+)
+
+SAMPLES = [
+    ("technical", "How would you detect a cycle in a linked list?",
+     "I would use Floyd's tortoise and hare: two pointers, one moving twice as fast. If they meet there is a cycle. It is O(n) time and O(1) space."),
+    ("behavioral", "Tell me about a time you disagreed with a teammate.",
+     "On a class project my teammate wanted to rewrite the backend. I set up a short meeting, we listed risks, and we agreed to refactor one module first. We shipped on time."),
+    ("technical", "When would you choose a hash map over a balanced BST?",
+     "Hash maps give average O(1) lookups but no ordering; a balanced BST gives O(log n) with ordered iteration and range queries, so I'd pick the BST when order matters."),
+    ("behavioral", "Describe a deadline you nearly missed.",
+     "During finals I underestimated a data pipeline. I re-planned, cut scope to the must-haves, told my manager early, and delivered the core two days later with tests."),
+]
+
+# ---- legacy layouts, kept verbatim for comparison ----
+def legacy_judge_messages(mode: str, question: str, answer: str) -> List[Dict[str, str]]:
+    rubric = (
+        "Grade 1–5 on correctness, completeness, clarity, and tradeoffs. Mention Big-O when relevant."
+        if mode == "technical" else
+        "Grade 1–5 based on STAR: Was the Situation/Task/Action/Result clear and quantified?"
+    )
+    user = f"""
+        You are an AI judge. Evaluate this interview step in one concise line.
+
+        Mode: {mode}
+        Question: {question}
+        Candidate Answer: {answer}
+        Interviewer Feedback:
+
+        {rubric}
+        Reply as: "Score: <1-5>. Feedback: <one short sentence>."
+    """.strip()
+    return [
+        {"role": "system", "content": "You are a concise interview judge. Reply in one short line, in English."},
+        {"role": "user", "content": user},
+    ]
+
+def legacy_interviewer_messages(mode: str, recent: List[str], round_num: int) -> List[Dict[str, str]]:
+    recent_block = "\n".join("- " + q for q in recent[-3:]) if recent else "(none)"
+    style = (
+        "Ask ONE concise TECHNICAL interview question.\n"
+        "- Focus on correctness, tradeoffs, and depth.\n"
+        "- Keep it short (≤25 words)."
+        if mode == "technical" else
+        "Ask ONE concise BEHAVIORAL interview question.\n"
+        "- Use STAR-friendly phrasing (Situation, Task, Action, Result).\n"
+        "- Keep it short (≤25 words)."
+    )
+    user = f"""
+    You are an AI Interviewer.
+    Your sole job is to generate **exactly ONE interview question in English**.
+    Do not include explanations, prefacing text, or anything besides the raw question.
+
+    # Style Guide
+    {style}
+
+    # Context Controls
+    - Focus of this round: {topic_for_round(mode, round_num)}
+    - DO NOT repeat, rephrase, or closely resemble any of the following recent questions:
+    {recent_block}
+
+    # Output Rule
+    Produce one new, in-depth {mode} interview question only.
+    Return only the question text.
+""".strip()
+    return [{"role": "system", "content": get_interviewer_system_prompt()}, {"role": "user", "content": user}]
+
+# ---- current layouts ----
+def judge_messages(mode: str, question: str, answer: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": get_judge_system_prompt()},
+        {"role": "user", "content": get_judge_user_and_interviewer_prompt(mode, question, answer, "")},
+    ]
+
+def interviewer_messages(mode: str, recent: List[str], round_num: int) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": get_interviewer_system_prompt()},
+        {"role": "user", "content": get_interviewee_prompt(mode, recent, round_num)},
+    ]
+
+def ttft(model: str, messages: List[Dict[str, str]], extra: Dict) -> float:
+    start = time.perf_counter()
+    stream = get_client().chat.completions.create(
+        model=model, messages=messages, temperature=0.0, max_tokens=8, stream=True, timeout=300, **extra
+    )
+    first = None
+    for chunk in stream:
+        if first is None and chunk.choices and chunk.choices[0].delta.content:
+            first = time.perf_counter() - start
+    return first if first is not None else time.perf_counter() - start
+
+def run(label: str, model: str, build: Callable[[int], List[Dict[str, str]]], rounds: int, extra: Dict) -> List[float]:
+    ttft(model, build(0), extra)  # load the model; not counted
+    times = [ttft(model, build(i), extra) for i in range(rounds)]
+    times.sort()
+    print(f"{label:<28} p50 {statistics.median(times) * 1000:7.0f} ms   "
+          f"p90 {times[int(0.9 * (len(times) - 1))] * 1000:7.0f} ms")
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--judge-model", default=JUDGE_MODEL)
+    parser.add_argument("--interview-model", default=INTERVIEW_MODEL)
+    args = parser.parse_args()
+
+    def sample(i):
+        return SAMPLES[i % len(SAMPLES)]
+
+    def recent(i):
+        return [s[1] for s in SAMPLES[:i % len(SAMPLES)]]
+
+    print(f"judge model: {args.judge_model}")
+    run("judge / legacy layout", args.judge_model,
+        lambda i: legacy_judge_messages(*sample(i)), args.rounds, {})
+    run("judge / prefix-stable", args.judge_model,
+        lambda i: judge_messages(*sample(i)), args.rounds, request_options())
+
+    print(f"interviewer model: {args.interview_model}")
+    run("interviewer / legacy", args.interview_model,
+        lambda i: legacy_interviewer_messages(sample(i)[0], recent(i), i + 1), args.rounds, {})
+    run("interviewer / prefix-stable", args.interview_model,
+        lambda i: interviewer_messages(sample(i)[0], recent(i), i + 1), args.rounds, request_options())
+
+if __name__ == "__main__":
+    main()
@@ -12,4 +12,125 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")  # Required for Whisper API
 # Supabase
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
-GROQ_KEY = os.getenv("GROQ_KEY")
\ No newline at end of file
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))  # seconds per query
+GROQ_KEY = os.getenv("GROQ_KEY")
+
+# Audio preprocessing before transcription (requires ffmpeg on PATH)
+AUDIO_PREPROCESS = os.getenv("AUDIO_PREPROCESS", "1") == "1"
+AUDIO_TARGET_RATE = int(os.getenv("AUDIO_TARGET_RATE", "16000"))
+AUDIO_OPUS_BITRATE = os.getenv("AUDIO_OPUS_BITRATE", "24k")  # trimmed speech is re-encoded as mono Opus at this rate
+AUDIO_VAD_FRAME_MS = int(os.getenv("AUDIO_VAD_FRAME_MS", "30"))
+AUDIO_VAD_THRESHOLD_DB = float(os.getenv("AUDIO_VAD_THRESHOLD_DB", "-40"))
+AUDIO_VAD_PAD_MS = int(os.getenv("AUDIO_VAD_PAD_MS", "300"))
+
+# Admission control for LLM-backed endpoints (/start, /answer)
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "20"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "5"))
+MODEL_MAX_INFLIGHT = int(os.getenv("MODEL_MAX_INFLIGHT", "4"))
+MODEL_MAX_QUEUE = int(os.getenv("MODEL_MAX_QUEUE", "16"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "30"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "5"))
+
+# GET /metrics: with a token, callers send "Authorization: Bearer <token>"; without one, loopback only
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Model warm-up on startup and keep-alive pings while idle
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "1") == "1"
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "300"))
+KEEPALIVE_INTERVAL = float(os.getenv("KEEPALIVE_INTERVAL", "240"))  # below Ollama's default 5 min unload
+
+# Prompt token budgets (estimated tokens, see agents/prompts/tokens.py)
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "3500"))          # hard cap per call
+JUDGE_ANSWER_TOKEN_BUDGET = int(os.getenv("JUDGE_ANSWER_TOKEN_BUDGET", "1500"))
+COACH_HISTORY_TOKEN_BUDGET = int(os.getenv("COACH_HISTORY_TOKEN_BUDGET", "2000"))
+COACH_JUDGE_TOKEN_BUDGET = int(os.getenv("COACH_JUDGE_TOKEN_BUDGET", "600"))
+PROMPT_LINE_TOKEN_BUDGET = int(os.getenv("PROMPT_LINE_TOKEN_BUDGET", "300"))  # any single history line
+
+# Sent with every local model request so the server keeps the model (and its
+# prompt-prefix KV cache) resident between calls; "" to use the server default
+LLM_KEEP_ALIVE = os.getenv("LLM_KEEP_ALIVE", "30m")
+
+# Priority dispatch of model calls (agents/scheduler.py), per process
+LLM_MAX_CONCURRENT = int(os.getenv("LLM_MAX_CONCURRENT", "4"))
+LLM_NEAR_REAL_TIME_MAX_CONCURRENT = int(os.getenv("LLM_NEAR_REAL_TIME_MAX_CONCURRENT", "2"))
+LLM_BATCH_MAX_CONCURRENT = int(os.getenv("LLM_BATCH_MAX_CONCURRENT", "1"))
+LLM_INTERACTIVE_RESERVED = int(os.getenv("LLM_INTERACTIVE_RESERVED", "1"))       # slots only interactive calls may take
+LLM_PRIORITY_AGING_SECONDS = float(os.getenv("LLM_PRIORITY_AGING_SECONDS", "30"))  # a waiting call rises one class per this
+
+# Turn claiming for /answer: one request processes a turn, duplicates wait for its result
+TURN_CLAIM_LEASE_SECONDS = int(os.getenv("TURN_CLAIM_LEASE_SECONDS", "300"))
+TURN_RESULT_WAIT_SECONDS = float(os.getenv("TURN_RESULT_WAIT_SECONDS", "150"))
+
+# Bulk cohort starts (/api/interview/cohort)
+COHORT_INSTRUCTOR_IDS = {u.strip() for u in os.getenv("COHORT_INSTRUCTOR_IDS", "").split(",") if u.strip()}
+COHORT_MAX_SIZE = int(os.getenv("COHORT_MAX_SIZE", "500"))
+COHORT_QUESTION_POOL = int(os.getenv("COHORT_QUESTION_POOL", "8"))    # distinct first questions per cohort
+COHORT_MAX_PARALLEL = int(os.getenv("COHORT_MAX_PARALLEL", "2"))      # concurrent generation calls per job
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "900"))       # running job with no progress write: its worker is gone
+
+# Sandboxed execution of submitted Python for technical answers (services/code_runner.py)
+CODE_RUNNER_WORKERS = int(os.getenv("CODE_RUNNER_WORKERS", "2"))          # warm workers kept ready
+CODE_RUN_TIMEOUT = float(os.getenv("CODE_RUN_TIMEOUT", "10"))             # wall clock per run
+CODE_RUN_CPU_SECONDS = int(os.getenv("CODE_RUN_CPU_SECONDS", "5"))
+CODE_RUN_MEMORY_MB = int(os.getenv("CODE_RUN_MEMORY_MB", "256"))
+CODE_RUN_UID = int(os.getenv("CODE_RUN_UID", "65534"))                     # submissions run as this uid when the server is root
+CODE_RUN_REQUIRE_ISOLATION = os.getenv("CODE_RUN_REQUIRE_ISOLATION", "1") == "1"  # 0 runs code unisolated if the sandbox can't be set up
+CODE_RUN_CACHE_SIZE = int(os.getenv("CODE_RUN_CACHE_SIZE", "512"))
+CODE_MAX_BYTES = int(os.getenv("CODE_MAX_BYTES", "20000"))                # code + tests
+
+# WebSocket interview channel (/api/interview/ws)
+WS_AUTH_TIMEOUT = float(os.getenv("WS_AUTH_TIMEOUT", "10"))           # seconds to send the auth frame
+WS_IDLE_TIMEOUT = float(os.getenv("WS_IDLE_TIMEOUT", "900"))          # close after this long without a frame
+WS_MAX_AUDIO_BYTES = int(os.getenv("WS_MAX_AUDIO_BYTES", str(25 * 1024 * 1024)))
+
+# Stored technical-interview recordings (services/audio_store.py)
+AUDIO_STORE_DIR = os.getenv("AUDIO_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "storage", "audio"))
+AUDIO_USER_QUOTA_MB = int(os.getenv("AUDIO_USER_QUOTA_MB", "200"))
+AUDIO_GLOBAL_QUOTA_MB = int(os.getenv("AUDIO_GLOBAL_QUOTA_MB", "5000"))
+AUDIO_MAX_AGE_DAYS = float(os.getenv("AUDIO_MAX_AGE_DAYS", "30"))
+AUDIO_MIN_FREE_MB = int(os.getenv("AUDIO_MIN_FREE_MB", "1024"))       # stop storing below this much free disk
+AUDIO_EVICT_INTERVAL = float(os.getenv("AUDIO_EVICT_INTERVAL", "600"))  # also woken when a quota is exceeded
+AUDIO_EVICT_NICE = int(os.getenv("AUDIO_EVICT_NICE", "10"))           # added to the eviction thread's nice value
+
+# Transcript cache keyed by audio hash + transcription settings (services/transcript_cache.py)
+TRANSCRIPT_CACHE_SIZE = int(os.getenv("TRANSCRIPT_CACHE_SIZE", "256"))            # in-process entries
+TRANSCRIPT_CACHE_PATH = os.getenv("TRANSCRIPT_CACHE_PATH", "")                    # sqlite file shared by workers; "" = memory only
+TRANSCRIPT_CACHE_PERSIST_MAX = int(os.getenv("TRANSCRIPT_CACHE_PERSIST_MAX", "20000"))
+
+# Streaming history export (/api/interview/export)
+EXPORT_PAGE_SESSIONS = int(os.getenv("EXPORT_PAGE_SESSIONS", "50"))   # sessions per page (two queries per page)
+
+# Long answers: judged on key points extracted per chunk, in parallel (agents.judge_answer)
+JUDGE_CHUNK_THRESHOLD_TOKENS = int(os.getenv("JUDGE_CHUNK_THRESHOLD_TOKENS", os.getenv("JUDGE_ANSWER_TOKEN_BUDGET", "1500")))
+JUDGE_CHUNK_TOKENS = int(os.getenv("JUDGE_CHUNK_TOKENS", "700"))           # answer tokens per extraction call
+JUDGE_CHUNK_MAX = int(os.getenv("JUDGE_CHUNK_MAX", "8"))                   # longer answers get bigger chunks instead
+JUDGE_CHUNK_MAX_TOKENS = int(os.getenv("JUDGE_CHUNK_MAX_TOKENS", "4000"))  # chunk size ceiling; past it the answer is trimmed
+JUDGE_CHUNK_POINTS_TOKENS = int(os.getenv("JUDGE_CHUNK_POINTS_TOKENS", "120"))  # max_tokens per extraction
+
+# Per-turn deadline for /answer and the WebSocket channel (deadline.py)
+TURN_DEADLINE_SECONDS = float(os.getenv("TURN_DEADLINE_SECONDS", "60"))                   # from request arrival
+TURN_INTERVIEWER_RESERVE_SECONDS = float(os.getenv("TURN_INTERVIEWER_RESERVE_SECONDS", "15"))  # kept back from the judge
+TURN_FINALIZE_RESERVE_SECONDS = float(os.getenv("TURN_FINALIZE_RESERVE_SECONDS", "3"))       # kept back for the final writes
+PENDING_EVAL_RECOVER_AFTER = float(os.getenv("PENDING_EVAL_RECOVER_AFTER", "600"))  # a pending eval this old is judged again
+PENDING_EVAL_SWEEP_INTERVAL = float(os.getenv("PENDING_EVAL_SWEEP_INTERVAL", "300"))
+PENDING_EVAL_SWEEP_BATCH = int(os.getenv("PENDING_EVAL_SWEEP_BATCH", "20"))
+TRANSCRIPTION_TIMEOUT = float(os.getenv("TRANSCRIPTION_TIMEOUT", "60"))
+QUESTION_POOL_SIZE = int(os.getenv("QUESTION_POOL_SIZE", "20"))      # fallback questions kept per track and topic
+
+# Hedged calls (hedging.py): a second attempt when the first runs longer than usual
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "1") == "1"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))              # hedge after this percentile of recent attempts
+HEDGE_MIN_DELAY_SECONDS = float(os.getenv("HEDGE_MIN_DELAY_SECONDS", "1"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))              # no hedging before this many attempts
+HEDGE_BUDGET_PERCENT = float(os.getenv("HEDGE_BUDGET_PERCENT", "5"))       # at most this many hedges per 100 calls
+HEDGE_BUDGET_BURST = float(os.getenv("HEDGE_BUDGET_BURST", "5"))           # hedges that can be banked while calls are fast
+HEDGE_LLM_PURPOSES = {p.strip() for p in os.getenv("HEDGE_LLM_PURPOSES", "judge,judge_extract").split(",") if p.strip()}
+HEDGE_TRANSCRIPTION = os.getenv("HEDGE_TRANSCRIPTION", "1") == "1"
+
+# Provisional scores from the local answer scorer (services/quick_score.py, trained by tools/quick_score.py)
+QUICK_SCORE_MODEL_PATH = os.getenv("QUICK_SCORE_MODEL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "storage", "quick_score.npz"))
+QUICK_SCORE_MIN_CONFIDENCE = float(os.getenv("QUICK_SCORE_MIN_CONFIDENCE", "0.8"))  # below this the judge scores synchronously
+
+# Server-sent-event variants of /start and /answer (services/streaming.py)
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))   # keep-alive comment while nothing else is sent
@@ -16,16 +16,98 @@ create table if not exists qa_pairs (
   turn_index int not null,
   question text not null,
   answer text,
+  claim_token uuid,          -- set by the one /answer request processing this turn
+  claimed_at timestamptz,    -- lease start; a stale claim can be taken over
+  topic text,                -- topic hint the question was asked on; rollups group by it
   created_at timestamptz default now()
 );
 
+alter table qa_pairs add column if not exists claim_token uuid;
+alter table qa_pairs add column if not exists claimed_at timestamptz;
+alter table qa_pairs add column if not exists topic text;
+
 -- 3. Evaluations table (judge feedback belongs to a QA pair)
 create table if not exists evals (
   id uuid primary key default gen_random_uuid(),
   qa_id uuid references qa_pairs(id) on delete cascade,
   ai_interviewer_score int check (ai_interviewer_score between 1 and 5),
   ai_interviewer_feedback text,
+  judge_model text,          -- model that produced the score
+  judge_version text,        -- judge models + prompt fingerprint, see agents.judge_version()
   created_at timestamptz default now()
 );
 
+-- Existing databases: add the judge versioning columns
+alter table evals add column if not exists judge_model text;
+alter table evals add column if not exists judge_version text;
+create index if not exists evals_qa_id_version_idx on evals (qa_id, judge_version);
+
+-- 4. Per-user performance rollups, maintained on every eval write (see bump_user_rollup)
+create table if not exists user_rollups (
+  user_id uuid references auth.users(id) on delete cascade,
+  track text not null,
+  topic text not null,
+  n int not null default 0,
+  score_sum bigint not null default 0,
+  score_sq_sum bigint not null default 0,
+  recent_scores int[] not null default '{}',   -- last p_window scores, oldest first
+  updated_at timestamptz default now(),
+  primary key (user_id, track, topic)
+);
+
+-- Atomic upsert of one score into a rollup row; called through supabase rpc()
+create or replace function bump_user_rollup(
+  p_user_id uuid, p_track text, p_topic text, p_score int, p_window int default 10
+) returns void language sql as $$
+  insert into user_rollups as r (user_id, track, topic, n, score_sum, score_sq_sum, recent_scores)
+  values (p_user_id, p_track, p_topic, 1, p_score, p_score * p_score, array[p_score])
+  on conflict (user_id, track, topic) do update set
+    n = r.n + 1,
+    score_sum = r.score_sum + p_score,
+    score_sq_sum = r.score_sq_sum + p_score * p_score,
+    recent_scores = (r.recent_scores || p_score)[greatest(1, cardinality(r.recent_scores) + 2 - p_window):],
+    updated_at = now();
+$$;
+
+-- Recompute the given users' rollups from each answer's latest scored eval
+-- (tools/rescore.py, after a new judge version supersedes their evals).
+-- Untagged turns roll up under 'general', as in services/rollups.py.
+create or replace function rebuild_user_rollups(p_user_ids uuid[], p_window int default 10)
+returns void language sql as $$
+  delete from user_rollups where user_id = any(p_user_ids);
+  with latest as (
+    select distinct on (e.qa_id)
+      s.user_id, s.track, coalesce(q.topic, 'general') as topic,
+      e.ai_interviewer_score as score, q.created_at as asked_at
+    from evals e
+    join qa_pairs q on q.id = e.qa_id
+    join sessions s on s.id = q.session_id
+    where s.user_id = any(p_user_ids) and s.track is not null and e.ai_interviewer_score is not null
+    order by e.qa_id, e.created_at desc
+  )
+  insert into user_rollups (user_id, track, topic, n, score_sum, score_sq_sum, recent_scores)
+  select user_id, track, topic, count(*), sum(score), sum(score * score),
+         (array_agg(score order by asked_at))[greatest(1, count(*)::int + 1 - p_window):]
+  from latest
+  group by user_id, track, topic;
+$$;
+
+-- 5. Background jobs (services/jobs.py), so any worker can answer a progress poll
+create table if not exists jobs (
+  id uuid primary key default gen_random_uuid(),
+  kind text not null,
+  owner uuid references auth.users(id) on delete cascade,
+  status text not null default 'running',    -- running | done | failed
+  stage text not null default 'queued',
+  done int not null default 0,
+  total int not null default 0,
+  result jsonb,
+  error text,
+  created_at timestamptz default now(),
+  updated_at timestamptz default now(),      -- last progress write; a stale running job lost its worker
+  finished_at timestamptz
+);
+
+create index if not exists jobs_finished_at_idx on jobs (finished_at);
+
 create extension if not exists "pgcrypto";
\ No newline at end of file
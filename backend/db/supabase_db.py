@@ -1,17 +1,46 @@
-from typing import Any, Dict, List, Optional
-from supabase import create_client, Client
-from config import SUPABASE_URL, SUPABASE_SERVICE_KEY
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+from config import SUPABASE_URL, SUPABASE_SERVICE_KEY, SUPABASE_TIMEOUT
+import deadline
 
-_sb: Optional[Client] = None
+if TYPE_CHECKING:
+    from supabase import Client
 
-def sb() -> Client:
+_sb: Optional["Client"] = None
+
+def sb() -> "Client":
+    """Process-wide Supabase client, created on first use (and again in each forked worker)."""
     global _sb
     if _sb is None:
         if SUPABASE_URL is None or SUPABASE_SERVICE_KEY is None:
             raise ValueError("SUPABASE_URL or SUPABASE_SERVICE_KEY not found")
-        _sb = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+        from supabase import create_client, ClientOptions
+        client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY,
+                               options=ClientOptions(postgrest_client_timeout=SUPABASE_TIMEOUT))
+        client.postgrest.session.event_hooks["request"].append(_cap_to_deadline)
+        _sb = client
     return _sb
 
+def _cap_to_deadline(request):
+    """
+    httpx request hook: each query gets SUPABASE_TIMEOUT, or only what is left
+    of the request's deadline, so a stalled database can't hold a turn past it.
+    Raises DeadlineExceeded instead of sending when nothing is left.
+    """
+    import httpx
+    request.extensions["timeout"] = httpx.Timeout(deadline.timeout_for("database", SUPABASE_TIMEOUT)).as_dict()
+
+def _reset_sb_after_fork():
+    global _sb
+    _sb = None
+
+os.register_at_fork(after_in_child=_reset_sb_after_fork)
+
+def _ago(seconds: float) -> str:
+    """Timestamp `seconds` before now, for comparing against timestamptz columns."""
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
 # --- Sessions ---
 def create_session(user_id: str, track: str, num_questions: int) -> str:
     res = sb().table("sessions").insert({
@@ -19,6 +48,15 @@ def create_session(user_id: str, track: str, num_questions: int) -> str:
     }).execute()
     return res.data[0]["id"]
 
+def create_sessions(user_ids: List[str], track: str, num_questions: int) -> List[str]:
+    """Create one session per user in a single multi-row insert; ids come back in input order."""
+    if not user_ids:
+        return []
+    res = sb().table("sessions").insert([
+        {"user_id": u, "track": track, "num_questions": num_questions} for u in user_ids
+    ]).execute()
+    return [row["id"] for row in res.data]
+
 def mark_session_done(session_id: str):
     sb().table("sessions").update({"status": "done", "finished_at": "now()"}).eq("id", session_id).execute()
 
@@ -35,13 +73,49 @@ def get_user_sessions(user_id: str) -> List[Dict[str, Any]]:
            .execute())
     return res.data
 
+def get_user_sessions_page(user_id: str, after: Optional[Tuple[str, str]], limit: int) -> List[Dict[str, Any]]:
+    """
+    One keyset-paginated page of a user's sessions, oldest first, ordered by
+    (created_at, id). Pass the last row's (created_at, id) as `after` (None
+    for the first page).
+    """
+    q = (sb().table("sessions")
+         .select("id,track,num_questions,status,created_at,finished_at")
+         .eq("user_id", user_id))
+    if after:
+        created_at, session_id = after
+        q = q.or_(f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{session_id})')
+    return q.order("created_at", desc=False).order("id", desc=False).limit(limit).execute().data
+
+def get_qas_for_sessions(session_ids: List[str]) -> List[Dict[str, Any]]:
+    """Every QA pair of the given sessions with all their evals embedded (oldest first), in one query."""
+    if not session_ids:
+        return []
+    res = (sb().table("qa_pairs")
+           .select("session_id,turn_index,question,answer,created_at,"
+                   "evals(ai_interviewer_score,ai_interviewer_feedback,judge_model,judge_version,created_at)")
+           .in_("session_id", session_ids)
+           .order("session_id", desc=False)
+           .order("turn_index", desc=False)
+           .order("created_at", desc=False, foreign_table="evals")
+           .execute())
+    return res.data
+
 # --- QA ---
-def insert_question(session_id: str, turn_index: int, question: str) -> str:
+def insert_question(session_id: str, turn_index: int, question: str, topic: Optional[str] = None) -> str:
+    """Insert a turn's question; `topic` is the topic hint it was asked on (rollups group by it)."""
     res = sb().table("qa_pairs").insert({
-        "session_id": session_id, "turn_index": turn_index, "question": question
+        "session_id": session_id, "turn_index": turn_index, "question": question, "topic": topic
     }).execute()
     return res.data[0]["id"]
 
+def insert_questions(rows: List[Dict[str, Any]]) -> List[str]:
+    """Multi-row insert of {"session_id", "turn_index", "question", "topic"} rows in one request."""
+    if not rows:
+        return []
+    res = sb().table("qa_pairs").insert(rows).execute()
+    return [row["id"] for row in res.data]
+
 def get_latest_qa(session_id: str) -> Optional[Dict[str, Any]]:
     res = (sb().table("qa_pairs")
            .select("*").eq("session_id", session_id)
@@ -54,14 +128,156 @@ def get_all_qas(session_id: str) -> List[Dict[str, Any]]:
     res = (sb().table("qa_pairs")
            .select("id,turn_index,question,answer,evals(*)")
            .eq("session_id", session_id)
-           .order("turn_index", desc=False).execute())
+           .order("turn_index", desc=False)
+           .order("created_at", desc=True, foreign_table="evals")  # evals[0] is the latest (re-scoring adds rows)
+           .execute())
     return res.data
 
 def save_answer(qa_id: str, answer: str):
     sb().table("qa_pairs").update({"answer": answer}).eq("id", qa_id).execute()
 
+def claim_turn(qa_id: str, token: str, lease_seconds: int) -> bool:
+    """
+    Atomically claim an unanswered turn for one request. A single conditional
+    UPDATE succeeds only if the turn has no answer and no live claim (a claim
+    older than `lease_seconds` counts as abandoned). Returns True for the winner.
+    """
+    now = datetime.now(timezone.utc)
+    cutoff = (now - timedelta(seconds=lease_seconds)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    res = (sb().table("qa_pairs")
+           .update({"claim_token": token, "claimed_at": now.strftime("%Y-%m-%dT%H:%M:%S.%fZ")})
+           .eq("id", qa_id)
+           .is_("answer", "null")
+           .or_(f"claim_token.is.null,claimed_at.lt.{cutoff}")
+           .execute())
+    return bool(res.data)
+
+def release_turn_claim(qa_id: str, token: str, clear_answer: bool = False):
+    """
+    Give up a claim (e.g. transcription failed) so a retry can take the turn at
+    once. With `clear_answer`, also drop the answer this claim saved, for when
+    judging failed after the save. Runs even when the request's deadline has
+    run out.
+    """
+    with deadline.lifted():
+        _release_turn_claim(qa_id, token, clear_answer)
+
+def _release_turn_claim(qa_id: str, token: str, clear_answer: bool):
+    q = sb().table("qa_pairs")
+    if clear_answer:
+        q = q.update({"claim_token": None, "claimed_at": None, "answer": None}).eq("id", qa_id).eq("claim_token", token)
+    else:
+        q = q.update({"claim_token": None, "claimed_at": None}).eq("id", qa_id).eq("claim_token", token).is_("answer", "null")
+    q.execute()
+
+def save_claimed_answer(qa_id: str, token: str, answer: str) -> bool:
+    """Save the answer only if this request still holds the claim."""
+    res = (sb().table("qa_pairs")
+           .update({"answer": answer})
+           .eq("id", qa_id).eq("claim_token", token).is_("answer", "null")
+           .execute())
+    return bool(res.data)
+
+def get_answered_qas_page(after_id: Optional[str], limit: int) -> List[Dict[str, Any]]:
+    """
+    One keyset-paginated page of answered QA pairs ordered by id, with the
+    session track and existing evals embedded. Pass the last id of the previous
+    page as `after_id` (None for the first page).
+    """
+    q = (sb().table("qa_pairs")
+         .select("id,session_id,turn_index,question,answer,sessions(user_id,track),"
+                 "evals(ai_interviewer_score,judge_version,created_at)")
+         .not_.is_("answer", "null"))
+    if after_id:
+        q = q.gt("id", after_id)
+    return q.order("id", desc=False).limit(limit).execute().data
+
 # --- Evals ---
-def insert_eval(qa_id: str, score: int, feedback: str):
-    sb().table("evals").insert({
-        "qa_id": qa_id, "ai_interviewer_score": score, "ai_interviewer_feedback": feedback
+def insert_eval(qa_id: str, score: Optional[int], feedback: str,
+                judge_model: Optional[str] = None, judge_version: Optional[str] = None) -> str:
+    """Insert an eval row and return its id. A None score marks it pending (see update_eval)."""
+    res = sb().table("evals").insert({
+        "qa_id": qa_id, "ai_interviewer_score": score, "ai_interviewer_feedback": feedback,
+        "judge_model": judge_model, "judge_version": judge_version
     }).execute()
+    return res.data[0]["id"]
+
+def update_eval(eval_id: str, score: int, feedback: str, judge_model: str, judge_version: str) -> bool:
+    """Fill in a pending eval (score still null). Returns False if it was already filled."""
+    res = (sb().table("evals")
+           .update({"ai_interviewer_score": score, "ai_interviewer_feedback": feedback,
+                    "judge_model": judge_model, "judge_version": judge_version})
+           .eq("id", eval_id).is_("ai_interviewer_score", "null")
+           .execute())
+    return bool(res.data)
+
+def get_eval(eval_id: str) -> Optional[Dict[str, Any]]:
+    """An eval with the user its session belongs to (qa_pairs.sessions.user_id), or None."""
+    res = (sb().table("evals")
+           .select("id,ai_interviewer_score,ai_interviewer_feedback,qa_pairs(sessions(user_id))")
+           .eq("id", eval_id).limit(1)
+           .execute())
+    return res.data[0] if res.data else None
+
+def delete_eval(eval_id: str):
+    sb().table("evals").delete().eq("id", eval_id).execute()
+
+def get_stale_pending_evals(older_than_seconds: float, limit: int) -> List[Dict[str, Any]]:
+    """Pending evals (score null) created more than `older_than_seconds` ago, oldest first, with their turn and session."""
+    cutoff = _ago(older_than_seconds)
+    res = (sb().table("evals")
+           .select("id,created_at,qa_pairs(id,turn_index,topic,question,answer,sessions(user_id,track))")
+           .is_("ai_interviewer_score", "null")
+           .lt("created_at", cutoff)
+           .order("created_at")
+           .limit(limit)
+           .execute())
+    return res.data
+
+def insert_evals(rows: List[Dict[str, Any]]):
+    """Multi-row insert of eval rows (same columns as insert_eval)."""
+    if rows:
+        sb().table("evals").insert(rows).execute()
+
+
+# --- Jobs ---
+def insert_job(kind: str, owner: str) -> str:
+    res = sb().table("jobs").insert({"kind": kind, "owner": owner}).execute()
+    return res.data[0]["id"]
+
+def update_job(job_id: str, fields: Dict[str, Any]):
+    sb().table("jobs").update({**fields, "updated_at": "now()"}).eq("id", job_id).execute()
+
+def get_job_row(job_id: str, owner: str) -> Optional[Dict[str, Any]]:
+    res = sb().table("jobs").select("*").eq("id", job_id).eq("owner", owner).limit(1).execute()
+    return res.data[0] if res.data else None
+
+def fail_stale_job(job_id: str, older_than_seconds: float, error: str):
+    """Mark a running job failed if it has had no progress write for `older_than_seconds`."""
+    (sb().table("jobs")
+     .update({"status": "failed", "error": error, "finished_at": "now()", "updated_at": "now()"})
+     .eq("id", job_id).eq("status", "running").lt("updated_at", _ago(older_than_seconds))
+     .execute())
+
+def delete_finished_jobs(older_than_seconds: float):
+    sb().table("jobs").delete().lt("finished_at", _ago(older_than_seconds)).execute()
+
+
+# --- Rollups ---
+def bump_user_rollup(user_id: str, track: str, topic: str, score: int, window: int = 10):
+    """Fold one score into the user's (track, topic) rollup row in a single atomic upsert."""
+    sb().rpc("bump_user_rollup", {
+        "p_user_id": user_id, "p_track": track, "p_topic": topic,
+        "p_score": score, "p_window": window
+    }).execute()
+
+def rebuild_user_rollups(user_ids: List[str], window: int = 10):
+    """Recompute these users' rollups from each answer's latest scored eval, in one statement."""
+    if user_ids:
+        sb().rpc("rebuild_user_rollups", {"p_user_ids": user_ids, "p_window": window}).execute()
+
+def get_user_rollups(user_id: str, track: Optional[str] = None) -> List[Dict[str, Any]]:
+    q = sb().table("user_rollups").select("*").eq("user_id", user_id)
+    if track:
+        q = q.eq("track", track)
+    return q.order("track").order("topic").execute().data
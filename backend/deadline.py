@@ -0,0 +1,82 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# Request-level deadlines. A request sets one budget (`with budget(seconds)`)
+# and every stage below it (model calls, transcription, code runs, the
+# dispatcher queue) asks `timeout_for(own_cap)` for its timeout instead of
+# using a fixed one, so the stages together never run past the budget.
+# `reserve(seconds)` hides the last `seconds` of the budget from a block, to
+# keep time back for the stages after it.
+#
+# `lifted()` runs cleanup (e.g. releasing a turn claim) with no deadline, so
+# it still happens after the budget ran out.
+#
+# The deadline is a context variable (monotonic time): it follows the request
+# through calls and contextvars.copy_context(), and is absent everywhere else
+# (background jobs, tools), where every stage keeps its own cap.
+
+_MIN_STAGE_SECONDS = 0.05  # below this a stage isn't started at all
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+class DeadlineExceeded(Exception):
+    """The request's time budget ran out before or during `stage`."""
+    def __init__(self, stage: str):
+        self.stage = stage
+        super().__init__(f"Deadline exceeded in {stage}")
+
+@contextmanager
+def budget(seconds: float, started: Optional[float] = None) -> Iterator[None]:
+    """Run the block under a deadline `seconds` after `started` (monotonic; default now), or an earlier one already set."""
+    end = (started if started is not None else time.monotonic()) + seconds
+    current = _deadline.get()
+    token = _deadline.set(end if current is None else min(current, end))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+@contextmanager
+def reserve(seconds: float) -> Iterator[None]:
+    """Run the block with the last `seconds` of the current budget held back (no-op without a deadline)."""
+    current = _deadline.get()
+    if current is None:
+        yield
+        return
+    token = _deadline.set(current - seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+@contextmanager
+def lifted() -> Iterator[None]:
+    """Run the block with no deadline."""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget, None without one."""
+    current = _deadline.get()
+    return None if current is None else current - time.monotonic()
+
+def active() -> bool:
+    return _deadline.get() is not None
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left < _MIN_STAGE_SECONDS
+
+def timeout_for(stage: str, cap: float) -> float:
+    """The timeout a stage should use: its own `cap`, or less if the budget is shorter. Raises DeadlineExceeded if none is left."""
+    left = remaining()
+    if left is None:
+        return cap
+    if left < _MIN_STAGE_SECONDS:
+        raise DeadlineExceeded(stage)
+    return min(cap, left)
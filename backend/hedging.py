@@ -0,0 +1,141 @@
+import contextvars
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional, TypeVar
+
+import config
+import deadline
+import metrics
+
+# Hedged calls: when an attempt is still running after the series' usual
+# latency (the HEDGE_PERCENTILE of its recent attempts, at least
+# HEDGE_MIN_DELAY_SECONDS), a second identical attempt is started and the
+# first result wins. The slower attempt runs to completion in the background
+# and its result is dropped, so only idempotent calls may be hedged
+# (transcription, judge calls).
+#
+# Hedges are capped per series: every call earns HEDGE_BUDGET_PERCENT / 100 of
+# a hedge (banked up to HEDGE_BUDGET_BURST), so under a slow backend the extra
+# load stays at that share instead of doubling. No hedging until a series has
+# HEDGE_MIN_SAMPLES attempts, or when a request deadline leaves no time for
+# a second attempt. Per process, like metrics.
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_credit: Dict[str, float] = {}
+
+def _series(name: str) -> str:
+    return f"hedge.{name}.attempt_seconds"
+
+def hedge_delay(name: str) -> Optional[float]:
+    """Seconds to wait before hedging a call of series `name`; None until it has enough samples."""
+    if metrics.sample_count(_series(name)) < config.HEDGE_MIN_SAMPLES:
+        return None
+    return max(config.HEDGE_MIN_DELAY_SECONDS, metrics.percentile(_series(name), config.HEDGE_PERCENTILE))
+
+def _earn(name: str) -> bool:
+    """Add this call's share of the budget; True if a whole hedge is banked."""
+    with _lock:
+        credit = min(config.HEDGE_BUDGET_BURST, _credit.get(name, 0.0) + config.HEDGE_BUDGET_PERCENT / 100)
+        _credit[name] = credit
+        return credit >= 1
+
+def _spend(name: str) -> bool:
+    with _lock:
+        if _credit.get(name, 0.0) < 1:
+            return False
+        _credit[name] -= 1
+        return True
+
+def _timed(name: str, fn: Callable[[], T]) -> T:
+    start = time.monotonic()
+    result = fn()
+    metrics.observe(_series(name), time.monotonic() - start)
+    return result
+
+def call(name: str, fn: Callable[[], T], acquire: Optional[Callable[[], bool]] = None,
+         release: Optional[Callable[[], None]] = None) -> T:
+    """
+    Run `fn()` with a hedge after hedge_delay(name), returning the first result.
+
+    Args:
+        name: Latency series and budget the call belongs to (e.g. "transcription")
+        fn: The call; must be safe to run twice at once
+        acquire: Non-blocking check for capacity for the hedge (e.g. a free
+            dispatcher slot); no hedge when it returns False
+        release: Frees what `acquire` took, once both attempts have finished
+
+    Raises:
+        Whatever `fn` raised, if every attempt failed (the error of the first to fail).
+    """
+    metrics.incr(f"hedge.{name}.calls")
+    delay = hedge_delay(name)
+    if not config.HEDGE_ENABLED or delay is None or not _earn(name):
+        return _timed(name, fn)
+
+    results: "queue.Queue" = queue.Queue()
+    running = [1]
+    held = [False]
+
+    def finished():
+        with _lock:
+            running[0] -= 1
+            last = running[0] == 0
+        if last and held[0] and release is not None:
+            release()  # the hedge's capacity is kept until the slower attempt ends too
+
+    def attempt(tag: str):
+        start = time.monotonic()
+        try:
+            out = fn()
+            metrics.observe(_series(name), time.monotonic() - start)
+            results.put((tag, out, None))
+        except BaseException as e:
+            results.put((tag, None, e))
+        finally:
+            finished()
+
+    def start(tag: str):
+        ctx = contextvars.copy_context()  # deadline and priority follow the attempt
+        threading.Thread(target=ctx.run, args=(attempt, tag), name=f"hedge-{name}-{tag}", daemon=True).start()
+
+    start("primary")
+    try:
+        tag, out, err = results.get(timeout=delay)
+    except queue.Empty:
+        left = deadline.remaining()
+        if left is not None and left < delay:
+            metrics.incr(f"hedge.{name}.deadline_skipped")  # a fresh attempt couldn't finish in time
+        elif acquire is not None and not acquire():
+            metrics.incr(f"hedge.{name}.capacity_skipped")
+        elif not _spend(name):
+            if acquire is not None and release is not None:
+                release()
+            metrics.incr(f"hedge.{name}.budget_skipped")
+        else:
+            with _lock:
+                running[0] += 1
+                held[0] = True
+            metrics.incr(f"hedge.{name}.hedged")
+            start("hedge")
+        tag, out, err = results.get()
+        if err is not None and held[0]:
+            # the other attempt may still succeed
+            other = results.get()
+            if other[2] is None:
+                tag, out, err = other
+        if err is None and tag == "hedge":
+            metrics.incr(f"hedge.{name}.hedge_won")
+    if err is not None:
+        raise err
+    return out
+
+def _reset_after_fork():
+    global _lock
+    _lock = threading.Lock()
+    _credit.clear()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,74 @@
+import os
+import threading
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict
+
+# In-process counters and latency samples, exposed as JSON on /metrics.
+# Per-process only: each worker reports its own numbers.
+
+_SAMPLES_PER_SERIES = 1024
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = defaultdict(float)
+_samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=_SAMPLES_PER_SERIES))
+
+def incr(name: str, value: float = 1):
+    with _lock:
+        _counters[name] += value
+
+def observe(name: str, value: float):
+    """Record one observation (e.g. a latency in seconds) for percentile reporting."""
+    with _lock:
+        _samples[name].append(value)
+
+def counter(name: str) -> float:
+    with _lock:
+        return _counters.get(name, 0)
+
+def sample_count(name: str) -> int:
+    with _lock:
+        return len(_samples.get(name, ()))
+
+def percentile(name: str, q: float) -> float:
+    """q-th percentile (0-100) of the recent samples of a series, 0.0 if empty."""
+    with _lock:
+        values = sorted(_samples.get(name, ()))
+    if not values:
+        return 0.0
+    idx = min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))
+    return values[idx]
+
+def ratio(numerator: str, denominator: str) -> float:
+    with _lock:
+        den = _counters.get(denominator, 0)
+        return _counters.get(numerator, 0) / den if den else 0.0
+
+def snapshot() -> Dict[str, Any]:
+    with _lock:
+        counters = dict(_counters)
+        series = {k: sorted(v) for k, v in _samples.items() if v}
+    summaries = {}
+    for name, values in series.items():
+        n = len(values)
+        summaries[name] = {
+            "count": n,
+            "p50": values[n // 2],
+            "p95": values[min(n - 1, int(n * 0.95))],
+            "p99": values[min(n - 1, int(n * 0.99))],
+            "max": values[-1],
+        }
+    return {"counters": counters, "samples": summaries}
+
+def reset():
+    """Drop every counter and series (benchmarks that compare several runs in one process)."""
+    with _lock:
+        _counters.clear()
+        _samples.clear()
+
+def _reset_after_fork():
+    global _lock
+    _lock = threading.Lock()
+    _counters.clear()
+    _samples.clear()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify, make_response
-from services.supa import supabase
+from services.supa import auth_client
 from jose import jwk, jwt
 from jose.utils import base64url_decode
 import requests, time, os
@@ -31,7 +31,7 @@ def signup_route():
     email, password = data.get("email"), data.get("password")
     if not email or not password:
         return jsonify({"error":"email and password required"}), 400
-    res = supabase.auth.sign_up({"email": email, "password": password})
+    res = auth_client().auth.sign_up({"email": email, "password": password})
     if res.user is None:
         return jsonify({"error": "sign up failed"}), 400
     return jsonify({"ok": True, "message": "Check your email to verify your account."})
@@ -42,7 +42,7 @@ def login_route():
     email, password = data.get("email"), data.get("password")
     if not email or not password:
         return jsonify({"error":"email and password required"}), 400
-    res = supabase.auth.sign_in_with_password({"email": email, "password": password})
+    res = auth_client().auth.sign_in_with_password({"email": email, "password": password})
     if res.session is None:
         return jsonify({"error":"invalid credentials"}), 401
     access = res.session.access_token
@@ -73,7 +73,7 @@ def me_route():
 
     try:
         # Let Supabase validate the token and return the user
-        res = supabase.auth.get_user(token)
+        res = auth_client().auth.get_user(token)
         if res.user is None:
             return jsonify({"user": None})
         return jsonify({"user": {"id": res.user.id, "email": res.user.email}})
@@ -1,206 +1,116 @@
-from flask import Blueprint, request, jsonify, abort
-from config import DEFAULT_NUM_QUESTIONS
+from flask import Blueprint, Response, request, jsonify, abort, g, stream_with_context
+from config import DEFAULT_NUM_QUESTIONS, TURN_CLAIM_LEASE_SECONDS, TURN_DEADLINE_SECONDS, COHORT_INSTRUCTOR_IDS, COHORT_MAX_SIZE
+from deadline import budget, DeadlineExceeded
 from services.auth import get_user_id_from_auth
-from services.interview_logic import first_question_logic, evaluate_and_next_logic
+from services.interview_logic import first_question_logic
+from services.transcription import TranscriptionError
+from services.turns import answer_turn, answer_error, wait_for_turn_result, TurnTaken
+from services.cohort import start_cohort
+from services.jobs import submit, get_job
+from services.admission import admit, release, AdmissionRejected
+from services.history_sync import history_payload
+from services.compression import gzip_response
+from services.rollups import summarize_rollup
+from services.audio_store import store_audio, list_audio
+from services.export import export_lines, decode_cursor, gzip_stream
+from services.streaming import run_streamed, sse
+from agents.agents import INTERVIEW_MODEL, JUDGE_MODEL
 from db.supabase_db import (
-    create_session, insert_question, get_latest_qa, save_answer,
-    insert_eval, get_all_qas, mark_session_done, get_session
+    create_session, insert_question, get_latest_qa, get_all_qas, get_session,
+    claim_turn, release_turn_claim, get_eval
 )
-import re
 import os
-import shutil
-from datetime import datetime
+import time
+import uuid
 
 bp = Blueprint("interview", __name__)
 
-def store_technical_interview_audio(session_id, turn_index, temp_file_path):
+# Downstream backends each LLM-backed endpoint occupies while it runs
+TRANSCRIPTION_BACKEND = "groq-whisper"
+ADMISSION_BACKENDS = {
+    "interview.start": [INTERVIEW_MODEL],
+    "interview.start_stream": [INTERVIEW_MODEL],
+    "interview.answer": [JUDGE_MODEL, INTERVIEW_MODEL],
+    "interview.answer_stream": [JUDGE_MODEL, INTERVIEW_MODEL],
+}
+ANSWER_ENDPOINTS = ("interview.answer", "interview.answer_stream")
+
+@bp.before_request
+def mark_arrival():
+    """Turn deadlines count from here, so the admission queue wait is part of the budget."""
+    g.request_started = time.monotonic()
+
+@bp.before_request
+def admission_control():
+    """
+    Shed load before any LLM work starts: per-user token bucket, then a bounded
+    queue per downstream model. Rejected requests get 429 with Retry-After.
+    """
+    backends = ADMISSION_BACKENDS.get(request.endpoint)
+    if not backends:
+        return None
+    if request.endpoint in ANSWER_ENDPOINTS and request.content_type and "multipart/form-data" in request.content_type:
+        backends = backends + [TRANSCRIPTION_BACKEND]
+
+    success, result = get_user_id_from_auth(request.headers.get("Authorization"))
+    if not success:
+        return None  # the route itself answers 401
+    try:
+        if request.endpoint in ANSWER_ENDPOINTS:
+            # wait for a slot no longer than the turn's deadline leaves
+            with budget(TURN_DEADLINE_SECONDS, started=g.request_started):
+                g.admission_gates = admit(result, backends)
+        else:
+            g.admission_gates = admit(result, backends)
+    except AdmissionRejected as e:
+        resp = jsonify({"error": e.message, "retry_after": e.retry_after})
+        resp.status_code = 429
+        resp.headers["Retry-After"] = str(e.retry_after)
+        return resp
+    return None
+
+@bp.teardown_request
+def release_admission(exc):
+    release(g.pop("admission_gates", []))
+
+bp.after_request(gzip_response)
+
+def sse_response(frames):
+    """A text/event-stream response of already formatted SSE frames."""
+    return Response(stream_with_context(frames), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def streamed_turn(name, work, judge=True):
+    """
+    Run `work(emit)` streamed (services/streaming.py) as an SSE response. The
+    request's admission slots move to the worker, which frees them as soon as
+    the work is done rather than when the client stops reading, so
+    release_admission has nothing left to release for this request.
+    """
+    gates = g.pop("admission_gates", [])
+    return sse_response(run_streamed(name, work, judge=judge, on_done=lambda: release(gates)))
+
+def store_technical_interview_audio(user_id, session_id, turn_index, temp_file_path):
     """
     Store the audio file from a technical interview for later review.
     This can be useful for technical interviews where exact wording and code explanation matters.
+    Stored recordings are indexed and evicted by age and quota (services/audio_store.py).
     
     Args:
+        user_id: Owner of the session, charged against the per-user quota
         session_id: The interview session ID
         turn_index: The turn/question number
         temp_file_path: Path to the temporary audio file
     
     Returns:
-        str: The path where the file was stored
-    """
-    # Create storage directory if it doesn't exist
-    storage_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 
-                              "storage", "audio", session_id)
-    os.makedirs(storage_dir, exist_ok=True)
-    
-    # Generate filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    file_ext = os.path.splitext(temp_file_path)[1]
-    filename = f"q{turn_index}_{timestamp}{file_ext}"
-    
-    # Full path to store the file
-    target_path = os.path.join(storage_dir, filename)
-    
-    # Copy the file
-    shutil.copy2(temp_file_path, target_path)
-    
-    return target_path
-
-def post_process_technical_transcript(text):
+        str: The path where the file was stored, or None if the store is full
+        or storing failed (the turn goes on either way)
     """
-    Post-process a technical interview transcript to improve code formatting,
-    fix common speech-to-text errors in technical terms, and handle syntax.
-    """
-    # Common replacements for programming terms that Whisper might misinterpret
-    replacements = {
-        # Programming languages
-        r'\bpie\s?thon\b': 'Python',
-        r'\bjava\s?script\b': 'JavaScript',
-        r'\bc\s?plus\s?plus\b': 'C++',
-        r'\bc\s?sharp\b': 'C#',
-        r'\btype\s?script\b': 'TypeScript',
-        r'\bgo\s?lang\b': 'Golang',
-        
-        # Frameworks & Libraries
-        r'\breact\s?js\b': 'React',
-        r'\bangular\s?js\b': 'Angular',
-        r'\bnode\s?js\b': 'Node.js',
-        r'\bdot\s?net\b': '.NET',
-        r'\bj\s?query\b': 'jQuery',
-        r'\bvue\s?js\b': 'Vue.js',
-        r'\bflask\b': 'Flask',
-        r'\bdjango\b': 'Django',
-        r'\bspring\s?boot\b': 'Spring Boot',
-        r'\blaravel\b': 'Laravel',
-        r'\bnext\s?js\b': 'Next.js',
-        r'\btensor\s?flow\b': 'TensorFlow',
-        r'\bpie\s?torch\b': 'PyTorch',
-        
-        # Databases
-        r'\bmysequel\b': 'MySQL',
-        r'\bsequal\b': 'SQL',
-        r'\bpost\s?gress?\b': 'PostgreSQL',
-        r'\bmongo\s?d\s?b\b': 'MongoDB',
-        r'\bredis\b': 'Redis',
-        r'\belastic\s?search\b': 'Elasticsearch',
-        r'\bcassandra\b': 'Cassandra',
-        r'\boracle\b': 'Oracle',
-        
-        # Web Technologies
-        r'\bapi\b': 'API',
-        r'\bapis\b': 'APIs',
-        r'\brest\s?ful\b': 'RESTful',
-        r'\brest\s?api\b': 'REST API',
-        r'\bjson\b': 'JSON',
-        r'\bxml\b': 'XML',
-        r'\bhtml\b': 'HTML',
-        r'\bcss\b': 'CSS',
-        r'\bhttp\b': 'HTTP',
-        r'\bhttps\b': 'HTTPS',
-        r'\burl\b': 'URL',
-        r'\burls\b': 'URLs',
-        r'\bui\b': 'UI',
-        r'\bux\b': 'UX',
-        r'\bgraph\s?q\s?l\b': 'GraphQL',
-        r'\bweb\s?socket\b': 'WebSocket',
-        
-        # Architecture & Development Terms
-        r'\bback\s?end\b': 'backend',
-        r'\bfront\s?end\b': 'frontend',
-        r'\bfull\s?stack\b': 'full-stack',
-        r'\bdocker\b': 'Docker',
-        r'\bkubernetes\b': 'Kubernetes',
-        r'\bk8s\b': 'K8s',
-        r'\baws\b': 'AWS',
-        r'\bazure\b': 'Azure',
-        r'\bgcp\b': 'GCP',
-        r'\bgit\b': 'Git',
-        r'\bgithub\b': 'GitHub',
-        r'\blinux\b': 'Linux',
-        r'\bunix\b': 'Unix',
-        r'\bmac\s?os\b': 'macOS',
-        r'\bwindows\b': 'Windows',
-        r'\bio\s?t\b': 'IoT',
-        r'\bdevops\b': 'DevOps',
-        r'\bci\s?cd\b': 'CI/CD',
-        r'\bsaas\b': 'SaaS',
-        r'\bpaas\b': 'PaaS',
-        r'\biaas\b': 'IaaS',
-        r'\bmicro\s?services\b': 'microservices',
-        r'\bservice\s?oriented\s?architecture\b': 'service-oriented architecture',
-        r'\bmonolithic\b': 'monolithic',
-        
-        # Algorithms & Data Structures
-        r'\bbinary\s?search\b': 'binary search',
-        r'\bdepth\s?first\s?search\b': 'depth-first search',
-        r'\bdfs\b': 'DFS',
-        r'\bbreadth\s?first\s?search\b': 'breadth-first search',
-        r'\bbfs\b': 'BFS',
-        r'\bdynamic\s?programming\b': 'dynamic programming',
-        r'\bgreedy\s?algorithm\b': 'greedy algorithm',
-        r'\blinked\s?list\b': 'linked list',
-        r'\bbinary\s?tree\b': 'binary tree',
-        r'\bbinary\s?search\s?tree\b': 'binary search tree',
-        r'\bbst\b': 'BST',
-        r'\bheap\b': 'heap',
-        r'\bhash\s?map\b': 'hash map',
-        r'\bhash\s?table\b': 'hash table',
-        r'\bgraph\b': 'graph',
-        r'\btrie\b': 'trie',
-        r'\bqueue\b': 'queue',
-        r'\bstack\b': 'stack',
-        r'\barraay\b': 'array',
-        r'\bsort\b': 'sort',
-        r'\bquick\s?sort\b': 'quicksort',
-        r'\bmerge\s?sort\b': 'merge sort',
-        r'\bheap\s?sort\b': 'heap sort',
-        r'\bbubble\s?sort\b': 'bubble sort',
-        r'\binsertion\s?sort\b': 'insertion sort',
-        r'\btime\s?complexity\b': 'time complexity',
-        r'\bspace\s?complexity\b': 'space complexity',
-        r'\bbig\s?o\b': 'Big O',
-        r'\bo\s?of\s?n\b': 'O(n)',
-        r'\bo\s?of\s?n\s?squared\b': 'O(n²)',
-        r'\bo\s?of\s?log\s?n\b': 'O(log n)',
-        r'\bo\s?of\s?n\s?log\s?n\b': 'O(n log n)',
-        
-        # Function-related patterns
-        r'\b(?:function|func)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(': r'function \1(',
-        r'\bdef\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(': r'def \1(',
-        
-        # Sites & Resources
-        r'\bstack\s?overflow\b': 'StackOverflow',
-        r'\bgit\s?hub\b': 'GitHub',
-        r'\bleet\s?code\b': 'LeetCode',
-        r'\bhacker\s?rank\b': 'HackerRank',
-        r'\bcode\s?pen\b': 'CodePen',
-    }
-    
-    # Apply all replacements
-    processed_text = text
-    for pattern, replacement in replacements.items():
-        processed_text = re.sub(pattern, replacement, processed_text, flags=re.IGNORECASE)
-    
-    # Try to identify code blocks and format them
-    # This is a simple approach - more sophisticated would require AI processing
-    code_block_markers = [
-        (r'```(?:python|java|javascript|js|typescript|ts|c\+\+|cpp|csharp|c#|ruby|go|rust|php|swift|kotlin|scala)\s*(.*?)\s*```', r'```\1```'),
-        (r'code\s*:\s*(.*?)(?=\n\n|\Z)', r'```\1```'),
-        (r'function\s+[a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)\s*{[^}]*}', lambda m: f'```{m.group(0)}```'),
-        (r'class\s+[a-zA-Z_][a-zA-Z0-9_]*\s*{[^}]*}', lambda m: f'```{m.group(0)}```'),
-        (r'def\s+[a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)\s*:', lambda m: f'```{m.group(0)}```'),
-        (r'(?:public|private|protected|internal)\s+(?:static\s+)?(?:void|int|string|bool|float|double)\s+[a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)\s*{', lambda m: f'```{m.group(0)}```'),
-    ]
-    
-    for pattern, replacement in code_block_markers:
-        processed_text = re.sub(pattern, replacement, processed_text, flags=re.DOTALL)
-    
-    # Improve code formatting by adding proper indentation for languages with specific syntax patterns
-    # Python indentation fix (simple cases)
-    processed_text = re.sub(r'(def\s+[^\n]+:)\s*([^\s])', r'\1\n    \2', processed_text)
-    processed_text = re.sub(r'(if\s+[^\n]+:)\s*([^\s])', r'\1\n    \2', processed_text)
-    processed_text = re.sub(r'(for\s+[^\n]+:)\s*([^\s])', r'\1\n    \2', processed_text)
-    processed_text = re.sub(r'(while\s+[^\n]+:)\s*([^\s])', r'\1\n    \2', processed_text)
-    
-    return processed_text
+    try:
+        return store_audio(user_id, session_id, turn_index, temp_file_path)
+    except Exception as e:
+        print(f"Storing technical interview audio failed for session {session_id}: {e}")
+        return None
 
 @bp.post("/start")
 def start():
@@ -217,21 +127,152 @@ def start():
     session_id = create_session(user_id, track, num_questions)
 
     # 2) get first question from graph
-    q1, history = first_question_logic(mode=track)
+    q1, topic, history = first_question_logic(mode=track)
 
     # 3) save Q1 as turn_index=1
-    insert_question(session_id, 1, q1)
+    insert_question(session_id, 1, q1, topic)
 
-    # 4) return to UI (also return minimal history so UI could persist if needed)
-    return jsonify({"session_id": session_id, "question": q1, "history": history})
+    # 4) return to UI (also return minimal history + its version token so UI can request deltas)
+    return jsonify({"session_id": session_id, "question": q1, "turn_index": 1, **history_payload(history)})
+
+@bp.post("/start/stream")
+def start_stream():
+    """
+    /start as server-sent events (services/streaming.py): `session` with the
+    new session id, the first question's text as `question` deltas while it is
+    generated, then `turn` with /start's response once the question is stored.
+    """
+    success, result = get_user_id_from_auth(request.headers.get("Authorization"))
+    if not success:
+        abort(401, description=result)
+    user_id = result
+
+    body = request.get_json(force=True) or {}
+    track = body.get("track", "behavioral")
+    num_questions = int(body.get("num_questions", DEFAULT_NUM_QUESTIONS))
+    session_id = create_session(user_id, track, num_questions)
+
+    def work(emit):
+        emit("session", {"session_id": session_id})
+        q1, topic, history = first_question_logic(mode=track)
+        insert_question(session_id, 1, q1, topic)
+        emit("turn", {"session_id": session_id, "question": q1, "turn_index": 1, **history_payload(history)})
+
+    return streamed_turn("start", work, judge=False)
+
+@bp.post("/cohort")
+def start_cohort_route():
+    """
+    Start sessions for a whole cohort in the background.
+
+    Body: {"user_ids": [...], "track": "behavioral"|"technical", "num_questions": int}
+    Returns 202 with a job id; poll /api/interview/jobs/<job_id> for progress and,
+    once done, the session id and first question per student.
+    """
+    success, result = get_user_id_from_auth(request.headers.get("Authorization"))
+    if not success:
+        abort(401, description=result)
+    user_id = result
+    if user_id not in COHORT_INSTRUCTOR_IDS:
+        abort(403, description="Only instructors can start cohort sessions")
+
+    body = request.get_json(force=True) or {}
+    track = body.get("track", "behavioral")
+    num_questions = int(body.get("num_questions", DEFAULT_NUM_QUESTIONS))
+    user_ids = list(dict.fromkeys(body.get("user_ids") or []))  # dedupe, keep order
+    if track not in ("behavioral", "technical"):
+        return jsonify({"error": "track must be 'behavioral' or 'technical'"}), 400
+    if not user_ids:
+        return jsonify({"error": "No user_ids provided"}), 400
+    if len(user_ids) > COHORT_MAX_SIZE:
+        return jsonify({"error": f"At most {COHORT_MAX_SIZE} students per cohort"}), 400
+
+    job_id = submit("cohort", user_id, lambda progress: start_cohort(user_ids, track, num_questions, progress))
+    return jsonify({"job_id": job_id, "status_url": f"/api/interview/jobs/{job_id}"}), 202
+
+@bp.get("/jobs/<job_id>")
+def job_status(job_id):
+    success, result = get_user_id_from_auth(request.headers.get("Authorization"))
+    if not success:
+        abort(401, description=result)
+    try:
+        uuid.UUID(job_id)
+    except ValueError:
+        return jsonify({"error": "Job not found"}), 404
+    job = get_job(job_id, owner=result)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    job.pop("owner", None)
+    return jsonify(job)
+
+@bp.get("/evals/<eval_id>")
+def eval_status(eval_id):
+    """
+    One of the caller's evals: {"eval_id", "score", "feedback", "pending"}. A
+    pending eval (see /answer) is filled in by whichever worker judges it, so
+    clients poll here until "pending" is false.
+    """
+    success, result = get_user_id_from_auth(request.headers.get("Authorization"))
+    if not success:
+        abort(401, description=result)
+    try:
+        uuid.UUID(eval_id)
+    except ValueError:
+        return jsonify({"error": "Eval not found"}), 404
+    row = get_eval(eval_id)
+    owner = ((row or {}).get("qa_pairs") or {}).get("sessions") or {}
+    if row is None or owner.get("user_id") != result:
+        return jsonify({"error": "Eval not found"}), 404
+    return jsonify({
+        "eval_id": row["id"],
+        "score": row["ai_interviewer_score"],
+        "feedback": row["ai_interviewer_feedback"],
+        "pending": row["ai_interviewer_score"] is None,
+    })
 
 @bp.post("/answer")
 def answer():
+    return handle_answer(stream=False)
+
+@bp.post("/answer/stream")
+def answer_stream():
+    """
+    /answer as server-sent events (services/streaming.py): the transcript, the
+    judge's score and feedback and the next question's text as they are
+    generated, then `turn` with /answer's response once everything is stored.
+    Errors before the turn starts are plain JSON with their status code.
+    """
+    return handle_answer(stream=True)
+
+def turn_timed_out(stage, session_id):
+    # nothing was stored and the claim is released: the client can simply retry
+    print(f"Turn deadline exceeded in {stage} for session {session_id}")
+    resp = jsonify({"error": "Answer processing timed out, please retry", "retry_after": 5})
+    resp.status_code = 503
+    resp.headers["Retry-After"] = "5"
+    return resp
+
+def handle_answer(stream: bool):
+    """
+    The whole turn runs under one deadline, TURN_DEADLINE_SECONDS from arrival
+    (before admission): database calls, transcription, code runs and model calls
+    all take their timeouts from what is left.
+    """
+    try:
+        with budget(TURN_DEADLINE_SECONDS, started=g.request_started):
+            return answer_request(stream)
+    except DeadlineExceeded as e:
+        session_id = request.form.get("session_id") or (request.get_json(silent=True) or {}).get("session_id")
+        return turn_timed_out(e.stage, session_id)
+
+def answer_request(stream: bool):
     success, result = get_user_id_from_auth(request.headers.get("Authorization"))
     if not success:
         abort(401, description=result)
     user_id = result
     
+    temp_path = None
+    user_answer = None
     # Check if the request contains a file or JSON data
     if request.content_type and 'multipart/form-data' in request.content_type:
         # Handle audio file upload
@@ -253,124 +294,151 @@ def answer():
         print(f"Received audio file: {audio_file.filename}, size: {file_size} bytes")
         
         session_id = request.form.get('session_id')
+        client_turn = request.form.get('turn_index')
+        client_history_version = request.form.get('history_version')
+        full_history = request.form.get('full_history', '').lower() in ('1', 'true')
+        code = request.form.get('code')
+        tests = request.form.get('tests')
         if not session_id:
             return jsonify({"error": "No session_id provided"}), 400
-        
-        # Get session info to determine if this is a technical or behavioral interview
-        sess = get_session(session_id)
-        is_technical = sess["track"] == "technical"
-        
-        # Convert speech to text using Groq client
-        from agents.agents import groq_client
-        try:
-            # Save the audio file temporarily
-            import os  # Add explicit import here
-            temp_path = f"/tmp/{audio_file.filename}"
-            audio_file.save(temp_path)
-            
-            # Verify the file was saved and has content
-            if not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
-                return jsonify({"error": "Failed to save audio file or file is empty"}), 400
-                
-            print(f"Saved audio to temp file: {temp_path}, size: {os.path.getsize(temp_path)} bytes")
-            
-            # Transcribe using Whisper with appropriate settings for interview type
-            with open(temp_path, "rb") as audio:
-                try:
-                    if is_technical:
-                        # For technical interviews, use more specialized settings
-                        transcript = groq_client.audio.transcriptions.create(
-                            model="whisper-large-v3",
-                            file=audio,
-                            response_format="verbose_json",  # Get more detailed output
-                            temperature=0.0,                 # More precise transcription
-                            prompt="This is a technical interview with code syntax, programming terms, and algorithms."  # Context hint
-                        )
-                        
-                        # Extract the text from verbose JSON response
-                        user_answer = transcript.text
-                        
-                        # Post-process for technical content
-                        user_answer = post_process_technical_transcript(user_answer)
-                        
-                        # For technical interviews, optionally store the audio file for later review
-                        # Uncomment and implement if you want to store audio files
-                        # store_technical_interview_audio(session_id, cur.get("turn_index"), temp_path)
-                    else:
-                        # For behavioral interviews, use standard settings
-                        transcript = groq_client.audio.transcriptions.create(
-                            model="whisper-large-v3",
-                            file=audio
-                        )
-                        user_answer = transcript.text
-                        
-                    print(f"Successfully transcribed audio: {len(user_answer)} characters")
-                    
-                except Exception as transcription_error:
-                    print(f"Transcription error: {transcription_error}")
-                    return jsonify({"error": f"Speech-to-text conversion failed: {str(transcription_error)}"}), 500
-            
-            # Clean up the temporary file (only if not storing for technical interviews)
-            import os
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-                
-        except Exception as e:
-            print(e)
-            return jsonify({"error": f"Speech-to-text conversion failed"}), 500
     else:
         # Handle JSON data (text submission)
         b = request.get_json(force=True)
         session_id = b["session_id"]
-        user_answer = b["answer"]
+        user_answer = b.get("answer") or ""
+        client_turn = b.get("turn_index")
+        client_history_version = b.get("history_version")
+        full_history = bool(b.get("full_history", False))
+        code = b.get("code")
+        tests = b.get("tests")
+        error = answer_error(user_answer, code)
+        if error:
+            return jsonify({"error": error}), 400
+
+    def turn_payload(out, code_result=None):
+        return {
+            "evaluation": out["evaluation"],
+            "code_result": code_result,
+            "done": out["done"],
+            "next_question": out["next_question"],
+            "turn_index": out["turn_index"],
+            # only the lines the client hasn't seen, unless it asked for (or needs) a full resync
+            **history_payload(out["history"], client_history_version, full_history)
+        }
+
+    def respond(out, code_result=None):
+        if stream:
+            return sse_response(iter([sse("evaluation", out["evaluation"]), sse("turn", turn_payload(out, code_result))]))
+        return jsonify(turn_payload(out, code_result))
 
-    # 1) get current (latest) QA row (should be unanswered)
+    def respond_with_winner(turn_index):
+        # Another request is processing (or processed) this turn: hand back its
+        # result, without holding model slots this request won't use
+        release(g.pop("admission_gates", []))
+        out = wait_for_turn_result(session_id, turn_index)
+        if out is None:
+            resp = jsonify({"error": "This answer is still being processed", "retry_after": 5})
+            resp.status_code = 409
+            resp.headers["Retry-After"] = "5"
+            return resp
+        return respond(out)
+
+    # 1) get current (latest) QA row
     cur = get_latest_qa(session_id)
     if not cur:
         return jsonify({"error": "No question found for session"}), 400
+    if client_turn is not None and int(client_turn) < cur["turn_index"]:
+        # a retry of a turn that has already moved on
+        return respond_with_winner(int(client_turn))
     if cur.get("answer"):
         # already answered; client may have double-posted
-        return jsonify({"error": "Latest question already answered"}), 400
-
-    # 2) save answer
-    save_answer(cur["id"], user_answer)
-
-    # 3) reconstruct history for graph: all Q/A up to now
-    #    (fetch all to be safe and ordered)
-    all_qas = get_all_qas(session_id)
-    history = []
-    for qa in all_qas:
-        history.append(f"Q: {qa['question']}")
-        if qa.get("answer"):
-            history.append(f"A: {qa['answer']}")
-
-    # 4) evaluate + possibly ask next question
-    eval_out = evaluate_and_next_logic(cur["question"], user_answer, history)
-    print(eval_out)
-    score, feedback = eval_out["score"], eval_out["feedback"]
-    next_q = eval_out["next_question"]
-    new_history = eval_out["history"]
-
-    # 5) insert eval
-    insert_eval(cur["id"], score, feedback)
-
-    # 6) decide if we need another question
-    sess = get_session(session_id)
-    next_turn = cur["turn_index"] + 1
-    if next_turn <= int(sess["num_questions"]):
-        insert_question(session_id, next_turn, next_q)
-        done = False
-    else:
-        mark_session_done(session_id)
-        next_q = None
-        done = True
+        return respond_with_winner(cur["turn_index"])
 
-    return jsonify({
-        "evaluation": {"score": score, "feedback": feedback},
-        "done": done,
-        "next_question": next_q,
-        "history": new_history
-    })
+    # 2) atomically claim the turn so concurrent duplicates don't both run STT + LLM calls
+    claim_token = str(uuid.uuid4())
+    if not claim_turn(cur["id"], claim_token, TURN_CLAIM_LEASE_SECONDS):
+        return respond_with_winner(cur["turn_index"])
+
+    try:
+        is_technical = False
+        if user_answer is None:
+            try:
+                # Get session info to determine if this is a technical or behavioral interview
+                sess = get_session(session_id)
+                is_technical = sess["track"] == "technical"
+                # Save the audio file temporarily
+                temp_path = f"/tmp/{claim_token}_{os.path.basename(audio_file.filename)}"
+                audio_file.save(temp_path)
+            except Exception:
+                # don't leave the turn locked for the whole lease
+                release_turn_claim(cur["id"], claim_token)
+                raise
+            
+            # Verify the file was saved and has content
+            if not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
+                release_turn_claim(cur["id"], claim_token)
+                return jsonify({"error": "Failed to save audio file or file is empty"}), 400
+                
+            print(f"Saved audio to temp file: {temp_path}, size: {os.path.getsize(temp_path)} bytes")
+            
+            # For technical interviews, keep a copy of the recording for later review
+            # (copied before the temp file is handed on and removed)
+            if is_technical:
+                store_technical_interview_audio(user_id, session_id, cur.get("turn_index"), temp_path)
+
+        # 3) transcribe (Whisper, with settings for the interview type), run any
+        #    submitted code, save the answer, evaluate, insert the next question or finish
+        if stream:
+            # the worker thread owns the temp file from here on
+            audio_path, temp_path = temp_path, None
+            started = g.request_started
+            gates = g.get("admission_gates", [])  # the list streamed_turn hands to the worker
+
+            def work(emit):
+                try:
+                    with budget(TURN_DEADLINE_SECONDS, started=started):
+                        out = answer_turn(user_id, session_id, cur, claim_token, answer_text=user_answer or "",
+                                          audio_path=audio_path, is_technical=is_technical, code=code, tests=tests,
+                                          on_transcript=lambda text: emit("transcript", {"text": text}),
+                                          on_evaluation=lambda evaluation: emit("evaluation", evaluation))
+                except DeadlineExceeded as e:
+                    print(f"Turn deadline exceeded in {e.stage} for session {session_id}")
+                    emit("error", {"error": "Answer processing timed out, please retry", "retry_after": 5})
+                    return
+                except TranscriptionError as transcription_error:
+                    print(f"Transcription error: {transcription_error}")
+                    emit("error", {"error": f"Speech-to-text conversion failed: {str(transcription_error)}"})
+                    return
+                except TurnTaken:
+                    release(gates)
+                    with budget(TURN_DEADLINE_SECONDS, started=started):
+                        out = wait_for_turn_result(session_id, cur["turn_index"])
+                    if out is None:
+                        emit("error", {"error": "This answer is still being processed", "retry_after": 5})
+                        return
+                    emit("evaluation", out["evaluation"])
+                finally:
+                    if audio_path and os.path.exists(audio_path):
+                        os.remove(audio_path)
+                if out.get("code_result") is not None:
+                    emit("code_result", out["code_result"])
+                emit("turn", turn_payload(out, out.get("code_result")))
+
+            return streamed_turn("answer", work)
+
+        try:
+            out = answer_turn(user_id, session_id, cur, claim_token, answer_text=user_answer or "",
+                              audio_path=temp_path, is_technical=is_technical, code=code, tests=tests)
+        except TranscriptionError as transcription_error:
+            print(f"Transcription error: {transcription_error}")
+            return jsonify({"error": f"Speech-to-text conversion failed: {str(transcription_error)}"}), 500
+        except TurnTaken:
+            return respond_with_winner(cur["turn_index"])
+        return respond(out, out["code_result"])
+    finally:
+        # Clean up the temporary file (only if not storing for technical interviews)
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
 
 @bp.get("/technical-audio")
 def get_technical_audio():
@@ -396,31 +464,10 @@ def get_technical_audio():
         return jsonify({"error": "Audio recordings only available for technical interviews"}), 400
     
     # Get the turn index (question number) if provided
-    turn_index = request.args.get("turn_index")
-    
-    # Path to audio storage
-    storage_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 
-                               "storage", "audio", session_id)
+    turn_index = request.args.get("turn_index", type=int)
     
-    # If directory doesn't exist, no recordings
-    if not os.path.exists(storage_dir):
-        return jsonify({"audio_files": []})
-    
-    # List all audio files for this session
-    audio_files = []
-    for filename in os.listdir(storage_dir):
-        if turn_index and not filename.startswith(f"q{turn_index}_"):
-            continue
-        
-        file_path = os.path.join(storage_dir, filename)
-        file_stats = os.stat(file_path)
-        
-        audio_files.append({
-            "filename": filename,
-            "path": file_path,
-            "size": file_stats.st_size,
-            "created": datetime.fromtimestamp(file_stats.st_ctime).isoformat()
-        })
+    # Listed from the recording index, not the storage directory
+    audio_files = list_audio(session_id, turn_index)
     
     return jsonify({"audio_files": audio_files})
 
@@ -452,6 +499,39 @@ def summary():
         "coach_tip": coach_tip
     })
 
+@bp.get("/rollups")
+def rollups():
+    """Per-topic score rollups for the current user, read straight from user_rollups."""
+    success, result = get_user_id_from_auth(request.headers.get("Authorization"))
+    if not success:
+        abort(401, description=result)
+
+    from db.supabase_db import get_user_rollups
+    rows = get_user_rollups(result, request.args.get("track"))
+    return jsonify({"rollups": [summarize_rollup(r) for r in rows]})
+
+@bp.get("/export")
+def export_history():
+    """
+    Stream the current user's whole interview history as NDJSON, one session
+    per line (see services/export.py). `?after=<cursor>` resumes after a
+    session; gzip-compressed when the client sends Accept-Encoding: gzip.
+    """
+    success, result = get_user_id_from_auth(request.headers.get("Authorization"))
+    if not success:
+        abort(401, description=result)
+    try:
+        after = decode_cursor(request.args.get("after"))
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    body = export_lines(result, after)
+    headers = {"Content-Disposition": "attachment; filename=interview-history.ndjson", "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("Accept-Encoding", "").lower():
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, mimetype="application/x-ndjson", headers=headers)
+
 @bp.get("/user-interviews")
 def user_interviews():
     success, result = get_user_id_from_auth(request.headers.get("Authorization"))
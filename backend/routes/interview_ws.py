@@ -0,0 +1,227 @@
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from flask_sock import Sock
+from simple_websocket import ConnectionClosed
+
+import metrics
+from config import TURN_CLAIM_LEASE_SECONDS, TURN_DEADLINE_SECONDS, WS_AUTH_TIMEOUT, WS_IDLE_TIMEOUT, WS_MAX_AUDIO_BYTES
+from deadline import budget, DeadlineExceeded
+from db.supabase_db import get_session, get_latest_qa, claim_turn, release_turn_claim
+from routes.interview import ADMISSION_BACKENDS, TRANSCRIPTION_BACKEND, store_technical_interview_audio
+from services.admission import admit, release, AdmissionRejected
+from services.auth import get_user_id_from_auth
+from services.transcription import TranscriptionError
+from services.turns import answer_turn, answer_error, wait_for_turn_result, TurnTaken
+
+# One WebSocket per interview: the client authenticates once, then sends
+# answers (text frames, or audio streamed as binary frames) and the server
+# pushes each result as soon as it exists instead of one response per turn.
+#
+# Client -> server (JSON text frames unless noted):
+#   {"type": "auth", "token": "<jwt>", "session_id": "..."}   first frame
+#   {"type": "answer", "text": "...", "code"?: "...", "tests"?: "..."}
+#   {"type": "audio_start", "filename"?: "answer.webm"}, binary frames..., {"type": "audio_end", "code"?, "tests"?}
+#   {"type": "ping"}
+# Server -> client:
+#   ready {session_id, track, question, turn_index}, transcript {text},
+#   evaluation {score, feedback}, code_result {result}, question {question, turn_index},
+#   done, pong, error {error, retry_after?}
+
+sock = Sock()
+
+def _send(ws, type_: str, **fields):
+    ws.send(json.dumps({"type": type_, **fields}))
+
+def _authenticate(ws) -> Optional[Dict[str, Any]]:
+    """Wait for the auth frame; returns {"user_id", "session"} or None after telling the client why."""
+    raw = ws.receive(timeout=WS_AUTH_TIMEOUT)
+    if raw is None:
+        _send(ws, "error", error="Expected an auth frame")
+        return None
+    try:
+        frame = json.loads(raw)
+    except (TypeError, ValueError):
+        frame = {}
+    if frame.get("type") != "auth" or not frame.get("session_id"):
+        _send(ws, "error", error="First frame must be {\"type\": \"auth\", \"token\", \"session_id\"}")
+        return None
+    success, result = get_user_id_from_auth(f"Bearer {frame.get('token', '')}")
+    if not success:
+        _send(ws, "error", error=result)
+        return None
+    try:
+        session = get_session(frame["session_id"])
+    except Exception:
+        session = None
+    if not session or session.get("user_id") != result:
+        _send(ws, "error", error="Session not found")
+        return None
+    return {"user_id": result, "session": session}
+
+def _receive_audio(ws, path: str) -> Optional[Dict[str, Any]]:
+    """Write binary frames to `path` until audio_end; returns the audio_end frame, or None if aborted."""
+    size = 0
+    with open(path, "wb") as f:
+        while True:
+            data = ws.receive(timeout=WS_IDLE_TIMEOUT)
+            if data is None:
+                return None
+            if isinstance(data, bytes):
+                size += len(data)
+                if size > WS_MAX_AUDIO_BYTES:
+                    _send(ws, "error", error="Audio too large")
+                    return None
+                f.write(data)
+                continue
+            try:
+                frame = json.loads(data)
+            except ValueError:
+                continue
+            if frame.get("type") == "audio_end":
+                return frame if size else None
+            if frame.get("type") == "audio_abort":
+                return None
+
+def _run_turn(ws, user_id: str, session: Dict[str, Any], text: str = "", audio_path: Optional[str] = None,
+              code: Optional[str] = None, tests: Optional[str] = None) -> bool:
+    """Claim and process the current turn, pushing results as they come. Returns True when the interview is done."""
+    try:
+        # one deadline for the whole turn, from the answer's arrival
+        with budget(TURN_DEADLINE_SECONDS):
+            return _claim_and_run_turn(ws, user_id, session, text, audio_path, code, tests)
+    except DeadlineExceeded as e:
+        print(f"Turn deadline exceeded in {e.stage} for session {session['id']}")
+        _send(ws, "error", error="Answer processing timed out, please retry", retry_after=5)
+        return False
+
+def _claim_and_run_turn(ws, user_id: str, session: Dict[str, Any], text: str, audio_path: Optional[str],
+                        code: Optional[str], tests: Optional[str]) -> bool:
+    session_id = session["id"]
+    cur = get_latest_qa(session_id)
+    if not cur:
+        _send(ws, "error", error="No question found for session")
+        return False
+
+    pushed = []
+    def push_evaluation(evaluation: Dict[str, Any]):
+        # sent before the next question is generated
+        pushed.append(True)
+        _send(ws, "evaluation", **evaluation)
+
+    claim_token = str(uuid.uuid4())
+    if cur.get("answer") or not claim_turn(cur["id"], claim_token, TURN_CLAIM_LEASE_SECONDS):
+        # answered through another connection or an HTTP request: replay its result
+        out = wait_for_turn_result(session_id, cur["turn_index"])
+        if out is None:
+            _send(ws, "error", error="This answer is still being processed", retry_after=5)
+            return False
+    else:
+        backends = ADMISSION_BACKENDS["interview.answer"] + ([TRANSCRIPTION_BACKEND] if audio_path else [])
+        try:
+            held = admit(user_id, backends)
+        except AdmissionRejected as e:
+            _send(ws, "error", error=e.message, retry_after=e.retry_after)
+            release_turn_claim(cur["id"], claim_token)
+            return False
+        if audio_path and session["track"] == "technical":
+            # copied now; the caller removes the upload once the turn is over
+            store_technical_interview_audio(user_id, session_id, cur["turn_index"], audio_path)
+        try:
+            out = answer_turn(
+                user_id, session_id, cur, claim_token, answer_text=text, audio_path=audio_path,
+                is_technical=session["track"] == "technical", code=code, tests=tests,
+                on_transcript=lambda t: _send(ws, "transcript", text=t),
+                on_evaluation=push_evaluation,
+            )
+        except TranscriptionError as e:
+            _send(ws, "error", error=f"Speech-to-text conversion failed: {e}")
+            return False
+        except TurnTaken:
+            release(held)  # only waiting from here on
+            out = wait_for_turn_result(session_id, cur["turn_index"])
+            if out is None:
+                _send(ws, "error", error="This answer is still being processed", retry_after=5)
+                return False
+        finally:
+            release(held)
+        if out.get("code_result") is not None:
+            _send(ws, "code_result", result=out["code_result"])
+
+    if not pushed:
+        _send(ws, "evaluation", **out["evaluation"])
+    if out["done"]:
+        _send(ws, "done")
+        return True
+    _send(ws, "question", question=out["next_question"], turn_index=out["turn_index"])
+    return False
+
+@sock.route("/api/interview/ws")
+def interview_ws(ws):
+    auth = _authenticate(ws)
+    if auth is None:
+        return
+    user_id, session = auth["user_id"], auth["session"]
+    metrics.incr("ws.connections")
+
+    cur = get_latest_qa(session["id"])
+    _send(ws, "ready", session_id=session["id"], track=session["track"],
+          question=cur["question"] if cur else None, turn_index=cur["turn_index"] if cur else None)
+
+    while True:
+        raw = ws.receive(timeout=WS_IDLE_TIMEOUT)
+        if raw is None:
+            _send(ws, "error", error="Idle timeout")
+            return
+        if isinstance(raw, bytes):
+            _send(ws, "error", error="Send audio_start before audio frames")
+            continue
+        try:
+            frame = json.loads(raw)
+        except ValueError:
+            _send(ws, "error", error="Frames must be JSON")
+            continue
+
+        kind = frame.get("type")
+        start = time.monotonic()
+        if kind == "ping":
+            _send(ws, "pong")
+            continue
+        if kind not in ("answer", "audio_start"):
+            _send(ws, "error", error=f"Unknown frame type: {kind}")
+            continue
+        path = None
+        try:
+            if kind == "answer":
+                error = answer_error(frame.get("text"), frame.get("code"))
+                if error:
+                    _send(ws, "error", error=error)
+                    continue
+                done = _run_turn(ws, user_id, session, text=frame.get("text", ""),
+                                 code=frame.get("code"), tests=frame.get("tests"))
+            else:
+                name = os.path.basename(frame.get("filename") or "answer.webm")
+                path = f"/tmp/{uuid.uuid4()}_{name}"
+                end = _receive_audio(ws, path)
+                if end is None:
+                    _send(ws, "error", error="Audio upload aborted or empty")
+                    continue
+                done = _run_turn(ws, user_id, session, audio_path=path,
+                                 code=end.get("code"), tests=end.get("tests"))
+        except ConnectionClosed:
+            raise
+        except Exception as e:
+            # keep the connection; the turn's claim was released and can be retried
+            print(f"WebSocket turn failed: {e}")
+            _send(ws, "error", error="Failed to process answer")
+            continue
+        finally:
+            if path and os.path.exists(path):
+                os.remove(path)
+
+        metrics.observe("ws.turn_seconds", time.monotonic() - start)
+        if done:
+            return
@@ -0,0 +1,163 @@
+import math
+import threading
+import time
+from typing import Dict, List, Optional
+
+import deadline
+import metrics
+from config import (
+    RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST, MODEL_MAX_INFLIGHT,
+    MODEL_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT, ADMISSION_RETRY_AFTER
+)
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed; carries the Retry-After hint in seconds."""
+    def __init__(self, message: str, retry_after: int):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `capacity`."""
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def try_take(self, now: float) -> float:
+        """Take one token. Returns 0 on success, otherwise seconds until one is available."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class UserRateLimiter:
+    """Per-user token buckets. Idle, fully refilled buckets are dropped to bound memory."""
+
+    def __init__(self, per_minute: float, burst: int):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def check(self, user_id: str):
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(user_id)
+            if bucket is None:
+                bucket = self._buckets[user_id] = TokenBucket(self.rate, self.burst)
+            wait = bucket.try_take(now)
+            if now - self._last_sweep > 60:
+                self._sweep(now)
+        if wait:
+            metrics.incr("admission.rejected.rate_limit")
+            raise AdmissionRejected("Too many requests, slow down", math.ceil(wait))
+
+    def _sweep(self, now: float):
+        full_after = self.burst / self.rate
+        self._buckets = {u: b for u, b in self._buckets.items() if now - b.updated < full_after}
+        self._last_sweep = now
+
+
+class ModelGate:
+    """
+    Bounded concurrency for one downstream model: at most `max_inflight` calls run,
+    at most `max_queue` more wait (up to `queue_timeout` seconds, or what is left
+    of the request's deadline), the rest are rejected immediately.
+    """
+
+    def __init__(self, name: str, max_inflight: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.inflight = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        start = time.monotonic()
+        with self._cond:
+            if self.inflight >= self.max_inflight:
+                if self.waiting >= self.max_queue:
+                    metrics.incr(f"admission.rejected.queue_full.{self.name}")
+                    raise AdmissionRejected(f"{self.name} is at capacity, try again shortly", ADMISSION_RETRY_AFTER)
+                self.waiting += 1
+                try:
+                    left = deadline.remaining()
+                    wait_until = start + (self.queue_timeout if left is None else min(self.queue_timeout, left))
+                    while self.inflight >= self.max_inflight:
+                        remaining = wait_until - time.monotonic()
+                        if remaining <= 0:
+                            metrics.incr(f"admission.rejected.queue_timeout.{self.name}")
+                            raise AdmissionRejected(f"{self.name} is busy, try again shortly", ADMISSION_RETRY_AFTER)
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.inflight += 1
+        metrics.observe(f"admission.queue_wait.{self.name}", time.monotonic() - start)
+
+    def release(self):
+        with self._cond:
+            self.inflight -= 1
+            self._cond.notify()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"inflight": self.inflight, "waiting": self.waiting,
+                    "max_inflight": self.max_inflight, "max_queue": self.max_queue}
+
+
+rate_limiter = UserRateLimiter(RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST)
+_gates: Dict[str, ModelGate] = {}
+_gates_lock = threading.Lock()
+
+def gate(name: str) -> ModelGate:
+    with _gates_lock:
+        g = _gates.get(name)
+        if g is None:
+            g = _gates[name] = ModelGate(name, MODEL_MAX_INFLIGHT, MODEL_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT)
+        return g
+
+def admit(user_id: Optional[str], backends: List[str]) -> List[ModelGate]:
+    """
+    Rate-limit the user, then take a slot on every backend the request will hit.
+    Slots are taken in sorted order so two requests can't deadlock each other.
+
+    Returns:
+        The acquired gates; pass them to `release()` when the request finishes.
+
+    Raises:
+        AdmissionRejected: when the user is over their rate or a backend queue is full.
+    """
+    if user_id:
+        rate_limiter.check(user_id)
+    held: List[ModelGate] = []
+    try:
+        for name in sorted(set(backends)):
+            g = gate(name)
+            g.acquire()
+            held.append(g)
+    except AdmissionRejected:
+        release(held)
+        raise
+    metrics.incr("admission.admitted")
+    return held
+
+def release(held: List[ModelGate]):
+    """Give back every slot in `held` and empty it, so releasing the same list again is a no-op."""
+    while held:
+        held.pop().release()
+
+def admission_stats() -> Dict[str, Dict[str, int]]:
+    with _gates_lock:
+        gates = list(_gates.values())
+    return {g.name: g.stats() for g in gates}
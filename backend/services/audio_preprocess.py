@@ -0,0 +1,146 @@
+import os
+import shutil
+import struct
+import subprocess
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+import deadline
+from config import (
+    AUDIO_PREPROCESS, AUDIO_TARGET_RATE, AUDIO_OPUS_BITRATE, AUDIO_VAD_FRAME_MS,
+    AUDIO_VAD_THRESHOLD_DB, AUDIO_VAD_PAD_MS
+)
+
+FFMPEG = shutil.which("ffmpeg")
+
+def _decode_to_wav_bytes(path: str) -> bytes:
+    """
+    Decode any container/codec the browser recorder produces into 16-bit PCM
+    WAV bytes, downmixed to mono and resampled to AUDIO_TARGET_RATE by ffmpeg
+    (its resampler low-pass filters, so 44.1/48 kHz input doesn't alias).
+    """
+    proc = subprocess.run(
+        [FFMPEG, "-nostdin", "-loglevel", "error", "-i", path,
+         "-vn", "-ac", "1", "-ar", str(AUDIO_TARGET_RATE), "-acodec", "pcm_s16le", "-f", "wav", "pipe:1"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True,
+        timeout=deadline.timeout_for("audio_preprocess", 30)
+    )
+    return proc.stdout
+
+def _parse_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """
+    Parse a PCM16 WAV byte string into a (frames, channels) float32 array.
+
+    ffmpeg writes placeholder chunk sizes when streaming to a pipe, so the
+    chunks are walked manually instead of trusting the header like `wave` does.
+    """
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Not a WAV stream")
+    pos, channels, rate = 12, 0, 0
+    while pos + 8 <= len(data):
+        chunk_id = data[pos:pos + 4]
+        chunk_size = struct.unpack("<I", data[pos + 4:pos + 8])[0]
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            channels, rate = struct.unpack("<HI", data[body + 2:body + 8])
+        elif chunk_id == b"data":
+            if channels == 0:
+                raise ValueError("WAV data chunk before fmt chunk")
+            end = len(data) if chunk_size == 0xFFFFFFFF else min(len(data), body + chunk_size)
+            pcm = np.frombuffer(data[body:end - (end - body) % (2 * channels)], dtype="<i2")
+            samples = pcm.reshape(-1, channels).astype(np.float32) / 32768.0
+            return samples, rate
+        pos = body + chunk_size + (chunk_size & 1)
+    raise ValueError("WAV stream has no data chunk")
+
+def _trim_silence(mono: np.ndarray, rate: int) -> np.ndarray:
+    """
+    Energy-based voice activity detection: drop leading and trailing frames
+    whose RMS is below AUDIO_VAD_THRESHOLD_DB relative to the loudest frame.
+    """
+    frame = max(1, int(rate * AUDIO_VAD_FRAME_MS / 1000))
+    n_frames = mono.size // frame
+    if n_frames == 0:
+        return mono
+    frames = mono[:n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames * frames, axis=1) + 1e-12)
+    db = 20.0 * np.log10(rms / rms.max())
+    voiced = np.flatnonzero(db > AUDIO_VAD_THRESHOLD_DB)
+    if voiced.size == 0:
+        return mono
+    pad = int(AUDIO_VAD_PAD_MS / AUDIO_VAD_FRAME_MS)
+    start = max(0, voiced[0] - pad) * frame
+    end = min(n_frames, voiced[-1] + 1 + pad) * frame
+    return mono[start:end]
+
+def _encode_opus(mono: np.ndarray, rate: int, out_path: str):
+    """Mono Opus in Ogg, tuned for speech; about as compact as the browser's own upload."""
+    pcm = (np.clip(mono, -1.0, 1.0) * 32767.0).astype("<i2").tobytes()
+    subprocess.run(
+        [FFMPEG, "-nostdin", "-loglevel", "error", "-y",
+         "-f", "s16le", "-ar", str(rate), "-ac", "1", "-i", "pipe:0",
+         "-c:a", "libopus", "-b:a", AUDIO_OPUS_BITRATE, "-application", "voip", out_path],
+        input=pcm, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True,
+        timeout=deadline.timeout_for("audio_preprocess", 30)
+    )
+
+def preprocess_audio(path: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Trim silence and convert an uploaded recording to 16 kHz mono Opus before transcription.
+
+    Args:
+        path: Path to the uploaded audio file (any format ffmpeg can decode)
+
+    Returns:
+        (path_to_transcribe, stats) where path_to_transcribe is either a new
+        `.ogg` file next to the input or the original path if preprocessing
+        was skipped or didn't make the file smaller. `stats` reports
+        original/processed sizes and durations and `bytes_saved`.
+    """
+    original_bytes = os.path.getsize(path)
+    stats: Dict[str, Any] = {
+        "original_bytes": original_bytes,
+        "processed_bytes": original_bytes,
+        "bytes_saved": 0,
+        "applied": False,
+    }
+    if not AUDIO_PREPROCESS or FFMPEG is None:
+        stats["reason"] = "disabled" if not AUDIO_PREPROCESS else "ffmpeg not found"
+        return path, stats
+
+    out_path: Optional[str] = None
+    try:
+        samples, rate = _parse_wav(_decode_to_wav_bytes(path))
+        mono = samples[:, 0]
+        trimmed = _trim_silence(mono, rate)
+        if trimmed.size == 0:
+            stats["reason"] = "no audio samples"
+            return path, stats
+
+        out_path = os.path.splitext(path)[0] + ".16k.ogg"
+        _encode_opus(trimmed, rate, out_path)
+        processed_bytes = os.path.getsize(out_path)
+
+        stats.update({
+            "original_seconds": round(mono.size / rate, 2),
+            "processed_seconds": round(trimmed.size / rate, 2),
+        })
+        if processed_bytes >= original_bytes:
+            # the point is a smaller upload: a shorter but bigger file doesn't help
+            os.remove(out_path)
+            stats["reason"] = "not smaller"
+            return path, stats
+
+        stats.update({
+            "processed_bytes": processed_bytes,
+            "bytes_saved": original_bytes - processed_bytes,
+            "applied": True,
+        })
+        return out_path, stats
+    except (subprocess.SubprocessError, ValueError, OSError) as e:
+        print(f"Audio preprocessing skipped: {e}")
+        if out_path and os.path.exists(out_path):
+            os.remove(out_path)
+        stats["reason"] = "error"
+        return path, stats
@@ -0,0 +1,318 @@
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import metrics
+from config import (
+    AUDIO_STORE_DIR, AUDIO_USER_QUOTA_MB, AUDIO_GLOBAL_QUOTA_MB, AUDIO_MAX_AGE_DAYS,
+    AUDIO_MIN_FREE_MB, AUDIO_EVICT_INTERVAL, AUDIO_EVICT_NICE
+)
+
+# Stored interview recordings under AUDIO_STORE_DIR/<session_id>/, with an
+# sqlite index (AUDIO_STORE_DIR/index.sqlite3) of every file: owner, size,
+# creation and last access time, plus running byte totals per user and
+# overall. Listing and eviction read the index, never the directories.
+#
+# A low-priority background thread per process evicts recordings older than
+# AUDIO_MAX_AGE_DAYS, then the least recently accessed ones of any user over
+# AUDIO_USER_QUOTA_MB, then globally least recently accessed ones until the
+# store is back under 90% of AUDIO_GLOBAL_QUOTA_MB. It runs every
+# AUDIO_EVICT_INTERVAL and is woken early when a store pushes a quota over.
+# Storing never waits for eviction: a recording that would exceed the global
+# quota, or leave less than AUDIO_MIN_FREE_MB on the disk, is skipped.
+#
+# Several worker processes may share the index; a row is deleted before its
+# file, so exactly one process unlinks (and un-counts) each recording.
+
+INDEX_PATH = os.path.join(AUDIO_STORE_DIR, "index.sqlite3")
+_MB = 1024 * 1024
+_GLOBAL = "*"            # usage row holding the total over all users
+_LOW_WATERMARK = 0.9     # global eviction target, as a fraction of the quota
+_BATCH = 100             # recordings deleted per pass before yielding
+
+_SCHEMA = """
+create table if not exists recordings (
+    path text primary key,            -- relative to AUDIO_STORE_DIR
+    user_id text not null,
+    session_id text not null,
+    turn_index integer,
+    bytes integer not null,
+    created_at real not null,
+    last_access real not null
+);
+create index if not exists recordings_session on recordings (session_id, turn_index);
+create index if not exists recordings_user_access on recordings (user_id, last_access);
+create index if not exists recordings_access on recordings (last_access);
+create index if not exists recordings_created on recordings (created_at);
+create table if not exists usage (user_id text primary key, bytes integer not null);
+create table if not exists meta (key text primary key, value text);
+"""
+
+_lock = threading.Lock()
+_local = threading.local()
+_wake = threading.Event()
+_started_pid: Optional[int] = None
+
+def _db() -> sqlite3.Connection:
+    """Per-thread connection (autocommit; transactions are explicit)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.pid != os.getpid():
+        os.makedirs(AUDIO_STORE_DIR, exist_ok=True)
+        conn = sqlite3.connect(INDEX_PATH, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("pragma journal_mode=wal")
+        conn.executescript(_SCHEMA)
+        _local.conn, _local.pid = conn, os.getpid()
+    return conn
+
+def _add_usage(conn: sqlite3.Connection, user_id: str, delta: int):
+    for key in (user_id, _GLOBAL):
+        conn.execute(
+            "insert into usage (user_id, bytes) values (?, ?) "
+            "on conflict (user_id) do update set bytes = bytes + excluded.bytes",
+            (key, delta),
+        )
+
+def _usage(conn: sqlite3.Connection, user_id: str) -> int:
+    row = conn.execute("select bytes from usage where user_id = ?", (user_id,)).fetchone()
+    return row["bytes"] if row else 0
+
+def store_audio(user_id: str, session_id: str, turn_index: Optional[int], temp_path: str) -> Optional[str]:
+    """
+    Copy a recording into the store and index it.
+
+    Returns:
+        The stored path, or None when it was skipped because the global quota
+        or the disk's free-space floor would be exceeded.
+    """
+    start()
+    size = os.path.getsize(temp_path)
+    conn = _db()
+    if _usage(conn, _GLOBAL) + size > AUDIO_GLOBAL_QUOTA_MB * _MB or \
+            shutil.disk_usage(AUDIO_STORE_DIR).free - size < AUDIO_MIN_FREE_MB * _MB:
+        metrics.incr("audio_store.skipped")
+        _wake.set()
+        return None
+
+    session_dir = os.path.join(AUDIO_STORE_DIR, session_id)
+    os.makedirs(session_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"q{turn_index}_{timestamp}{os.path.splitext(temp_path)[1]}"
+    target_path = os.path.join(session_dir, filename)
+    shutil.copy2(temp_path, target_path)
+
+    now = time.time()
+    conn.execute("begin immediate")
+    try:
+        replaced = conn.execute("select user_id, bytes from recordings where path = ?",
+                                (os.path.join(session_id, filename),)).fetchone()
+        if replaced:  # same turn stored twice within a second
+            _add_usage(conn, replaced["user_id"], -replaced["bytes"])
+        conn.execute(
+            "insert or replace into recordings (path, user_id, session_id, turn_index, bytes, created_at, last_access) "
+            "values (?, ?, ?, ?, ?, ?, ?)",
+            (os.path.join(session_id, filename), user_id, session_id, turn_index, size, now, now),
+        )
+        _add_usage(conn, user_id, size)
+        over = _usage(conn, user_id) > AUDIO_USER_QUOTA_MB * _MB or \
+            _usage(conn, _GLOBAL) > _LOW_WATERMARK * AUDIO_GLOBAL_QUOTA_MB * _MB
+        conn.execute("commit")
+    except Exception:
+        conn.execute("rollback")
+        os.remove(target_path)
+        raise
+    metrics.incr("audio_store.stored")
+    metrics.incr("audio_store.stored_bytes", size)
+    if over:
+        _wake.set()
+    return target_path
+
+def list_audio(session_id: str, turn_index: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Recordings of a session (optionally one turn), oldest first; marks them as accessed."""
+    conn = _db()
+    sql = "select path, bytes, created_at from recordings where session_id = ?"
+    args: List[Any] = [session_id]
+    if turn_index is not None:
+        sql += " and turn_index = ?"
+        args.append(turn_index)
+    rows = conn.execute(sql + " order by created_at", args).fetchall()
+    if rows:
+        conn.execute(f"update recordings set last_access = ? where path in ({','.join('?' * len(rows))})",
+                     [time.time()] + [r["path"] for r in rows])
+    return [{
+        "filename": os.path.basename(r["path"]),
+        "path": os.path.join(AUDIO_STORE_DIR, r["path"]),
+        "size": r["bytes"],
+        "created": datetime.fromtimestamp(r["created_at"]).isoformat(),
+    } for r in rows]
+
+def _delete(conn: sqlite3.Connection, rows, reason: str) -> int:
+    """Delete indexed recordings (row first, then file). Returns bytes freed by this process."""
+    freed = 0
+    for r in rows:
+        conn.execute("begin immediate")
+        try:
+            gone = conn.execute("delete from recordings where path = ?", (r["path"],)).rowcount
+            if gone:
+                _add_usage(conn, r["user_id"], -r["bytes"])
+            conn.execute("commit")
+        except Exception:
+            conn.execute("rollback")
+            raise
+        if not gone:
+            continue  # another process got it first
+        try:
+            os.remove(os.path.join(AUDIO_STORE_DIR, r["path"]))
+        except FileNotFoundError:
+            pass
+        freed += r["bytes"]
+        metrics.incr(f"audio_store.evicted.{reason}")
+        metrics.incr("audio_store.evicted_bytes", r["bytes"])
+    return freed
+
+def evict() -> int:
+    """One eviction pass: age, then per-user quota, then global quota. Returns bytes freed."""
+    conn = _db()
+    freed = 0
+
+    cutoff = time.time() - AUDIO_MAX_AGE_DAYS * 86400
+    while True:
+        rows = conn.execute("select path, user_id, bytes from recordings where created_at < ? limit ?",
+                            (cutoff, _BATCH)).fetchall()
+        if not rows:
+            break
+        freed += _delete(conn, rows, "age")
+        time.sleep(0.01)
+
+    user_limit = AUDIO_USER_QUOTA_MB * _MB
+    over_users = conn.execute("select user_id, bytes from usage where user_id not in (?, '') and bytes > ?",
+                              (_GLOBAL, user_limit)).fetchall()
+    for u in over_users:
+        excess = u["bytes"] - user_limit
+        while excess > 0:
+            rows = conn.execute("select path, user_id, bytes from recordings where user_id = ? "
+                                "order by last_access limit ?", (u["user_id"], _BATCH)).fetchall()
+            if not rows:
+                break
+            batch, taken = [], 0
+            for r in rows:
+                if taken >= excess:
+                    break
+                batch.append(r)
+                taken += r["bytes"]
+            freed += _delete(conn, batch, "user_quota")
+            excess -= taken
+            time.sleep(0.01)
+
+    target = _LOW_WATERMARK * AUDIO_GLOBAL_QUOTA_MB * _MB
+    while _usage(conn, _GLOBAL) > target:
+        excess = _usage(conn, _GLOBAL) - target
+        rows = conn.execute("select path, user_id, bytes from recordings order by last_access limit ?",
+                            (_BATCH,)).fetchall()
+        if not rows:
+            break
+        batch, taken = [], 0
+        for r in rows:
+            if taken >= excess:
+                break
+            batch.append(r)
+            taken += r["bytes"]
+        freed += _delete(conn, batch, "global_quota")
+        time.sleep(0.01)
+    return freed
+
+def _import_existing():
+    """Index recordings written before the index existed (one directory scan, ever)."""
+    from db.supabase_db import get_session
+
+    conn = _db()
+    conn.execute("begin immediate")
+    try:
+        if conn.execute("select 1 from meta where key = 'imported'").fetchone():
+            conn.execute("commit")
+            return
+        count = 0
+        for session_id in os.listdir(AUDIO_STORE_DIR):
+            session_dir = os.path.join(AUDIO_STORE_DIR, session_id)
+            if not os.path.isdir(session_dir):
+                continue
+            try:
+                user_id = (get_session(session_id) or {}).get("user_id") or ""
+            except Exception:
+                user_id = ""  # unknown owner: only the global quota applies
+            for filename in os.listdir(session_dir):
+                st = os.stat(os.path.join(session_dir, filename))
+                turn = filename[1:].split("_", 1)[0] if filename.startswith("q") else ""
+                cur = conn.execute(
+                    "insert or ignore into recordings (path, user_id, session_id, turn_index, bytes, created_at, last_access) "
+                    "values (?, ?, ?, ?, ?, ?, ?)",
+                    (os.path.join(session_id, filename), user_id, session_id,
+                     int(turn) if turn.isdigit() else None, st.st_size, st.st_mtime, st.st_mtime),
+                )
+                if cur.rowcount:
+                    _add_usage(conn, user_id, st.st_size)
+                    count += 1
+        conn.execute("insert into meta (key, value) values ('imported', ?)", (str(time.time()),))
+        conn.execute("commit")
+    except Exception:
+        conn.execute("rollback")
+        raise
+    if count:
+        print(f"Indexed {count} existing audio recordings")
+
+def _lower_priority():
+    # On Linux each thread has its own nice value, addressed by its native id
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), AUDIO_EVICT_NICE)
+    except (AttributeError, OSError):
+        pass
+
+def _evict_loop():
+    _lower_priority()
+    try:
+        _import_existing()
+    except Exception as e:
+        print(f"Audio index import failed: {e}")
+    while True:
+        try:
+            start_time = time.monotonic()
+            freed = evict()
+            metrics.observe("audio_store.evict_seconds", time.monotonic() - start_time)
+            if freed:
+                print(f"Evicted {freed} bytes of stored audio")
+        except Exception as e:
+            print(f"Audio eviction failed: {e}")
+        _wake.wait(AUDIO_EVICT_INTERVAL)
+        _wake.clear()
+
+def start():
+    """Start the eviction thread, once per process (safe to call repeatedly)."""
+    global _started_pid
+    pid = os.getpid()
+    if _started_pid == pid:
+        return
+    with _lock:
+        if _started_pid == pid:
+            return
+        _started_pid = pid
+    threading.Thread(target=_evict_loop, name="audio-evict", daemon=True).start()
+
+def audio_store_stats() -> Dict[str, Any]:
+    conn = _db()
+    row = conn.execute("select count(*) as n from recordings").fetchone()
+    return {
+        "recordings": row["n"],
+        "bytes": _usage(conn, _GLOBAL),
+        "global_quota_bytes": AUDIO_GLOBAL_QUOTA_MB * _MB,
+    }
+
+def _reset_after_fork():
+    global _lock, _wake
+    _lock = threading.Lock()
+    _wake = threading.Event()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
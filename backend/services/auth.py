@@ -3,9 +3,7 @@ import jwt
 import time
 import uuid
 from typing import Optional, Tuple, Dict, Any
-from db.supabase_db import sb
-from supabase import create_client
-import os
+from services.supa import auth_client
 
 class AuthError(Exception):
     """Custom exception for authentication errors"""
@@ -14,15 +12,15 @@ class AuthError(Exception):
         super().__init__(self.message)
 
 
-supabase = sb()
 def signup(email: str, password: str):
-    return supabase.auth.sign_up({"email": email, "password": password})
+    return auth_client().auth.sign_up({"email": email, "password": password})
 
 def login(email: str, password: str):
-    return supabase.auth.sign_in_with_password({"email": email, "password": password})
+    return auth_client().auth.sign_in_with_password({"email": email, "password": password})
 
 def logout(token: str):
-    return supabase.auth.sign_out(token)
+    # revoke this token; the shared client's own session belongs to whoever signed in last
+    return auth_client().auth.admin.sign_out(token)
 
 
 def get_user_id_from_auth(auth_header: Optional[str]) -> Tuple[bool, str]:
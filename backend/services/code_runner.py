@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import deadline
+import metrics
+from config import (
+    CODE_RUNNER_WORKERS, CODE_RUN_TIMEOUT, CODE_RUN_CPU_SECONDS,
+    CODE_RUN_MEMORY_MB, CODE_RUN_CACHE_SIZE, CODE_MAX_BYTES, CODE_RUN_UID, CODE_RUN_REQUIRE_ISOLATION
+)
+
+# Runs submitted Python against its tests in single-use worker processes
+# (services/sandbox_worker.py). Workers are started ahead of time so a run
+# doesn't pay interpreter startup. Each one (-I, scrubbed environment, empty
+# temp directory) forks the child that runs the submission in its own network
+# namespace, chrooted into that directory as CODE_RUN_UID and limited by
+# rlimits (CPU, address space, file size, open files); the worker builds the
+# result from the child's reports, on a channel separate from its own stdout.
+# Workers are killed with their process group on timeout. Results are cached
+# by (code hash, tests hash). Program output is never returned.
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_worker.py")
+_LIMITS = json.dumps({
+    "cpu_seconds": CODE_RUN_CPU_SECONDS,
+    "memory_bytes": CODE_RUN_MEMORY_MB * 1024 * 1024,
+    "file_bytes": 1024 * 1024,
+    "uid": CODE_RUN_UID,
+    "require_isolation": CODE_RUN_REQUIRE_ISOLATION,
+})
+
+_lock = threading.Lock()
+_ready: Deque[Tuple[subprocess.Popen, str]] = deque()
+_slots = threading.BoundedSemaphore(max(1, CODE_RUNNER_WORKERS))
+_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+_refilling = False
+
+def _spawn() -> Tuple[subprocess.Popen, str]:
+    workdir = tempfile.mkdtemp(prefix="code-run-")
+    proc = subprocess.Popen(
+        [sys.executable, "-I", WORKER_SCRIPT, _LIMITS],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        cwd=workdir, env={"PATH": "/usr/bin:/bin", "PYTHONHASHSEED": "0"},
+        start_new_session=True, text=True,
+    )
+    return proc, workdir
+
+def _refill():
+    """Top the ready queue back up to CODE_RUNNER_WORKERS warm workers."""
+    global _refilling
+    try:
+        while True:
+            with _lock:
+                if len(_ready) >= CODE_RUNNER_WORKERS:
+                    return
+            worker = _spawn()
+            with _lock:
+                _ready.append(worker)
+    finally:
+        _refilling = False
+
+def prewarm():
+    """Start warm workers in the background (one refill thread at a time)."""
+    global _refilling
+    with _lock:
+        if _refilling:
+            return
+        _refilling = True
+    threading.Thread(target=_refill, name="code-runner-refill", daemon=True).start()
+
+def _take_worker() -> Tuple[subprocess.Popen, str]:
+    with _lock:
+        while _ready:
+            proc, workdir = _ready.popleft()
+            if proc.poll() is None:
+                metrics.incr("code_runner.warm")
+                return proc, workdir
+            shutil.rmtree(workdir, ignore_errors=True)
+    metrics.incr("code_runner.cold")
+    return _spawn()
+
+def _kill(proc: subprocess.Popen):
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    proc.wait()
+
+def _execute(code: str, tests: str) -> Dict[str, Any]:
+    timeout = deadline.timeout_for("code_run", CODE_RUN_TIMEOUT)
+    proc, workdir = _take_worker()
+    prewarm()  # replace the worker we just took, off the request path
+    start = time.monotonic()
+    try:
+        try:
+            out, _ = proc.communicate(json.dumps({"code": code, "tests": tests}) + "\n", timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill(proc)
+            if timeout < CODE_RUN_TIMEOUT:
+                # cut short by the request deadline, not the code's fault (and not cached)
+                raise deadline.DeadlineExceeded("code_run")
+            metrics.incr("code_runner.timeout")
+            return {"status": "timeout", "tests": [], "passed": 0, "failed": 0}
+        try:
+            result = json.loads(out.strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            return {"status": "crashed", "exit_code": proc.returncode, "tests": [], "passed": 0, "failed": 0}
+        if result["status"] in ("cpu_limit", "sandbox_unavailable"):
+            metrics.incr(f"code_runner.{result['status']}")
+        return result
+    finally:
+        metrics.observe("code_runner.seconds", time.monotonic() - start)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def _key(code: str, tests: str) -> Tuple[str, str]:
+    return (hashlib.sha256(code.encode("utf-8")).hexdigest(),
+            hashlib.sha256(tests.encode("utf-8")).hexdigest())
+
+def run_code(code: str, tests: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run `code`, then `tests` (Python source; each `test_*` function is one test,
+    otherwise the whole source is one test of module-level asserts).
+
+    Returns:
+        {"status", "passed", "failed", "tests": [{"name", "passed", "error"?}], ...}
+        where status is one of ok, tests_failed, syntax_error, runtime_error,
+        timeout, cpu_limit, memory_limit, crashed, too_large or
+        sandbox_unavailable (isolation couldn't be set up; nothing ran).
+
+    Raises:
+        DeadlineExceeded: the request's deadline ran out before the run finished.
+    """
+    tests = tests or ""
+    if len(code.encode("utf-8")) + len(tests.encode("utf-8")) > CODE_MAX_BYTES:
+        return {"status": "too_large", "tests": [], "passed": 0, "failed": 0}
+
+    key = _key(code, tests)
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+    if cached is not None:
+        metrics.incr("code_runner.cache_hit")
+        return cached
+    metrics.incr("code_runner.cache_miss")
+
+    with _slots:
+        result = _execute(code, tests)
+    if result["status"] not in ("crashed", "sandbox_unavailable"):
+        with _lock:
+            _cache[key] = result
+            while len(_cache) > CODE_RUN_CACHE_SIZE:
+                _cache.popitem(last=False)
+    return result
+
+def format_report(result: Dict[str, Any]) -> str:
+    """One line for the judge prompt, e.g. "tests_failed: 2/3 tests passed; test_empty: AssertionError"."""
+    status = result["status"]
+    total = result["passed"] + result["failed"]
+    parts = [f"{status}: {result['passed']}/{total} tests passed" if total else status]
+    if result.get("error"):
+        parts.append(result["error"])
+    parts.extend(f"{t['name']}: {t.get('error', 'failed')}" for t in result["tests"] if not t["passed"])
+    return "; ".join(parts)[:500]
+
+def _reset_after_fork():
+    global _lock, _slots, _refilling
+    _lock = threading.Lock()
+    _slots = threading.BoundedSemaphore(max(1, CODE_RUNNER_WORKERS))
+    _refilling = False
+    _ready.clear()  # those workers belong to the parent
+
+os.register_at_fork(after_in_child=_reset_after_fork)
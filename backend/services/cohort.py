@@ -0,0 +1,99 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from agents import generate_question
+from agents.agents import INTERVIEW_MODEL
+from agents.scheduler import priority, BATCH
+from config import COHORT_QUESTION_POOL, COHORT_MAX_PARALLEL
+from db.supabase_db import create_sessions, insert_questions
+from services.admission import gate, AdmissionRejected
+from services.jobs import JobProgress
+from services.question_pool import question_key
+
+# A cohort start generates a small pool of distinct first questions (a few
+# parallel model calls, each holding a normal admission slot so interactive
+# users still get through), then creates every session in one insert and
+# every first turn in another, spreading the pool across students.
+
+def _generate_admitted(track: str, round_num: int, avoid: List[str]) -> Dict[str, str]:
+    """Generate one question ({"question", "topic"}) while holding a slot on the interviewer model's gate."""
+    g = gate(INTERVIEW_MODEL)
+    while True:
+        try:
+            g.acquire()
+            break
+        except AdmissionRejected as e:
+            time.sleep(e.retry_after)  # background work yields to interactive traffic
+    try:
+        with priority(BATCH):  # runs on a pool thread, so set here rather than by the job
+            return generate_question(track, round_num, avoid)
+    finally:
+        g.release()
+
+def build_question_pool(track: str, size: int, progress: JobProgress) -> List[Dict[str, str]]:
+    """
+    Up to `size` distinct first questions ({"question", "topic"}). The first
+    wave runs in parallel with a different topic hint per call; near-duplicates
+    are dropped and a short sequential top-up asks for replacements that avoid
+    what is already pooled.
+    """
+    pool: List[Dict[str, str]] = []
+    seen = set()
+
+    def add(generated: Dict[str, str]):
+        key = question_key(generated["question"])
+        if generated["question"] and key not in seen:
+            seen.add(key)
+            pool.append(generated)
+
+    with ThreadPoolExecutor(max_workers=max(1, COHORT_MAX_PARALLEL)) as ex:
+        futures = [ex.submit(_generate_admitted, track, i + 1, []) for i in range(size)]
+        for f in futures:
+            try:
+                add(f.result())
+            except Exception as e:
+                print(f"Cohort question generation failed: {e}")
+            progress.advance(stage="questions")
+
+    for i in range(size - len(pool)):
+        try:
+            add(_generate_admitted(track, i + 1, [p["question"] for p in pool]))
+        except Exception as e:
+            print(f"Cohort question top-up failed: {e}")
+
+    if not pool:
+        raise RuntimeError("Could not generate any first questions")
+    return pool
+
+def start_cohort(user_ids: List[str], track: str, num_questions: int, progress: JobProgress) -> Dict[str, Any]:
+    """
+    Job body for a bulk start: question pool, then one multi-row insert for the
+    sessions and one for their first turns.
+
+    Returns:
+        {"track", "distinct_questions", "sessions": [{"user_id", "session_id", "question", "turn_index"}]}
+    """
+    pool_size = max(1, min(COHORT_QUESTION_POOL, len(user_ids)))
+    progress.set_total(pool_size + 2)
+
+    pool = build_question_pool(track, pool_size, progress)
+
+    session_ids = create_sessions(user_ids, track, num_questions)
+    progress.advance(stage="sessions")
+
+    questions = [pool[i % len(pool)] for i in range(len(session_ids))]
+    insert_questions([
+        {"session_id": sid, "turn_index": 1, "question": q["question"], "topic": q["topic"]}
+        for sid, q in zip(session_ids, questions)
+    ])
+    progress.advance(stage="first_turns")
+
+    return {
+        "track": track,
+        "distinct_questions": len(pool),
+        "sessions": [
+            {"user_id": u, "session_id": sid, "question": q["question"], "turn_index": 1}
+            for u, sid, q in zip(user_ids, session_ids, questions)
+        ],
+    }
@@ -0,0 +1,22 @@
+import gzip
+from flask import Response, request
+
+# Bodies below this size aren't worth the CPU or the gzip header overhead
+MIN_COMPRESS_BYTES = 512
+
+def gzip_response(response: Response) -> Response:
+    """after_request hook: gzip JSON bodies when the client accepts it."""
+    if (response.direct_passthrough
+            or response.status_code < 200 or response.status_code >= 300
+            or "Content-Encoding" in response.headers
+            or response.mimetype != "application/json"
+            or "gzip" not in request.headers.get("Accept-Encoding", "").lower()):
+        return response
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_BYTES:
+        return response
+    response.set_data(gzip.compress(body, compresslevel=6))
+    response.headers["Content-Encoding"] = "gzip"
+    response.headers["Content-Length"] = str(len(response.get_data()))
+    response.vary.add("Accept-Encoding")
+    return response
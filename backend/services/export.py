@@ -0,0 +1,79 @@
+import base64
+import json
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import metrics
+from config import EXPORT_PAGE_SESSIONS
+from db.supabase_db import get_user_sessions_page, get_qas_for_sessions
+
+# Streams a user's whole interview history as newline-delimited JSON.
+#
+# Sessions are read a page at a time with a (created_at, id) keyset cursor,
+# and each page's QA pairs and evals come from one more query, so memory is
+# bounded by one page whatever the size of the history. Each line is one
+# session with its turns and every eval (oldest first, so re-scores are
+# visible). Each line also carries the `cursor` to pass as `after` to resume
+# an interrupted export after that session. The last line is
+# {"type": "end", "sessions": n}, or {"type": "error", ...} if a read failed
+# mid-stream (the status code is already sent by then).
+
+def encode_cursor(created_at: str, session_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{created_at}|{session_id}".encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(created_at, id) from an export cursor; None for no cursor. Raises ValueError if malformed."""
+    if not cursor:
+        return None
+    created_at, _, session_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").partition("|")
+    if not created_at or not session_id:
+        raise ValueError("malformed cursor")
+    return created_at, session_id
+
+def _line(obj: Dict[str, Any]) -> bytes:
+    return (json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+def _session_lines(sessions: List[Dict[str, Any]]) -> Iterator[bytes]:
+    turns: Dict[str, List[Dict[str, Any]]] = {s["id"]: [] for s in sessions}
+    for qa in get_qas_for_sessions(list(turns)):
+        turns[qa.pop("session_id")].append(qa)
+    for s in sessions:
+        yield _line({"type": "session", **s, "turns": turns[s["id"]],
+                     "cursor": encode_cursor(s["created_at"], s["id"])})
+
+def export_lines(user_id: str, after: Optional[Tuple[str, str]] = None) -> Iterator[bytes]:
+    """NDJSON lines (bytes) for every session of `user_id` after the `after` cursor, oldest first."""
+    count = 0
+    try:
+        while True:
+            page = get_user_sessions_page(user_id, after, EXPORT_PAGE_SESSIONS)
+            if not page:
+                break
+            for line in _session_lines(page):
+                count += 1
+                yield line
+            after = (page[-1]["created_at"], page[-1]["id"])
+            if len(page) < EXPORT_PAGE_SESSIONS:
+                break
+    except Exception as e:
+        print(f"Export for {user_id} failed after {count} sessions: {e}")
+        metrics.incr("export.failed")
+        yield _line({"type": "error", "error": "Export interrupted",
+                     "cursor": encode_cursor(*after) if after else None})
+        return
+    metrics.incr("export.sessions", count)
+    yield _line({"type": "end", "sessions": count})
+
+def gzip_stream(chunks: Iterator[bytes], flush_bytes: int = 64 * 1024) -> Iterator[bytes]:
+    """Gzip a byte stream incrementally, flushing every `flush_bytes` of input so the client sees progress."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    pending = 0
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        pending += len(chunk)
+        if pending >= flush_bytes:
+            out += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if out:
+            yield out
+    yield compressor.flush()
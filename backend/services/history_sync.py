@@ -0,0 +1,51 @@
+import zlib
+from typing import Any, Dict, List, Optional
+
+# Versioned history protocol for /start and /answer.
+#
+# The server tags every history it returns with a token "<length>.<crc32>".
+# The client echoes the last token it saw as `history_version`; if that token
+# still describes a prefix of the server's history, only the lines after it
+# are sent back (`history_delta`). Anything else (no token, a malformed or
+# stale token, or `full_history: true`) gets the full `history` list.
+
+def _prefix_crc(history: List[str], n: int) -> int:
+    crc = 0
+    for line in history[:n]:
+        crc = zlib.crc32(line.encode("utf-8"), crc)
+        crc = zlib.crc32(b"\n", crc)
+    return crc
+
+def history_version(history: List[str]) -> str:
+    return f"{len(history)}.{_prefix_crc(history, len(history)):08x}"
+
+def _parse_version(token: Optional[str], history: List[str]) -> Optional[int]:
+    """Length of the client's known prefix, or None if the token doesn't match this history."""
+    if not token:
+        return None
+    try:
+        length_part, crc_part = str(token).split(".", 1)
+        n = int(length_part)
+        crc = int(crc_part, 16)
+    except ValueError:
+        return None
+    if n < 0 or n > len(history) or _prefix_crc(history, n) != crc:
+        return None
+    return n
+
+def history_payload(history: List[str], client_version: Optional[str] = None, full: bool = False) -> Dict[str, Any]:
+    """
+    Response fields for a history the client may already partly have.
+
+    Returns:
+        {"history_version", "history"} for a full resync, or
+        {"history_version", "history_delta", "history_since"} with only the new lines.
+    """
+    payload: Dict[str, Any] = {"history_version": history_version(history)}
+    known = None if full else _parse_version(client_version, history)
+    if known is None:
+        payload["history"] = history
+    else:
+        payload["history_delta"] = history[known:]
+        payload["history_since"] = known
+    return payload
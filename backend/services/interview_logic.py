@@ -1,26 +1,47 @@
 import json
-from typing import List, Tuple, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from agents import generate_first_question, judge_step
+from services.question_pool import fallback_question
+from services.quick_score import confident_score
 
-def first_question_logic(mode) -> Tuple[str, List[str]]:
+PENDING_FEEDBACK = "Score pending: this answer is still being evaluated."
+PROVISIONAL_FEEDBACK = "Provisional score: detailed feedback is on its way."
+
+def evaluation_payload(score: Optional[int], feedback: str, pending: bool = False,
+                       confidence: Optional[float] = None) -> Dict[str, Any]:
+    """
+    The `evaluation` object of turn responses: {"score", "feedback"}, plus
+    "pending": True while the judge's score is still to come. A pending
+    evaluation with a score carries the local scorer's estimate, marked
+    "provisional" with its "confidence".
+    """
+    out: Dict[str, Any] = {"score": score, "feedback": feedback}
+    if pending:
+        out["pending"] = True
+        if score is not None:
+            out["provisional"] = True
+            out["confidence"] = round(confidence or 0.0, 3)
+    return out
+
+def first_question_logic(mode) -> Tuple[str, str, List[str]]:
+    """(question, topic, history) for a new session."""
     out = generate_first_question(mode)
-    return out["question"], out["history"]
+    return out["question"], out["topic"], out["history"]
 
-def evaluate_and_next_logic(question: str, answer: str, history: List[str]) -> Dict[str, Any]:
-    out = judge_step(question, answer, history)
+def parse_evaluation(raw: Any) -> Tuple[int, str]:
+    """(score, feedback) from the judge's output, defaulting to a 3 when it can't be parsed."""
     # parse judge JSON safely
     try:
-        print("out", out)
         # Check if the output is already in JSON format
-        if isinstance(out["evaluation_raw_json"], dict):
-            j = out["evaluation_raw_json"]
+        if isinstance(raw, dict):
+            j = raw
         else:
             # Try to parse as JSON
             try:
-                j = json.loads(out["evaluation_raw_json"])
+                j = json.loads(raw)
             except json.JSONDecodeError:
                 # Handle the case where it's a plain string
-                eval_text = out["evaluation_raw_json"]
+                eval_text = raw
                 j = {}
                 # Extract score from "Score: X" format
                 if "Score:" in eval_text:
@@ -42,9 +63,44 @@ def evaluate_and_next_logic(question: str, answer: str, history: List[str]) -> D
     except Exception as e:
         print(f"Error processing evaluation: {e}")
         score, feedback = 3, "Feedback unavailable."
+    return score, feedback
+
+def evaluate_and_next_logic(question: str, answer: str, history: List[str], code_report: str = "",
+                            on_evaluation: Optional[Callable[[Dict[str, Any]], None]] = None,
+                            mode: Optional[str] = None) -> Dict[str, Any]:
+    """Judge an answer and generate the next question. `on_evaluation(evaluation)`
+    fires as soon as the evaluation is known, before the next question is generated.
+
+    `pending` is True (and `score` None) when the judge still has to score the
+    answer later: when the local scorer gave a confident provisional score
+    (services/quick_score.py), or when a request deadline cut the judge short.
+    If the deadline cuts the interviewer short, the next question comes from
+    the question pool. `evaluation` is the payload for the client.
+    """
+    on_judged = None
+    if on_evaluation is not None:
+        on_judged = lambda raw, path: on_evaluation(evaluation_payload(*parse_evaluation(raw)))
+    out = judge_step(question, answer, history, code_report, on_judged, fallback_question, confident_score, mode=mode)
+    pending = out.get("judge_path") in ("pending", "provisional")
+    if pending:
+        score, feedback = None, PENDING_FEEDBACK
+        evaluation = evaluation_payload(None, feedback, pending=True)
+        if out.get("provisional"):
+            estimate, confidence = out["provisional"]
+            evaluation = evaluation_payload(estimate, PROVISIONAL_FEEDBACK, pending=True, confidence=confidence)
+        if on_evaluation is not None:
+            on_evaluation(evaluation)
+    else:
+        score, feedback = parse_evaluation(out["evaluation_raw_json"])
+        evaluation = evaluation_payload(score, feedback)
     return {
         "score": score,
         "feedback": feedback,
+        "pending": pending,
+        "evaluation": evaluation,
+        "judge_path": out.get("judge_path", ""),
         "next_question": out["next_question"],
+        "next_topic": out["next_topic"],
+        "question_source": out.get("question_source", "model"),
         "history": out["history"]
     }
@@ -0,0 +1,90 @@
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+import metrics
+from config import JOB_TTL_SECONDS, JOB_STALE_SECONDS
+from db.supabase_db import insert_job, update_job, get_job_row, fail_stale_job, delete_finished_jobs
+
+# Background jobs with pollable progress. A job runs on a thread of the worker
+# that started it, but its state lives in the `jobs` table, so a poll can land
+# on any worker. A running job with no progress write for JOB_STALE_SECONDS
+# lost its worker and is reported failed; finished jobs are deleted
+# JOB_TTL_SECONDS after they end.
+
+class JobProgress:
+    """Handle passed to a job function for reporting progress."""
+    __slots__ = ("job_id", "done")
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.done = 0
+
+    def set_total(self, total: int):
+        _update(self.job_id, total=total)
+
+    def advance(self, n: int = 1, stage: Optional[str] = None):
+        self.done += n
+        if stage:
+            _update(self.job_id, done=self.done, stage=stage)
+        else:
+            _update(self.job_id, done=self.done)
+
+    def stage(self, stage: str):
+        _update(self.job_id, stage=stage)
+
+def _update(job_id: str, **fields):
+    # progress is best effort: a failed write must not fail the job itself
+    try:
+        update_job(job_id, fields)
+    except Exception as e:
+        print(f"Job {job_id} progress write failed: {e}")
+
+def submit(kind: str, owner: str, fn: Callable[[JobProgress], Any]) -> str:
+    """
+    Record a job and run `fn(progress)` on a daemon thread; returns the job id.
+    The function's return value (JSON-serializable) becomes the job result; an
+    exception marks the job failed.
+    """
+    try:
+        delete_finished_jobs(JOB_TTL_SECONDS)
+    except Exception as e:
+        print(f"Dropping finished jobs failed: {e}")
+    job_id = insert_job(kind, owner)
+
+    def run():
+        try:
+            result = fn(JobProgress(job_id))
+            _update(job_id, status="done", stage="done", result=result, finished_at="now()")
+        except Exception as e:
+            _update(job_id, status="failed", error=str(e), finished_at="now()")
+            raise
+
+    _start(kind, job_id, run)
+    return job_id
+
+def spawn(kind: str, fn: Callable[[], Any]):
+    """
+    Run `fn()` on a daemon thread with the same metrics as a job, but nothing to
+    poll: for work whose outcome the client reads from the database itself.
+    """
+    _start(kind, str(uuid.uuid4()), fn)
+
+def _start(kind: str, job_id: str, fn: Callable[[], Any]):
+    def run():
+        start = time.monotonic()
+        try:
+            fn()
+            metrics.incr(f"jobs.{kind}.done")
+        except Exception as e:
+            print(f"Job {job_id} ({kind}) failed: {e}")
+            metrics.incr(f"jobs.{kind}.failed")
+        metrics.observe(f"jobs.{kind}.seconds", time.monotonic() - start)
+
+    threading.Thread(target=run, name=f"job-{kind}-{job_id[:8]}", daemon=True).start()
+
+def get_job(job_id: str, owner: str) -> Optional[Dict[str, Any]]:
+    """The job's row, or None if it doesn't exist (or belongs to someone else)."""
+    fail_stale_job(job_id, JOB_STALE_SECONDS, "the worker running this job stopped")
+    return get_job_row(job_id, owner)
@@ -0,0 +1,69 @@
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+import metrics
+from config import PENDING_EVAL_RECOVER_AFTER, PENDING_EVAL_SWEEP_INTERVAL, PENDING_EVAL_SWEEP_BATCH
+from db.supabase_db import get_stale_pending_evals
+from services.turns import finish_pending_eval
+
+# Recovery for pending evals (score null, see services/turns.py) that their
+# background job never filled in: the process restarted, or the judge call
+# failed. Every worker sweeps every PENDING_EVAL_SWEEP_INTERVAL seconds for
+# pending evals older than PENDING_EVAL_RECOVER_AFTER and judges them again.
+# update_eval only fills a still-pending eval, so when two workers pick up the
+# same row its score is still written and rolled up once.
+
+_lock = threading.Lock()
+_started_pid: Optional[int] = None
+
+def sweep() -> int:
+    """Judge one batch of stale pending evals; returns how many were filled."""
+    filled = 0
+    for row in get_stale_pending_evals(PENDING_EVAL_RECOVER_AFTER, PENDING_EVAL_SWEEP_BATCH):
+        qa = row.get("qa_pairs") or {}
+        sess = qa.get("sessions") or {}
+        if not qa.get("answer") or not sess.get("user_id"):
+            metrics.incr("pending_evals.skipped")
+            continue
+        try:
+            finish_pending_eval(row["id"], sess["user_id"], sess.get("track") or "behavioral",
+                                qa.get("topic"), qa["question"], qa["answer"])
+            filled += 1
+            metrics.incr("pending_evals.recovered")
+        except Exception as e:
+            # left pending; the next sweep tries again
+            print(f"Recovering pending eval {row['id']} failed: {e}")
+            metrics.incr("pending_evals.failed")
+    return filled
+
+def _sweep_loop():
+    time.sleep(random.uniform(0, min(60.0, PENDING_EVAL_SWEEP_INTERVAL)))  # spread workers out
+    while True:
+        try:
+            filled = sweep()
+            if filled:
+                print(f"Recovered {filled} pending evals")
+        except Exception as e:
+            print(f"Pending eval sweep failed: {e}")
+        time.sleep(PENDING_EVAL_SWEEP_INTERVAL)
+
+def start():
+    """Start the sweep thread, once per process (safe to call repeatedly)."""
+    global _started_pid
+    pid = os.getpid()
+    if _started_pid == pid:
+        return
+    with _lock:
+        if _started_pid == pid:
+            return
+        _started_pid = pid
+    threading.Thread(target=_sweep_loop, name="pending-evals", daemon=True).start()
+
+def _reset_after_fork():
+    global _lock
+    _lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,83 @@
+import os
+import random
+import re
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Tuple
+
+import metrics
+from config import QUESTION_POOL_SIZE
+
+# Ready-made questions for when the interviewer model can't answer in time
+# (a turn's deadline ran out). Recently generated questions are remembered
+# per (track, topic they were asked on) in process memory; a hand-written seed question per topic
+# backs them up, so a fallback exists from the first request on. Questions the
+# session already asked are never reused.
+
+SEED_QUESTIONS: Dict[str, Dict[str, str]] = {
+    "technical": {
+        "data structures & algorithms": "How would you find the k most frequent elements in a large array, and what is the time complexity of your approach?",
+        "system design tradeoffs": "How would you design a URL shortener, and which tradeoffs would you make between consistency and availability?",
+        "complexity & Big-O": "Walk me through how you would analyze the time and space complexity of a recursive function that memoizes its results.",
+        "concurrency and threads": "What is a race condition, and how would you find and fix one in a multithreaded service?",
+        "databases and indexing": "When would you add an index to a table, and what does it cost on writes?",
+        "networking and HTTP": "What happens between typing a URL into a browser and the page rendering?",
+        "testing & debugging strategy": "How would you track down a bug that only shows up intermittently in production?",
+    },
+    "behavioral": {
+        "teamwork/conflict resolution": "Tell me about a time you disagreed with a teammate. How did you resolve it, and what was the outcome?",
+        "ownership and accountability": "Describe a project where something went wrong on your part. What did you do about it?",
+        "deadline/pressure management": "Tell me about a time you had to deliver under a tight deadline. How did you prioritize?",
+        "communication with non-technical stakeholders": "Describe a time you explained a technical problem to a non-technical audience. How did you make it land?",
+        "leadership and influence": "Tell me about a time you convinced others to adopt your idea without formal authority.",
+        "learning from mistakes": "What is a mistake you made that changed how you work? What was the result?",
+        "prioritization and ambiguity": "Describe a time the requirements were unclear. How did you decide what to do first?",
+    },
+}
+
+_NORMALIZE_RE = re.compile(r"[^a-z0-9]+")
+
+_lock = threading.Lock()
+_recent: Dict[Tuple[str, str], Deque[str]] = {}
+
+def question_key(question: str) -> str:
+    """Normalized form for spotting near-identical questions."""
+    return _NORMALIZE_RE.sub(" ", question.lower()).strip()
+
+def remember(track: str, topic: str, question: str):
+    """Keep a generated question as a future fallback for the topic it was asked on."""
+    key = (track, topic)
+    with _lock:
+        pool = _recent.get(key)
+        if pool is None:
+            pool = _recent[key] = deque(maxlen=QUESTION_POOL_SIZE)
+        if question not in pool:
+            pool.append(question)
+
+def fallback_question(track: str, topic: str, asked: Iterable[str]) -> Tuple[str, str]:
+    """
+    (question, topic) of a question the session hasn't been asked: a recent one
+    on `topic`, else that topic's seed, else any unused seed of the track.
+    """
+    seen = {question_key(q) for q in asked}
+    seeds = SEED_QUESTIONS.get(track) or SEED_QUESTIONS["technical"]
+    with _lock:
+        recent: List[str] = list(_recent.get((track, topic), ()))
+    random.shuffle(recent)
+    others = [(t, q) for t, q in seeds.items() if t != topic]
+    own = [(topic, q) for q in recent]
+    for source, candidates in (("recent", own), ("seed", [(topic, seeds.get(topic, ""))]), ("seed", others)):
+        for t, q in candidates:
+            if q and question_key(q) not in seen:
+                metrics.incr(f"question_pool.fallback.{source}")
+                return q, t
+    metrics.incr("question_pool.fallback.exhausted")
+    if topic in seeds:
+        return seeds[topic], topic
+    return next(iter(seeds.values())), next(iter(seeds))
+
+def _reset_after_fork():
+    global _lock
+    _lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
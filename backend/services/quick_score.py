@@ -0,0 +1,203 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+import metrics
+from config import QUICK_SCORE_MODEL_PATH, QUICK_SCORE_MIN_CONFIDENCE
+
+# Instant provisional scores from a small CPU model trained on past judge
+# scores (tools/quick_score.py trains and evaluates it).
+#
+# An answer becomes a sparse vector of hashed features: word unigrams and
+# bigrams (log-scaled counts), plus buckets for the answer's length and its
+# word overlap with the question, the track and whether the answer has code.
+# The vector is L2-normalized and a 5-class softmax (logistic) regression over
+# it gives P(score = 1..5). The score is the most likely class and the
+# confidence its probability. Hashing keeps the model a fixed size (one weight
+# row per class) with no vocabulary to store.
+#
+# The model file is an .npz at QUICK_SCORE_MODEL_PATH, loaded lazily and
+# reloaded when it changes on disk. Without it, predict() returns None and
+# every answer goes to the judge as before.
+
+N_FEATURES = 1 << 18
+SCORES = np.arange(1, 6)
+
+_WORD_RE = re.compile(r"[a-z0-9_+#]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by do does for from how i in is it of on or that the this to was what when "
+    "where which who why with would you your".split()
+)
+
+_lock = threading.Lock()
+_model: Optional[Dict[str, Any]] = None
+_model_mtime: Optional[float] = None
+
+# --- Features ---
+def _bucket(name: str, value: float, edges: Sequence[float]) -> str:
+    return f"__{name}{sum(value >= e for e in edges)}"
+
+def feature_tokens(track: str, question: str, answer: str) -> Counter:
+    """Feature name -> count for one answer (before hashing)."""
+    words = _WORD_RE.findall(answer.lower())
+    counts: Counter = Counter(words)
+    counts.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+
+    content = {w for w in _WORD_RE.findall(question.lower()) if w not in _STOPWORDS}
+    overlap = len(content & set(words)) / len(content) if content else 0.0
+    counts[_bucket("len", len(words), (5, 15, 30, 60, 120, 250, 500))] += 1
+    counts[_bucket("overlap", overlap, (0.1, 0.25, 0.5, 0.75))] += 1
+    counts[f"__track_{track}"] += 1
+    if "```" in answer or "def " in answer:
+        counts["__code"] += 1
+    return counts
+
+def featurize(track: str, question: str, answer: str) -> Tuple[np.ndarray, np.ndarray]:
+    """(indices, values) of the L2-normalized hashed feature vector."""
+    hashed: Dict[int, float] = {}
+    for token, count in feature_tokens(track, question, answer).items():
+        h = zlib.crc32(token.encode("utf-8"))
+        idx = h % N_FEATURES
+        sign = 1.0 if (h >> 31) & 1 == 0 else -1.0  # signed hashing keeps collisions unbiased
+        hashed[idx] = hashed.get(idx, 0.0) + sign * (1.0 + math.log(count))
+    indices = np.fromiter(hashed.keys(), dtype=np.int64, count=len(hashed))
+    values = np.fromiter(hashed.values(), dtype=np.float32, count=len(hashed))
+    norm = float(np.linalg.norm(values))
+    return indices, values / norm if norm > 0 else values
+
+def featurize_many(examples: Sequence[Tuple[str, str, str]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """CSR arrays (indptr, indices, values) for (track, question, answer) triples."""
+    rows = [featurize(*ex) for ex in examples]
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(i) for i, _ in rows])
+    indices = np.concatenate([i for i, _ in rows]) if rows else np.zeros(0, dtype=np.int64)
+    values = np.concatenate([v for _, v in rows]) if rows else np.zeros(0, dtype=np.float32)
+    return indptr, indices, values
+
+# --- Model ---
+def _logits(W: np.ndarray, b: np.ndarray, indptr: np.ndarray, indices: np.ndarray, values: np.ndarray) -> np.ndarray:
+    n = len(indptr) - 1
+    out = np.tile(b, (n, 1)).astype(np.float64)
+    nonempty = np.diff(indptr) > 0
+    if indices.size:
+        contrib = W[:, indices] * values  # (classes, nnz)
+        out[nonempty] += np.add.reduceat(contrib, indptr[:-1][nonempty], axis=1).T
+    return out
+
+def _softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+def predict_proba(model: Dict[str, Any], examples: Sequence[Tuple[str, str, str]]) -> np.ndarray:
+    """(n, 5) probabilities of scores 1..5."""
+    return _softmax(_logits(model["W"], model["b"], *featurize_many(examples)))
+
+def train(examples: Sequence[Tuple[str, str, str]], scores: Sequence[int], epochs: int = 300,
+          lr: float = 0.5, l2: float = 1e-4) -> Dict[str, Any]:
+    """
+    Fit the softmax regression with full-batch Adam.
+
+    Args:
+        examples: (track, question, answer) triples
+        scores: The judge's 1-5 score for each example
+        epochs: Gradient steps over the whole set
+        lr: Adam step size
+        l2: L2 penalty on the weights
+
+    Returns:
+        The model dict ({"W", "b", "meta"}) that save() writes.
+    """
+    indptr, indices, values = featurize_many(examples)
+    y = np.asarray(scores, dtype=np.int64) - 1
+    n, k = len(y), len(SCORES)
+    onehot = np.zeros((n, k))
+    onehot[np.arange(n), y] = 1.0
+    rows = np.repeat(np.arange(n), np.diff(indptr))
+    used = np.unique(indices)  # only these columns ever get a gradient
+
+    col = np.searchsorted(used, indices)  # feature index -> column of the compact weight matrix
+    params = [np.zeros((k, len(used))), np.log(np.bincount(y, minlength=k) + 1.0)]
+    m = [np.zeros_like(p) for p in params]
+    v = [np.zeros_like(p) for p in params]
+    for t in range(1, epochs + 1):
+        g_out = (_softmax(_logits(params[0], params[1], indptr, col, values)) - onehot) / n  # (n, k)
+        weighted = g_out[rows] * values[:, None]
+        g_W = np.stack([np.bincount(col, weights=weighted[:, c], minlength=len(used)) for c in range(k)])
+        grads = [g_W + l2 * params[0], g_out.sum(axis=0)]
+        for i, g in enumerate(grads):
+            m[i] = 0.9 * m[i] + 0.1 * g
+            v[i] = 0.999 * v[i] + 0.001 * g * g
+            params[i] -= lr * (m[i] / (1 - 0.9 ** t)) / (np.sqrt(v[i] / (1 - 0.999 ** t)) + 1e-8)
+    W = np.zeros((k, N_FEATURES), dtype=np.float32)
+    W[:, used] = params[0]
+    return {"W": W, "b": params[1].astype(np.float32),
+            "meta": {"trained_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "examples": n,
+                     "score_counts": np.bincount(y, minlength=k).tolist()}}
+
+def save(model: Dict[str, Any], path: str):
+    """Write the model atomically, so serving workers never load a half-written file."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp.npz"
+    np.savez_compressed(tmp, W=model["W"], b=model["b"], meta=np.array(json.dumps(model["meta"])))
+    os.replace(tmp, path)
+
+def load(path: str) -> Dict[str, Any]:
+    with np.load(path) as f:
+        return {"W": f["W"], "b": f["b"], "meta": json.loads(str(f["meta"]))}
+
+# --- Serving ---
+def _current_model() -> Optional[Dict[str, Any]]:
+    global _model, _model_mtime
+    try:
+        mtime = os.stat(QUICK_SCORE_MODEL_PATH).st_mtime
+    except OSError:
+        return None
+    if mtime == _model_mtime:
+        return _model
+    with _lock:
+        if mtime != _model_mtime:
+            try:
+                _model = load(QUICK_SCORE_MODEL_PATH)
+                print(f"Loaded quick scorer {QUICK_SCORE_MODEL_PATH}: {_model['meta']}")
+            except Exception as e:
+                print(f"Failed to load quick scorer {QUICK_SCORE_MODEL_PATH}: {e}")
+                _model = None
+            _model_mtime = mtime
+    return _model
+
+def predict(track: str, question: str, answer: str) -> Optional[Tuple[int, float]]:
+    """(score, confidence) for one answer, or None without a trained model."""
+    model = _current_model()
+    if model is None:
+        return None
+    start = time.perf_counter()
+    proba = predict_proba(model, [(track, question, answer)])[0]
+    metrics.observe("quick_score.seconds", time.perf_counter() - start)
+    best = int(np.argmax(proba))
+    return int(SCORES[best]), float(proba[best])
+
+def confident_score(track: str, question: str, answer: str) -> Optional[Tuple[int, float]]:
+    """predict()'s (score, confidence) if the confidence reaches QUICK_SCORE_MIN_CONFIDENCE, else None."""
+    out = predict(track, question, answer)
+    if out is None:
+        return None
+    if out[1] < QUICK_SCORE_MIN_CONFIDENCE:
+        metrics.incr("quick_score.low_confidence")
+        return None
+    metrics.incr("quick_score.provisional")
+    return out
+
+def _reset_after_fork():
+    global _lock
+    _lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
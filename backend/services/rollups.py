@@ -0,0 +1,47 @@
+import math
+from typing import Any, Dict, List, Optional
+
+from db.supabase_db import bump_user_rollup, rebuild_user_rollups
+
+ROLLUP_WINDOW = 10
+UNKNOWN_TOPIC = "general"  # turns stored before qa_pairs had a topic
+
+def record_score(user_id: str, track: str, topic: Optional[str], score: Optional[int]):
+    """
+    Write-through: fold a new eval score into the user's rollup for the topic
+    the question was asked on (qa_pairs.topic). A failure here must never fail
+    the interview turn, so it is only logged.
+    """
+    if score is None:
+        return
+    topic = topic or UNKNOWN_TOPIC
+    try:
+        bump_user_rollup(user_id, track, topic, int(score), ROLLUP_WINDOW)
+    except Exception as e:
+        print(f"Rollup update failed for {user_id}/{track}/{topic}: {e}")
+
+def rebuild_rollups(user_ids: List[str]):
+    """
+    Recompute the users' rollups from their answers' latest evals, for when a
+    new eval supersedes an older one (tools/rescore.py) rather than adding a score.
+    """
+    rebuild_user_rollups(sorted(set(user_ids)), ROLLUP_WINDOW)
+
+def summarize_rollup(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Mean/stddev over all scores and over the recent window, from the stored sums."""
+    n = row["n"]
+    mean = row["score_sum"] / n if n else None
+    variance = max(0.0, row["score_sq_sum"] / n - mean * mean) if n else None
+    recent = row.get("recent_scores") or []
+    recent_mean = sum(recent) / len(recent) if recent else None
+    return {
+        "track": row["track"],
+        "topic": row["topic"],
+        "count": n,
+        "mean": mean,
+        "stddev": math.sqrt(variance) if variance is not None else None,
+        "recent_scores": recent,
+        "recent_mean": recent_mean,
+        "trend": (recent_mean - mean) if n and recent else None,
+        "updated_at": row.get("updated_at"),
+    }
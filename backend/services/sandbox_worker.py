@@ -0,0 +1,258 @@
+"""
+Single-use worker for services/code_runner.py. Not imported by the app.
+
+Started ahead of time as `python -I sandbox_worker.py <limits-json>` in an
+empty temp directory, it blocks reading one JSON task ({"code", "tests"})
+from stdin. The worker itself never runs submitted code: it forks a child
+that closes every descriptor it inherited (the worker's stdout included),
+isolates itself and only then runs the code and tests. The child reports each
+outcome on a pipe the worker reads; the worker checks those reports against
+the test names it parsed from the source, builds the result and writes it as
+one JSON line to its stdout. Each worker runs exactly one task, so nothing a
+submission does can leak into the next one.
+
+Isolation: a new network namespace (no interfaces but a downed loopback), a
+chroot into the empty directory (the app tree and its .env are out of reach),
+a separate uid (`uid` in the limits, when started as root; otherwise an
+unprivileged user namespace with every capability dropped) and rlimits. The
+standard-library modules a submission may import are loaded before the
+chroot. If isolation fails and `require_isolation` is set, nothing runs.
+
+The child writes its reports itself, so code that digs through its own
+interpreter could still misreport its own tests; what it cannot do is reach
+the worker's stdout, the network or the server's files.
+"""
+import ast
+import ctypes
+import json
+import os
+import resource
+import secrets
+import signal
+import sys
+import time
+import traceback
+
+# loaded before the chroot; nothing else can be imported afterwards
+PRELOAD = (
+    "abc", "bisect", "collections", "copy", "dataclasses", "datetime", "decimal", "enum",
+    "fractions", "functools", "heapq", "itertools", "math", "operator", "random", "re",
+    "statistics", "string", "typing",
+)
+
+CLONE_NEWNET = 0x40000000
+CLONE_NEWUSER = 0x10000000
+PR_SET_NO_NEW_PRIVS = 38
+MAX_REPORT_BYTES = 256 * 1024
+
+class IsolationError(Exception):
+    pass
+
+def _apply_limits(limits):
+    for name, value in (
+        ("RLIMIT_CPU", limits["cpu_seconds"]),
+        ("RLIMIT_AS", limits["memory_bytes"]),
+        ("RLIMIT_FSIZE", limits["file_bytes"]),
+        ("RLIMIT_NOFILE", 32),
+        ("RLIMIT_CORE", 0),
+    ):
+        resource.setrlimit(getattr(resource, name), (value, value))
+
+def _drop_capabilities(libc):
+    class Header(ctypes.Structure):
+        _fields_ = [("version", ctypes.c_uint32), ("pid", ctypes.c_int)]
+
+    class Data(ctypes.Structure):
+        _fields_ = [("effective", ctypes.c_uint32), ("permitted", ctypes.c_uint32),
+                    ("inheritable", ctypes.c_uint32)]
+
+    header = Header(0x20080522, 0)  # _LINUX_CAPABILITY_VERSION_3
+    data = (Data * 2)()
+    if libc.capset(ctypes.byref(header), data) != 0:
+        raise IsolationError(f"capset failed: {os.strerror(ctypes.get_errno())}")
+
+def _isolate(uid):
+    """Cut this process off from the network and the filesystem outside the cwd, as an unprivileged user."""
+    libc = ctypes.CDLL(None, use_errno=True)
+    root = os.geteuid() == 0
+    flags = CLONE_NEWNET if root else CLONE_NEWUSER | CLONE_NEWNET
+    if libc.unshare(flags) != 0:
+        raise IsolationError(f"unshare failed: {os.strerror(ctypes.get_errno())}")
+    if root:
+        os.chown(".", uid, uid)  # the submission may write scratch files here
+    else:
+        outer_uid, outer_gid = os.getuid(), os.getgid()
+        with open("/proc/self/setgroups", "w") as f:
+            f.write("deny")
+        with open("/proc/self/uid_map", "w") as f:
+            f.write(f"0 {outer_uid} 1")
+        with open("/proc/self/gid_map", "w") as f:
+            f.write(f"0 {outer_gid} 1")
+    os.chroot(".")
+    os.chdir("/")
+    if root:
+        os.setgroups([])
+        os.setresgid(uid, uid, uid)
+        os.setresuid(uid, uid, uid)  # leaving uid 0 clears every capability
+    else:
+        _drop_capabilities(libc)
+    libc.prctl(PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0)
+
+def _short_error(e: BaseException) -> str:
+    return f"{type(e).__name__}: {e}"[:300]
+
+def _submission_traceback(e: BaseException) -> str:
+    """The last frames of the traceback that are in submitted code (no server paths)."""
+    frames = [f for f in traceback.extract_tb(e.__traceback__) if f.filename.startswith("<")][-3:]
+    lines = ["Traceback (most recent call last):\n"] + traceback.format_list(frames)
+    return "".join(lines + traceback.format_exception_only(type(e), e))[-1000:]
+
+def _test_names(tests: str):
+    """Top-level test_* functions of the test source, or ["<tests>"] for module-level asserts."""
+    try:
+        tree = ast.parse(tests)
+    except SyntaxError:
+        return ["<tests>"]
+    names = [node.name for node in tree.body
+             if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test_")]
+    return list(dict.fromkeys(names)) or ["<tests>"]
+
+# --- Child: runs the submission ---
+def _child(task, limits, names, nonce, report_fd):
+    def report(event, **fields):
+        line = json.dumps({"nonce": nonce, "event": event, **fields}) + "\n"
+        os.write(report_fd, line.encode("utf-8"))
+
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    # the worker's stdout and everything else inherited is gone before any submitted code runs
+    os.closerange(3, report_fd)
+    os.closerange(report_fd + 1, 1 << 16)
+    for name in PRELOAD:
+        __import__(name)
+    try:
+        _isolate(limits["uid"])
+    except Exception as e:
+        if limits["require_isolation"]:
+            report("code", status="sandbox_unavailable", error=_short_error(e))
+            os._exit(0)
+    _apply_limits(limits)
+
+    ns = {"__name__": "__submission__"}
+    try:
+        exec(compile(task["code"], "<submission>", "exec"), ns)
+    except SyntaxError as e:
+        report("code", status="syntax_error", error=_short_error(e))
+        os._exit(0)
+    except MemoryError:
+        report("code", status="memory_limit")
+        os._exit(0)
+    except BaseException as e:
+        report("code", status="runtime_error", error=_short_error(e), traceback=_submission_traceback(e))
+        os._exit(0)
+    report("code", status="ok")
+    if task.get("tests"):
+        try:
+            exec(compile(task["tests"], "<tests>", "exec"), ns)
+        except BaseException as e:
+            # module-level asserts in the test source failed (or it didn't compile)
+            report("test", name="<tests>", passed=False, error=_short_error(e))
+            report("done")
+            os._exit(0)
+        for name in names:
+            fn = ns.get(name)
+            if name == "<tests>":
+                report("test", name=name, passed=True)
+                continue
+            try:
+                fn()
+                report("test", name=name, passed=True)
+            except BaseException as e:
+                report("test", name=name, passed=False, error=_short_error(e))
+    report("done")
+    os._exit(0)
+
+# --- Worker: builds the result from the child's reports ---
+def _read_reports(fd):
+    data = b""
+    while True:
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            return data
+        data += chunk
+        if len(data) > MAX_REPORT_BYTES:
+            return None
+
+def _result(reports, nonce, names, exit_status):
+    result = {"status": "crashed", "tests": [], "passed": 0, "failed": 0}
+    if os.WIFSIGNALED(exit_status) and os.WTERMSIG(exit_status) in (signal.SIGXCPU, signal.SIGKILL):
+        result["status"] = "cpu_limit"
+    code, done, tests = None, False, {}
+    for line in (reports or b"").splitlines():
+        try:
+            rep = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(rep, dict) or rep.get("nonce") != nonce:
+            continue
+        if rep.get("event") == "code" and code is None:
+            code = rep
+        elif rep.get("event") == "test" and code is not None and code.get("status") == "ok":
+            name = rep.get("name")
+            if (name in names or name == "<tests>") and name not in tests:
+                tests[name] = {"name": name, "passed": rep.get("passed") is True}
+                if not tests[name]["passed"]:
+                    tests[name]["error"] = str(rep.get("error", "failed"))[:300]
+        elif rep.get("event") == "done":
+            done = True
+    if code is None:
+        return result
+    if code.get("status") != "ok":
+        result["status"] = code.get("status") if code.get("status") in (
+            "syntax_error", "runtime_error", "memory_limit", "sandbox_unavailable") else "crashed"
+        for key in ("error", "traceback"):
+            if code.get(key):
+                result[key] = str(code[key])[:1000]
+        return result
+    if "<tests>" in tests and not tests["<tests>"]["passed"]:
+        result["tests"] = [tests["<tests>"]]
+    else:
+        result["tests"] = [tests.get(n) or {"name": n, "passed": False, "error": "did not finish"} for n in names]
+    result["passed"] = sum(t["passed"] for t in result["tests"])
+    result["failed"] = len(result["tests"]) - result["passed"]
+    if done:
+        result["status"] = "tests_failed" if result["failed"] else "ok"
+    # otherwise the child died part-way (crashed, or cpu_limit above)
+    return result
+
+def main():
+    limits = json.loads(sys.argv[1])
+    task = json.loads(sys.stdin.readline())  # blocks here until a task arrives
+    names = _test_names(task["tests"]) if task.get("tests") else []
+    nonce = secrets.token_hex(16)
+    report_r, report_w = os.pipe()
+    start = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.close(report_r)
+            _child(task, limits, names, nonce, report_w)
+        finally:
+            os._exit(1)
+    os.close(report_w)
+    reports = _read_reports(report_r)
+    if reports is None:
+        os.kill(pid, signal.SIGKILL)  # flooding the report pipe
+    _, status = os.waitpid(pid, 0)
+    if reports is None:
+        result = {"status": "crashed", "error": "too much output on the report channel",
+                  "tests": [], "passed": 0, "failed": 0}
+    else:
+        result = _result(reports, nonce, names, status)
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    sys.stdout.write(json.dumps(result) + "\n")
+    sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import contextvars
+import json
+import queue
+import re
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import metrics
+from agents.agents import stream_tokens
+from config import SSE_HEARTBEAT_SECONDS
+
+# Server-sent events for /start/stream and /answer/stream.
+#
+# The turn runs on a worker thread inside stream_tokens(), so model tokens
+# reach the browser while they are generated. The route's generator relays
+# whatever the worker emits:
+#
+#   session     {"session_id"}      /start/stream only, before the first question
+#   transcript  {"text"}            the transcribed voice answer
+#   score       {"score"}           as soon as the judge has written it
+#   feedback    {"text"}            judge feedback, one delta per event
+#   evaluation  {...}               the authoritative evaluation (same shape as /answer's)
+#   question    {"text"}            next-question text, one delta per event
+#   code_result {...}               result of running submitted code
+#   turn        {...}               final result, sent after every database write
+#   error       {"error", ...}      the turn failed; nothing after it
+#
+# Deltas are a preview: a question cut off by the turn deadline is replaced
+# by a pooled one, so clients should render the `turn` event's
+# `next_question` (and `evaluation`'s score and feedback) as final. If the
+# client goes away mid-stream the worker still finishes and stores the turn.
+
+_SCORE_RE = re.compile(r"score\s*[:=]?\s*([1-5])", re.IGNORECASE)
+_FEEDBACK_RE = re.compile(r"feedback\s*:\s*", re.IGNORECASE)
+
+def sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+class JudgeStream:
+    """Turns the judge's streamed "Score: N. Feedback: ..." line into score and feedback events."""
+
+    def __init__(self, emit: Callable[[str, Dict[str, Any]], None]):
+        self.emit = emit
+        self.text = ""
+        self.score_sent = False
+        self.feedback_from = -1  # offset of the next unsent feedback character
+        self.started = False
+
+    def feed(self, delta: str):
+        self.text += delta
+        if not self.score_sent:
+            m = _SCORE_RE.search(self.text)
+            if m:
+                self.score_sent = True
+                self.emit("score", {"score": int(m.group(1))})
+        if self.feedback_from < 0:
+            m = _FEEDBACK_RE.search(self.text)
+            if m is None:
+                return
+            self.feedback_from = m.end()
+        if not self.started:
+            # the space after "Feedback:" may arrive in a later delta
+            while self.feedback_from < len(self.text) and self.text[self.feedback_from].isspace():
+                self.feedback_from += 1
+        if len(self.text) > self.feedback_from:
+            self.started = True
+            self.emit("feedback", {"text": self.text[self.feedback_from:]})
+            self.feedback_from = len(self.text)
+
+def token_sink(emit: Callable[[str, Dict[str, Any]], None], judge: bool = True) -> Callable[[str, str], None]:
+    """Sink for agents.stream_tokens: judge tokens become score/feedback events, question tokens question events."""
+    judge_stream = JudgeStream(emit) if judge else None
+
+    def sink(channel: str, delta: str):
+        if channel == "question":
+            emit("question", {"text": delta})
+        elif channel == "judge" and judge_stream is not None:
+            judge_stream.feed(delta)
+    return sink
+
+def run_streamed(name: str, work: Callable[[Callable[[str, Dict[str, Any]], None]], None],
+                 judge: bool = True, on_done: Optional[Callable[[], None]] = None) -> Iterator[str]:
+    """
+    Start `work(emit)` on a worker thread with model tokens streamed, and return
+    an iterator of the SSE frames of everything emitted until it returns. A
+    comment line goes out every SSE_HEARTBEAT_SECONDS of silence so proxies keep
+    the connection. An exception in `work` ends the stream with an error event.
+    `on_done` runs on the worker once `work` has finished, whether or not the
+    client is still reading (e.g. to free admission slots).
+    """
+    frames: "queue.Queue" = queue.Queue()
+
+    def emit(event: str, data: Dict[str, Any]):
+        frames.put(sse(event, data))
+
+    def run():
+        try:
+            with stream_tokens(token_sink(emit, judge)):
+                work(emit)
+        except Exception as e:
+            print(f"Streamed {name} failed: {e}")
+            metrics.incr(f"sse.{name}.failed")
+            emit("error", {"error": "Something went wrong, please retry"})
+        finally:
+            if on_done is not None:
+                try:
+                    on_done()
+                except Exception as e:
+                    print(f"Streamed {name} cleanup failed: {e}")
+            frames.put(None)
+
+    def relay() -> Iterator[str]:
+        while True:
+            try:
+                frame = frames.get(timeout=SSE_HEARTBEAT_SECONDS)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            if frame is None:
+                return
+            yield frame
+
+    metrics.incr(f"sse.{name}.started")
+    # started here rather than on the first read, so the turn runs (and on_done
+    # fires) even if the response is never consumed
+    ctx = contextvars.copy_context()
+    threading.Thread(target=ctx.run, args=(run,), name=f"sse-{name}", daemon=True).start()
+    return relay()
@@ -1,4 +1,34 @@
-from supabase import create_client
+import os
+from typing import Optional, TYPE_CHECKING
 from config import SUPABASE_URL, SUPABASE_SERVICE_KEY
 
-supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+if TYPE_CHECKING:
+    from supabase import Client
+
+_auth: Optional["Client"] = None
+
+def auth_client() -> "Client":
+    """
+    Process-wide Supabase client for auth calls (sign up, sign in, sign out, get
+    user), created on first use (and again in each forked worker).
+
+    Signing in switches a client's Authorization header to the user's access
+    token, so auth calls never use the service-key client from
+    db.supabase_db.sb(), which stays for database access only. The session a
+    sign-in leaves on this client is never read: get_user and sign-out take the
+    user's token explicitly, and nothing refreshes it in the background.
+    """
+    global _auth
+    if _auth is None:
+        if SUPABASE_URL is None or SUPABASE_SERVICE_KEY is None:
+            raise ValueError("SUPABASE_URL or SUPABASE_SERVICE_KEY not found")
+        from supabase import create_client, ClientOptions
+        _auth = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY,
+                              options=ClientOptions(persist_session=False, auto_refresh_token=False))
+    return _auth
+
+def _reset_auth_after_fork():
+    global _auth
+    _auth = None
+
+os.register_at_fork(after_in_child=_reset_auth_after_fork)
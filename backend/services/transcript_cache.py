@@ -0,0 +1,104 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import metrics
+from config import TRANSCRIPT_CACHE_SIZE, TRANSCRIPT_CACHE_PATH, TRANSCRIPT_CACHE_PERSIST_MAX
+
+# Transcripts keyed by sha256(audio bytes) + a fingerprint of every setting
+# that changes the text (STT model and prompt, preprocessing, post-processing
+# version), so a retried or re-submitted upload skips the STT call.
+#
+# Two tiers: an in-process LRU of TRANSCRIPT_CACHE_SIZE entries, and, when
+# TRANSCRIPT_CACHE_PATH is set, an sqlite file shared by every worker on the
+# host (a retry often lands on a different worker). The file keeps at most
+# TRANSCRIPT_CACHE_PERSIST_MAX rows, least recently used dropped first.
+
+_PRUNE_EVERY = 100  # persistent inserts between size checks
+
+_lock = threading.Lock()
+_memory: "OrderedDict[str, str]" = OrderedDict()
+_local = threading.local()
+_inserts = 0
+
+def hash_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def cache_key(audio_hash: str, fingerprint: str) -> str:
+    return f"{audio_hash}:{fingerprint}"
+
+def _db() -> Optional[sqlite3.Connection]:
+    if not TRANSCRIPT_CACHE_PATH:
+        return None
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.pid != os.getpid():
+        conn = sqlite3.connect(TRANSCRIPT_CACHE_PATH, timeout=10, isolation_level=None)
+        conn.execute("pragma journal_mode=wal")
+        conn.execute("create table if not exists transcripts "
+                     "(key text primary key, text text not null, last_access real not null)")
+        conn.execute("create index if not exists transcripts_access on transcripts (last_access)")
+        _local.conn, _local.pid = conn, os.getpid()
+    return conn
+
+def _remember(key: str, text: str):
+    with _lock:
+        _memory[key] = text
+        _memory.move_to_end(key)
+        while len(_memory) > TRANSCRIPT_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+def get(key: str) -> Optional[str]:
+    with _lock:
+        text = _memory.get(key)
+        if text is not None:
+            _memory.move_to_end(key)
+    if text is not None:
+        metrics.incr("transcription.cache_hit.memory")
+        return text
+
+    try:
+        conn = _db()
+        row = conn.execute("select text from transcripts where key = ?", (key,)).fetchone() if conn else None
+        if row:
+            conn.execute("update transcripts set last_access = ? where key = ?", (time.time(), key))
+    except sqlite3.Error as e:
+        print(f"Transcript cache read failed: {e}")
+        row = None
+    if row:
+        metrics.incr("transcription.cache_hit.persistent")
+        _remember(key, row[0])
+        return row[0]
+    metrics.incr("transcription.cache_miss")
+    return None
+
+def put(key: str, text: str):
+    global _inserts
+    _remember(key, text)
+    try:
+        conn = _db()
+        if conn is None:
+            return
+        conn.execute("insert or replace into transcripts (key, text, last_access) values (?, ?, ?)",
+                     (key, text, time.time()))
+        with _lock:
+            _inserts += 1
+            prune = _inserts % _PRUNE_EVERY == 0
+        if prune:
+            conn.execute("delete from transcripts where key in (select key from transcripts "
+                         "order by last_access desc limit -1 offset ?)", (TRANSCRIPT_CACHE_PERSIST_MAX,))
+    except sqlite3.Error as e:
+        print(f"Transcript cache write failed: {e}")
+
+def _reset_after_fork():
+    global _lock
+    _lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
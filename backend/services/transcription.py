@@ -0,0 +1,261 @@
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict
+
+import deadline
+import hedging
+from agents.agents import get_groq_client
+from config import (
+    TRANSCRIPTION_TIMEOUT, HEDGE_TRANSCRIPTION, AUDIO_PREPROCESS, AUDIO_TARGET_RATE, AUDIO_OPUS_BITRATE,
+    AUDIO_VAD_FRAME_MS, AUDIO_VAD_THRESHOLD_DB, AUDIO_VAD_PAD_MS
+)
+from services import transcript_cache
+from services.audio_preprocess import preprocess_audio, FFMPEG
+
+TRANSCRIPTION_MODEL = "whisper-large-v3"
+# Bump when post_process_technical_transcript changes, so cached transcripts are not reused
+POSTPROCESS_VERSION = 1
+
+class TranscriptionError(Exception):
+    """Speech-to-text failed for an uploaded answer."""
+
+TECHNICAL_PROMPT = "This is a technical interview with code syntax, programming terms, and algorithms."
+
+def post_process_technical_transcript(text):
+    """
+    Post-process a technical interview transcript to improve code formatting,
+    fix common speech-to-text errors in technical terms, and handle syntax.
+    """
+    # Common replacements for programming terms that Whisper might misinterpret
+    replacements = {
+        # Programming languages
+        r'\bpie\s?thon\b': 'Python',
+        r'\bjava\s?script\b': 'JavaScript',
+        r'\bc\s?plus\s?plus\b': 'C++',
+        r'\bc\s?sharp\b': 'C#',
+        r'\btype\s?script\b': 'TypeScript',
+        r'\bgo\s?lang\b': 'Golang',
+        
+        # Frameworks & Libraries
+        r'\breact\s?js\b': 'React',
+        r'\bangular\s?js\b': 'Angular',
+        r'\bnode\s?js\b': 'Node.js',
+        r'\bdot\s?net\b': '.NET',
+        r'\bj\s?query\b': 'jQuery',
+        r'\bvue\s?js\b': 'Vue.js',
+        r'\bflask\b': 'Flask',
+        r'\bdjango\b': 'Django',
+        r'\bspring\s?boot\b': 'Spring Boot',
+        r'\blaravel\b': 'Laravel',
+        r'\bnext\s?js\b': 'Next.js',
+        r'\btensor\s?flow\b': 'TensorFlow',
+        r'\bpie\s?torch\b': 'PyTorch',
+        
+        # Databases
+        r'\bmysequel\b': 'MySQL',
+        r'\bsequal\b': 'SQL',
+        r'\bpost\s?gress?\b': 'PostgreSQL',
+        r'\bmongo\s?d\s?b\b': 'MongoDB',
+        r'\bredis\b': 'Redis',
+        r'\belastic\s?search\b': 'Elasticsearch',
+        r'\bcassandra\b': 'Cassandra',
+        r'\boracle\b': 'Oracle',
+        
+        # Web Technologies
+        r'\bapi\b': 'API',
+        r'\bapis\b': 'APIs',
+        r'\brest\s?ful\b': 'RESTful',
+        r'\brest\s?api\b': 'REST API',
+        r'\bjson\b': 'JSON',
+        r'\bxml\b': 'XML',
+        r'\bhtml\b': 'HTML',
+        r'\bcss\b': 'CSS',
+        r'\bhttp\b': 'HTTP',
+        r'\bhttps\b': 'HTTPS',
+        r'\burl\b': 'URL',
+        r'\burls\b': 'URLs',
+        r'\bui\b': 'UI',
+        r'\bux\b': 'UX',
+        r'\bgraph\s?q\s?l\b': 'GraphQL',
+        r'\bweb\s?socket\b': 'WebSocket',
+        
+        # Architecture & Development Terms
+        r'\bback\s?end\b': 'backend',
+        r'\bfront\s?end\b': 'frontend',
+        r'\bfull\s?stack\b': 'full-stack',
+        r'\bdocker\b': 'Docker',
+        r'\bkubernetes\b': 'Kubernetes',
+        r'\bk8s\b': 'K8s',
+        r'\baws\b': 'AWS',
+        r'\bazure\b': 'Azure',
+        r'\bgcp\b': 'GCP',
+        r'\bgit\b': 'Git',
+        r'\bgithub\b': 'GitHub',
+        r'\blinux\b': 'Linux',
+        r'\bunix\b': 'Unix',
+        r'\bmac\s?os\b': 'macOS',
+        r'\bwindows\b': 'Windows',
+        r'\bio\s?t\b': 'IoT',
+        r'\bdevops\b': 'DevOps',
+        r'\bci\s?cd\b': 'CI/CD',
+        r'\bsaas\b': 'SaaS',
+        r'\bpaas\b': 'PaaS',
+        r'\biaas\b': 'IaaS',
+        r'\bmicro\s?services\b': 'microservices',
+        r'\bservice\s?oriented\s?architecture\b': 'service-oriented architecture',
+        r'\bmonolithic\b': 'monolithic',
+        
+        # Algorithms & Data Structures
+        r'\bbinary\s?search\b': 'binary search',
+        r'\bdepth\s?first\s?search\b': 'depth-first search',
+        r'\bdfs\b': 'DFS',
+        r'\bbreadth\s?first\s?search\b': 'breadth-first search',
+        r'\bbfs\b': 'BFS',
+        r'\bdynamic\s?programming\b': 'dynamic programming',
+        r'\bgreedy\s?algorithm\b': 'greedy algorithm',
+        r'\blinked\s?list\b': 'linked list',
+        r'\bbinary\s?tree\b': 'binary tree',
+        r'\bbinary\s?search\s?tree\b': 'binary search tree',
+        r'\bbst\b': 'BST',
+        r'\bheap\b': 'heap',
+        r'\bhash\s?map\b': 'hash map',
+        r'\bhash\s?table\b': 'hash table',
+        r'\bgraph\b': 'graph',
+        r'\btrie\b': 'trie',
+        r'\bqueue\b': 'queue',
+        r'\bstack\b': 'stack',
+        r'\barraay\b': 'array',
+        r'\bsort\b': 'sort',
+        r'\bquick\s?sort\b': 'quicksort',
+        r'\bmerge\s?sort\b': 'merge sort',
+        r'\bheap\s?sort\b': 'heap sort',
+        r'\bbubble\s?sort\b': 'bubble sort',
+        r'\binsertion\s?sort\b': 'insertion sort',
+        r'\btime\s?complexity\b': 'time complexity',
+        r'\bspace\s?complexity\b': 'space complexity',
+        r'\bbig\s?o\b': 'Big O',
+        r'\bo\s?of\s?n\b': 'O(n)',
+        r'\bo\s?of\s?n\s?squared\b': 'O(n²)',
+        r'\bo\s?of\s?log\s?n\b': 'O(log n)',
+        r'\bo\s?of\s?n\s?log\s?n\b': 'O(n log n)',
+        
+        # Function-related patterns
+        r'\b(?:function|func)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(': r'function \1(',
+        r'\bdef\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(': r'def \1(',
+        
+        # Sites & Resources
+        r'\bstack\s?overflow\b': 'StackOverflow',
+        r'\bgit\s?hub\b': 'GitHub',
+        r'\bleet\s?code\b': 'LeetCode',
+        r'\bhacker\s?rank\b': 'HackerRank',
+        r'\bcode\s?pen\b': 'CodePen',
+    }
+    
+    # Apply all replacements
+    processed_text = text
+    for pattern, replacement in replacements.items():
+        processed_text = re.sub(pattern, replacement, processed_text, flags=re.IGNORECASE)
+    
+    # Try to identify code blocks and format them
+    # This is a simple approach - more sophisticated would require AI processing
+    code_block_markers = [
+        (r'```(?:python|java|javascript|js|typescript|ts|c\+\+|cpp|csharp|c#|ruby|go|rust|php|swift|kotlin|scala)\s*(.*?)\s*```', r'```\1```'),
+        (r'code\s*:\s*(.*?)(?=\n\n|\Z)', r'```\1```'),
+        (r'function\s+[a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)\s*{[^}]*}', lambda m: f'```{m.group(0)}```'),
+        (r'class\s+[a-zA-Z_][a-zA-Z0-9_]*\s*{[^}]*}', lambda m: f'```{m.group(0)}```'),
+        (r'def\s+[a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)\s*:', lambda m: f'```{m.group(0)}```'),
+        (r'(?:public|private|protected|internal)\s+(?:static\s+)?(?:void|int|string|bool|float|double)\s+[a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)\s*{', lambda m: f'```{m.group(0)}```'),
+    ]
+    
+    for pattern, replacement in code_block_markers:
+        processed_text = re.sub(pattern, replacement, processed_text, flags=re.DOTALL)
+    
+    # Improve code formatting by adding proper indentation for languages with specific syntax patterns
+    # Python indentation fix (simple cases)
+    processed_text = re.sub(r'(def\s+[^\n]+:)\s*([^\s])', r'\1\n    \2', processed_text)
+    processed_text = re.sub(r'(if\s+[^\n]+:)\s*([^\s])', r'\1\n    \2', processed_text)
+    processed_text = re.sub(r'(for\s+[^\n]+:)\s*([^\s])', r'\1\n    \2', processed_text)
+    processed_text = re.sub(r'(while\s+[^\n]+:)\s*([^\s])', r'\1\n    \2', processed_text)
+    
+    return processed_text
+
+def transcription_settings(is_technical: bool) -> Dict[str, Any]:
+    """Groq transcription parameters for the interview type (besides the file itself)."""
+    if is_technical:
+        # For technical interviews, use more specialized settings
+        return {
+            "model": TRANSCRIPTION_MODEL,
+            "response_format": "verbose_json",  # Get more detailed output
+            "temperature": 0.0,                 # More precise transcription
+            "prompt": TECHNICAL_PROMPT          # Context hint
+        }
+    # For behavioral interviews, use standard settings
+    return {"model": TRANSCRIPTION_MODEL}
+
+def settings_fingerprint(is_technical: bool) -> str:
+    """Hash of everything besides the audio that changes the transcript text."""
+    settings = {
+        "stt": transcription_settings(is_technical),
+        "preprocess": [AUDIO_PREPROCESS and FFMPEG is not None, AUDIO_TARGET_RATE, AUDIO_OPUS_BITRATE,
+                       AUDIO_VAD_FRAME_MS, AUDIO_VAD_THRESHOLD_DB, AUDIO_VAD_PAD_MS],
+        "postprocess": POSTPROCESS_VERSION if is_technical else None,
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+def transcribe_file(path: str, is_technical: bool) -> str:
+    """
+    Preprocess and transcribe one recorded answer with Whisper on Groq.
+    The same audio with the same settings is answered from the transcript
+    cache (services/transcript_cache.py) without preprocessing or an STT call.
+    A slow STT call is hedged with a second one (hedging.py).
+
+    Args:
+        path: Path to the uploaded audio file
+        is_technical: Whether to use the technical-interview settings and post-processing
+
+    Returns:
+        str: The transcript text
+
+    Raises:
+        DeadlineExceeded: the request's deadline ran out before the transcript came back.
+        Exception: Whatever the Groq client raises; callers turn it into a 500.
+    """
+    key = transcript_cache.cache_key(transcript_cache.hash_file(path), settings_fingerprint(is_technical))
+    cached = transcript_cache.get(key)
+    if cached is not None:
+        print(f"Transcript cache hit: {len(cached)} characters")
+        return cached
+
+    # Trim silence and downmix/resample to 16 kHz mono before upload to the STT backend
+    stt_path, prep_stats = preprocess_audio(path)
+    print(f"Audio preprocessing: {prep_stats}")
+    client = get_groq_client()
+    if deadline.active() and hasattr(client, "with_options"):
+        client = client.with_options(max_retries=0)  # a retry would run past the deadline
+
+    def attempt():
+        with open(stt_path, "rb") as audio:
+            return client.audio.transcriptions.create(
+                file=audio, timeout=deadline.timeout_for("transcription", TRANSCRIPTION_TIMEOUT),
+                **transcription_settings(is_technical)
+            )
+
+    try:
+        transcript = hedging.call("transcription", attempt) if HEDGE_TRANSCRIPTION else attempt()
+    except Exception as e:
+        if deadline.expired():
+            raise deadline.DeadlineExceeded("transcription") from e
+        raise
+    finally:
+        if stt_path != path and os.path.exists(stt_path):
+            os.remove(stt_path)
+
+    text = transcript.text
+    if is_technical:
+        # Post-process for technical content
+        text = post_process_technical_transcript(text)
+    print(f"Successfully transcribed audio: {len(text)} characters")
+    transcript_cache.put(key, text)
+    return text
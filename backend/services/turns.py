@@ -0,0 +1,235 @@
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import deadline
+import metrics
+from agents.agents import judge_answer, judge_version, judge_path_model
+from agents.scheduler import priority, NEAR_REAL_TIME
+from config import TURN_RESULT_WAIT_SECONDS, TURN_FINALIZE_RESERVE_SECONDS
+from db.supabase_db import (
+    get_all_qas, get_session, insert_eval, update_eval, delete_eval, insert_question, mark_session_done,
+    release_turn_claim, save_claimed_answer
+)
+from services.code_runner import run_code, format_report
+from services.interview_logic import evaluate_and_next_logic, evaluation_payload, parse_evaluation
+from services.jobs import spawn
+from services.question_pool import remember
+from services.rollups import record_score
+from services.transcription import transcribe_file, TranscriptionError
+
+class TurnTaken(Exception):
+    """This request's claim on a turn was lost; another request owns the result."""
+
+def history_lines(qas: List[Dict[str, Any]], upto_turn: Optional[int] = None) -> List[str]:
+    """The "Q: ..."/"A: ..." view of a session's QA rows, optionally only up to a turn."""
+    history = []
+    for qa in qas:
+        if upto_turn is not None and qa["turn_index"] > upto_turn:
+            break
+        history.append(f"Q: {qa['question']}")
+        if qa.get("answer"):
+            history.append(f"A: {qa['answer']}")
+    return history
+
+def answer_error(answer_text: Optional[str], code: Optional[str] = None) -> Optional[str]:
+    """Why a typed answer can't be taken, or None: it needs some text, or code to run."""
+    if not isinstance(answer_text or "", str) or not isinstance(code or "", str):
+        return "Answer and code must be text"
+    if (answer_text or "").strip() or (code or "").strip():
+        return None
+    return "No answer provided"
+
+def finish_pending_eval(eval_id: str, user_id: str, track: str, topic: Optional[str],
+                        question: str, answer: str, code_report: str = "") -> Dict[str, Any]:
+    """
+    Judge an answer whose turn didn't wait for the judge and fill in its pending
+    eval (no deadline applies). Run on a background thread of the worker that
+    stored the turn, and again by services/pending_evals.py if that never finished.
+    """
+    with priority(NEAR_REAL_TIME):
+        judge_eval, _, path = judge_answer(track, question, answer, "", code_report)
+    score, feedback = parse_evaluation(judge_eval)
+    if update_eval(eval_id, score, feedback, judge_path_model(path), judge_version()):
+        record_score(user_id, track, topic, score)
+        metrics.incr("turns.pending_filled")
+    return {"eval_id": eval_id, "score": score, "feedback": feedback}
+
+def process_claimed_turn(user_id: str, session_id: str, cur: Dict[str, Any], user_answer: str,
+                         code_report: str = "",
+                         on_evaluation: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Judge a saved answer, store the eval and insert the next question (or finish
+    the session). Only the request that claimed the turn may call this.
+
+    Under a request deadline the model calls leave TURN_FINALIZE_RESERVE_SECONDS
+    for the writes. When the judge didn't score the answer in the request (a
+    confident provisional score from the local scorer, or the judge ran out of
+    time) a pending eval (score null) is stored and a background job fills it
+    in; the evaluation then has "pending": True and the "eval_id" to poll
+    (GET /api/interview/evals/<eval_id>) for the judge's score and feedback.
+
+    Returns:
+        {"evaluation", "done", "next_question", "turn_index", "history"}, where
+        `turn_index` is the turn the client answers next and `history` is the
+        session as stored after this turn.
+    """
+    # reconstruct history for graph: all Q/A up to now (fetch all to be safe and ordered)
+    all_qas = get_all_qas(session_id)
+    history = history_lines(all_qas)
+    sess = get_session(session_id)
+
+    # evaluate + possibly ask next question
+    with deadline.reserve(TURN_FINALIZE_RESERVE_SECONDS):
+        eval_out = evaluate_and_next_logic(cur["question"], user_answer, history, code_report, on_evaluation,
+                                           mode=sess["track"])
+    score, feedback = eval_out["score"], eval_out["feedback"]
+    evaluation = dict(eval_out["evaluation"])
+    next_q = eval_out["next_question"]
+
+    # insert eval (tagged with the judge that produced it, for later re-scoring)
+    # and the next question, or finish the session
+    eval_id = None
+    next_turn = cur["turn_index"] + 1
+    done = next_turn > int(sess["num_questions"])
+    try:
+        if eval_out["pending"]:
+            eval_id = insert_eval(cur["id"], None, feedback)
+        else:
+            eval_id = insert_eval(cur["id"], score, feedback, judge_path_model(eval_out["judge_path"]), judge_version())
+        if done:
+            mark_session_done(session_id)
+        else:
+            insert_question(session_id, next_turn, next_q, eval_out["next_topic"])
+    except Exception:
+        # the caller clears the answer and a retry judges the turn again: drop
+        # this attempt's eval so the turn doesn't end up with two
+        if eval_id is not None:
+            try:
+                with deadline.lifted():
+                    delete_eval(eval_id)
+            except Exception as e:
+                print(f"Failed to drop eval {eval_id} of a failed turn: {e}")
+        raise
+
+    # only once the turn is stored, so a retried turn is judged and rolled up once
+    if eval_out["pending"]:
+        evaluation["eval_id"] = eval_id
+        spawn("pending_eval", lambda: finish_pending_eval(
+            eval_id, user_id, sess["track"], cur.get("topic"), cur["question"], user_answer, code_report))
+        metrics.incr(f"turns.judge_{eval_out['judge_path']}")
+    else:
+        record_score(user_id, sess["track"], cur.get("topic"), score)
+    if done:
+        next_q = None
+    else:
+        if eval_out["question_source"] == "model":
+            remember(sess["track"], eval_out["next_topic"], next_q)
+        else:
+            metrics.incr("turns.fallback_question")
+        history.append(f"Q: {next_q}")
+
+    return {
+        "evaluation": evaluation,
+        "done": done,
+        "next_question": next_q,
+        "turn_index": next_turn,
+        "history": history,
+    }
+
+def answer_turn(user_id: str, session_id: str, cur: Dict[str, Any], claim_token: str,
+                answer_text: str = "", audio_path: Optional[str] = None, is_technical: bool = False,
+                code: Optional[str] = None, tests: Optional[str] = None,
+                on_transcript: Optional[Callable[[str], None]] = None,
+                on_evaluation: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    All the work of a turn this request has claimed (see claim_turn): transcribe
+    the audio if there is any, run submitted code, save the answer, then judge
+    and ask the next question. On failure the claim is released so the turn can
+    be retried.
+
+    Returns:
+        process_claimed_turn's result plus "code_result" (None without code).
+
+    Raises:
+        TurnTaken: the claim expired and another request took the turn over.
+        TranscriptionError: speech-to-text failed.
+        DeadlineExceeded: the request's deadline ran out before the answer was
+            judged far enough to store (the claim is released).
+    """
+    saved = False
+    try:
+        if audio_path:
+            try:
+                answer_text = transcribe_file(audio_path, is_technical)
+            except deadline.DeadlineExceeded:
+                raise
+            except Exception as e:
+                raise TranscriptionError(str(e)) from e
+            if on_transcript is not None:
+                on_transcript(answer_text)
+
+        # technical answers may come with code: run it against the tests and
+        # give the judge the result; the code is stored with the answer
+        code_result, code_report = None, ""
+        if code:
+            code_result = run_code(code, tests)
+            code_report = format_report(code_result)
+            answer_text = f"{answer_text}\n\nCode:\n```python\n{code}\n```".strip()
+
+        # save answer (only while we still hold the claim)
+        if not save_claimed_answer(cur["id"], claim_token, answer_text):
+            raise TurnTaken()
+        saved = True
+
+        out = process_claimed_turn(user_id, session_id, cur, answer_text, code_report, on_evaluation)
+    except TurnTaken:
+        raise
+    except Exception:
+        release_turn_claim(cur["id"], claim_token, clear_answer=saved)
+        raise
+    out["code_result"] = code_result
+    return out
+
+def stored_turn_result(session_id: str, turn_index: int) -> Optional[Dict[str, Any]]:
+    """
+    Rebuild the response of an already-processed turn from the database, in the
+    same shape process_claimed_turn returns. None while the turn isn't finished.
+    """
+    qas = get_all_qas(session_id)
+    cur = next((qa for qa in qas if qa["turn_index"] == turn_index), None)
+    if not cur or not cur.get("evals"):
+        return None
+    nxt = next((qa for qa in qas if qa["turn_index"] == turn_index + 1), None)
+    if nxt is None and get_session(session_id).get("status") != "done":
+        return None  # eval written, next question not yet inserted
+    latest = cur["evals"][0]
+    evaluation = evaluation_payload(latest["ai_interviewer_score"], latest["ai_interviewer_feedback"],
+                                    pending=latest["ai_interviewer_score"] is None)
+    if evaluation.get("pending"):
+        evaluation["eval_id"] = latest["id"]
+    return {
+        "evaluation": evaluation,
+        "done": nxt is None,
+        "next_question": nxt["question"] if nxt else None,
+        "turn_index": turn_index + 1,
+        "history": history_lines(qas, turn_index + 1),
+    }
+
+def wait_for_turn_result(session_id: str, turn_index: int, timeout: float = TURN_RESULT_WAIT_SECONDS,
+                         poll_seconds: float = 0.5) -> Optional[Dict[str, Any]]:
+    """
+    Poll until the request that claimed a turn has finished it; None on timeout.
+    Under a request deadline the wait also ends with the budget.
+    """
+    left = deadline.remaining()
+    give_up = time.monotonic() + (timeout if left is None else min(timeout, left))
+    while True:
+        try:
+            result = stored_turn_result(session_id, turn_index)
+        except deadline.DeadlineExceeded:
+            return None
+        remaining = give_up - time.monotonic()
+        if result is not None or remaining <= 0:
+            return result
+        time.sleep(min(poll_seconds, remaining))
+        poll_seconds = min(poll_seconds * 1.5, 2.0)
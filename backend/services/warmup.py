@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from agents.agents import chat_completion, all_models, required_models, model_last_used
+from agents.scheduler import priority, BATCH
+from config import GROQ_KEY, WARMUP_TIMEOUT, KEEPALIVE_INTERVAL
+from db.supabase_db import sb
+from services import code_runner
+
+# Per-process readiness state: one entry per model plus the database backend.
+# A model is "warm" once a 1-token completion has succeeded against it; the
+# keep-alive loop re-pings any model that has been idle for KEEPALIVE_INTERVAL
+# so the model server doesn't unload it between bursts of traffic.
+
+_lock = threading.Lock()
+_models: Dict[str, Dict[str, Any]] = {}
+_backends: Dict[str, Dict[str, Any]] = {}
+_started_pid: Optional[int] = None
+
+def _record(table: Dict[str, Dict[str, Any]], name: str, ok: bool, seconds: float, error: Optional[str] = None):
+    with _lock:
+        entry = table.setdefault(name, {"warm": False, "pings": 0})
+        entry["warm"] = ok
+        entry["pings"] += 1
+        entry["last_ping_seconds"] = round(seconds, 3)
+        entry["last_checked"] = time.time()
+        entry["last_error"] = error
+
+def ping_model(model: str) -> bool:
+    """One-token completion; loads the model into memory if the server had unloaded it."""
+    start = time.monotonic()
+    try:
+        with priority(BATCH):  # a keep-alive ping can wait behind real traffic
+            chat_completion(model, [{"role": "user", "content": "ping"}], temperature=0.0, max_tokens=1, timeout=WARMUP_TIMEOUT, purpose="warmup")
+    except Exception as e:
+        _record(_models, model, False, time.monotonic() - start, str(e))
+        print(f"Warm-up of {model} failed: {e}")
+        return False
+    _record(_models, model, True, time.monotonic() - start)
+    return True
+
+def ping_database() -> bool:
+    start = time.monotonic()
+    try:
+        sb().table("sessions").select("id").limit(1).execute()
+    except Exception as e:
+        _record(_backends, "supabase", False, time.monotonic() - start, str(e))
+        return False
+    _record(_backends, "supabase", True, time.monotonic() - start)
+    return True
+
+def warm_all():
+    code_runner.prewarm()
+    for model in all_models():
+        ping_model(model)
+    ping_database()
+
+def _keepalive_loop():
+    warm_all()
+    while True:
+        time.sleep(min(30.0, KEEPALIVE_INTERVAL))
+        now = time.monotonic()
+        for model in all_models():
+            last = model_last_used(model)
+            with _lock:
+                warm = _models.get(model, {}).get("warm", False)
+            # real traffic keeps a model resident; only ping idle or cold ones
+            if not warm or last is None or now - last >= KEEPALIVE_INTERVAL:
+                ping_model(model)
+        ping_database()
+
+def start():
+    """Start warm-up + keep-alive in a daemon thread, once per process (safe to call repeatedly)."""
+    global _started_pid
+    pid = os.getpid()
+    if _started_pid == pid:
+        return
+    with _lock:
+        if _started_pid == pid:
+            return
+        _started_pid = pid
+    threading.Thread(target=_keepalive_loop, name="model-keepalive", daemon=True).start()
+
+def readiness() -> Dict[str, Any]:
+    required = set(required_models())
+    with _lock:
+        models = {m: {**_models.get(m, {"warm": False, "pings": 0}), "required": m in required} for m in all_models()}
+        backends = {name: dict(state) for name, state in _backends.items()}
+    backends.setdefault("supabase", {"warm": False, "pings": 0})
+    backends["groq"] = {"warm": bool(GROQ_KEY), "configured": bool(GROQ_KEY)}  # not pinged: metered API
+    # optional models (fast judge, chunk model) fall back to JUDGE_MODEL, so they don't gate readiness
+    ready = all(m["warm"] for m in models.values() if m["required"]) and backends["supabase"]["warm"]
+    return {"ready": ready, "models": models, "backends": backends}
+
+def _reset_after_fork():
+    global _lock
+    _lock = threading.Lock()
+    _models.clear()
+    _backends.clear()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
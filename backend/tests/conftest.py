@@ -0,0 +1,8 @@
+import os
+import sys
+
+# no model warm-up threads when a test imports the app
+os.environ.setdefault("WARMUP_ON_START", "0")
+
+# tests import backend modules the way the app does (`import config`, `from services import ...`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
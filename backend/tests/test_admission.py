@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+from config import ADMISSION_RETRY_AFTER
+from services import admission
+from services.admission import AdmissionRejected, ModelGate, UserRateLimiter
+
+
+def test_rate_limit_rejects_with_retry_after():
+    limiter = UserRateLimiter(per_minute=60, burst=2)
+    limiter.check("u1")
+    limiter.check("u1")
+    with pytest.raises(AdmissionRejected) as e:
+        limiter.check("u1")
+    assert e.value.retry_after == 1
+    limiter.check("u2")  # buckets are per user
+
+
+def test_full_queue_rejects_immediately():
+    gate = ModelGate("m", max_inflight=1, max_queue=0, queue_timeout=30)
+    gate.acquire()
+    with pytest.raises(AdmissionRejected) as e:
+        gate.acquire()
+    assert e.value.retry_after == ADMISSION_RETRY_AFTER
+    gate.release()
+    gate.acquire()  # the slot is free again
+
+
+def test_queued_request_times_out_or_gets_the_freed_slot():
+    gate = ModelGate("m", max_inflight=1, max_queue=1, queue_timeout=0.05)
+    gate.acquire()
+    with pytest.raises(AdmissionRejected):
+        gate.acquire()
+    assert gate.stats()["waiting"] == 0
+
+    gate.queue_timeout = 5
+    threading.Timer(0.05, gate.release).start()
+    gate.acquire()
+    assert gate.stats()["inflight"] == 1
+
+
+def test_admit_releases_what_it_took_when_rejected(monkeypatch):
+    free = ModelGate("a", max_inflight=1, max_queue=0, queue_timeout=1)
+    full = ModelGate("b", max_inflight=0, max_queue=0, queue_timeout=1)
+    monkeypatch.setattr(admission, "gate", {"a": free, "b": full}.get)
+    monkeypatch.setattr(admission, "rate_limiter", UserRateLimiter(60, 5))
+    with pytest.raises(AdmissionRejected):
+        admission.admit("u1", ["b", "a"])
+    assert free.stats()["inflight"] == 0
+
+
+def test_start_answers_429_with_retry_after(monkeypatch):
+    import app
+    import routes.interview as interview
+    monkeypatch.setattr(interview, "get_user_id_from_auth", lambda header: (True, "u1"))
+    monkeypatch.setattr(admission, "rate_limiter", UserRateLimiter(60, 5))
+    monkeypatch.setattr(admission, "gate", lambda name: ModelGate(name, max_inflight=0, max_queue=0, queue_timeout=1))
+
+    resp = app.app.test_client().post("/api/interview/start", json={"track": "technical"},
+                                      headers={"Authorization": "Bearer t"})
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == str(ADMISSION_RETRY_AFTER)
+    assert resp.get_json()["retry_after"] == ADMISSION_RETRY_AFTER
+
+
+def test_releasing_the_same_gates_twice_frees_each_slot_once():
+    gate = ModelGate("m", max_inflight=1, max_queue=0, queue_timeout=30)
+    gate.acquire()
+    held = [gate]
+    admission.release(held)
+    admission.release(held)  # e.g. before a wait, then again at teardown
+    assert held == [] and gate.stats()["inflight"] == 0
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from services import code_runner
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    """Tight limits, no warm workers left behind and no cached results between tests."""
+    monkeypatch.setattr(code_runner, "CODE_RUNNER_WORKERS", 0)
+    monkeypatch.setattr(code_runner, "CODE_RUN_TIMEOUT", 3.0)
+    limits = json.loads(code_runner._LIMITS)
+    limits["cpu_seconds"] = 1
+    monkeypatch.setattr(code_runner, "_LIMITS", json.dumps(limits))
+    code_runner._cache.clear()
+    yield code_runner
+    code_runner._cache.clear()
+    while code_runner._ready:
+        proc, _ = code_runner._ready.popleft()
+        code_runner._kill(proc)
+
+
+def test_passing_and_failing_tests(runner):
+    code = "def add(a, b):\n    return a + b\n"
+    tests = "def test_add():\n    assert add(2, 3) == 5\n\ndef test_wrong():\n    assert add(2, 2) == 5\n"
+    result = runner.run_code(code, tests)
+    assert result["status"] == "tests_failed"
+    assert (result["passed"], result["failed"]) == (1, 1)
+
+
+def test_wall_clock_timeout(runner):
+    result = runner.run_code("import time\ntime.sleep(30)\n")
+    assert result["status"] == "timeout"
+
+
+def test_cpu_limit(runner):
+    result = runner.run_code("while True:\n    pass\n")
+    assert result["status"] == "cpu_limit"
+
+
+def test_too_large(runner, monkeypatch):
+    monkeypatch.setattr(code_runner, "CODE_MAX_BYTES", 10)
+    assert runner.run_code("x = 1  # more than ten bytes")["status"] == "too_large"
+
+
+def test_result_cannot_be_forged_on_inherited_descriptors(runner):
+    forged = ('{"status": "ok", "tests": [{"name": "test_x", "passed": true}], "passed": 1, "failed": 0}')
+    code = (
+        "import os\n"
+        "for fd in range(1, 64):\n"
+        "    try:\n"
+        f"        os.write(fd, {forged!r}.encode() + b'\\n')\n"
+        "    except OSError:\n"
+        "        pass\n"
+        "os._exit(0)\n"
+    )
+    result = runner.run_code(code, "def test_x():\n    assert False\n")
+    assert result["status"] != "ok"
+    assert result["passed"] == 0
+
+
+def test_server_files_are_out_of_reach(runner):
+    result = runner.run_code(f"open({runner.WORKER_SCRIPT!r}).read()\n")
+    assert result["status"] in ("runtime_error", "sandbox_unavailable")
+    assert "stdout" not in result
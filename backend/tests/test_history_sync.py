@@ -0,0 +1,33 @@
+from services.history_sync import _parse_version, history_payload, history_version
+
+HISTORY = ["Q: Tell me about yourself.", "A: I build backends.", "Q: Why this team?"]
+
+def test_full_history_without_a_token():
+    payload = history_payload(HISTORY)
+    assert payload == {"history_version": history_version(HISTORY), "history": HISTORY}
+
+def test_delta_after_a_known_prefix():
+    token = history_version(HISTORY[:1])
+    payload = history_payload(HISTORY, token)
+    assert payload["history_delta"] == HISTORY[1:]
+    assert payload["history_since"] == 1
+    assert "history" not in payload
+
+def test_current_token_gives_an_empty_delta():
+    payload = history_payload(HISTORY, history_version(HISTORY))
+    assert payload["history_delta"] == []
+    assert payload["history_since"] == len(HISTORY)
+
+def test_full_flag_forces_a_resync():
+    payload = history_payload(HISTORY, history_version(HISTORY[:2]), full=True)
+    assert payload["history"] == HISTORY
+
+def test_parse_version_accepts_matching_prefixes():
+    for n in range(len(HISTORY) + 1):
+        assert _parse_version(history_version(HISTORY[:n]), HISTORY) == n
+
+def test_parse_version_rejects_bad_tokens():
+    stale = history_version(["Q: Some other question?"])
+    too_long = history_version(HISTORY + ["A: More."])
+    for token in (None, "", "garbage", "1", "x.0", "1.zz", "-1.0", stale, too_long):
+        assert _parse_version(token, HISTORY) is None
@@ -0,0 +1,46 @@
+import threading
+import time
+
+from agents import functions
+
+
+def fake_judge(state):
+    time.sleep(0.01)  # let the other turns interleave
+    line = f"Score: 4. Feedback: judged {state['candidate_answer']}"
+    return {"judge_feedback": line, "judge_score": 4, "judge_path": "direct", "log": state["log"].judge(line)}
+
+
+def fake_interviewer(state):
+    question = f"Follow-up {state['round']} for {state['mode']}?"
+    return {"question": question, "topic": "t", "log": state["log"].ask(question)}
+
+
+def test_concurrent_turns_keep_their_own_history(monkeypatch):
+    monkeypatch.setattr(functions, "judge_node", fake_judge)
+    monkeypatch.setattr(functions, "interviewer_node", fake_interviewer)
+    results = {}
+
+    def turn(user):
+        history = [f"Q: {user} question?", f"A: {user} answer"]
+        results[user] = functions.judge_step(f"{user} question?", f"{user} answer", history,
+                                             mode="behavioral" if user.endswith("1") else "technical")
+
+    threads = [threading.Thread(target=turn, args=(f"user{i}",)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for i in range(8):
+        user = f"user{i}"
+        mode = "behavioral" if user.endswith("1") else "technical"
+        assert list(results[user]["history"]) == [
+            f"Q: {user} question?", f"A: {user} answer", f"Q: Follow-up 2 for {mode}?",
+        ]
+        assert results[user]["evaluation_raw_json"] == f"Score: 4. Feedback: judged {user} answer"
+
+
+def test_answer_not_yet_in_history_is_added_once(monkeypatch):
+    monkeypatch.setattr(functions, "judge_node", fake_judge)
+    monkeypatch.setattr(functions, "interviewer_node", fake_interviewer)
+    out = functions.judge_step("Q1?", "mine", ["Q: Q1?"], mode="technical")
+    assert list(out["history"]) == ["Q: Q1?", "A: mine", "Q: Follow-up 2 for technical?"]
@@ -0,0 +1,49 @@
+import threading
+
+import pytest
+
+import config
+from agents import agents
+from agents.prompts import count_tokens
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    """Record every key-point extraction call instead of calling a model."""
+    calls = []
+    lock = threading.Lock()
+
+    def fake_completion(model, messages, **kwargs):
+        with lock:
+            calls.append(messages[-1]["content"])
+        return "point"
+
+    monkeypatch.setattr(agents, "chat_completion", fake_completion)
+    monkeypatch.setattr(config, "JUDGE_CHUNK_TOKENS", 100)
+    monkeypatch.setattr(config, "JUDGE_CHUNK_MAX", 4)
+    monkeypatch.setattr(config, "JUDGE_CHUNK_MAX_TOKENS", 400)
+    return calls
+
+
+def answer(words):
+    return " ".join(f"w{i}" for i in range(words))
+
+
+def test_chunks_grow_so_the_whole_answer_is_read(extractions):
+    text = answer(600)
+    assert 400 < count_tokens(text) <= 1600
+    condensed = agents.condense_answer("technical", "Q?", text)
+    assert len(extractions) <= config.JUDGE_CHUNK_MAX + 1
+    # every word reached an extraction call, and nothing is reported as cut
+    sent = "".join(extractions)
+    assert "w0 " in sent and "w599" in sent and "w300 " in sent
+    assert "were cut" not in condensed
+
+
+def test_trimming_past_the_ceiling_is_marked(extractions):
+    condensed = agents.condense_answer("technical", "Q?", answer(5000))
+    first_line = condensed.splitlines()[0]
+    assert "5000-word answer" in first_line
+    assert "words from the middle were cut" in first_line
+    sent = "".join(extractions)
+    assert "w0 " in sent and "w4999" in sent  # head and tail are kept
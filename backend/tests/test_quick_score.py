@@ -0,0 +1,62 @@
+import random
+
+import numpy as np
+import pytest
+
+from services import quick_score
+
+WORDS = {
+    1: "dunno maybe whatever guess",
+    2: "kind of something like that thing",
+    3: "use a hash map to store counts",
+    4: "hash map counts each element then scan once linear time",
+    5: "hash map gives linear time constant space trade off versus sorting n log n edge cases empty input",
+}
+
+
+def examples(n, seed=1):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        score = rng.randint(1, 5)
+        words = WORDS[score].split()
+        rng.shuffle(words)
+        out.append((("technical", "How do you find duplicates in a list?", " ".join(words)), score))
+    return out
+
+
+@pytest.fixture(scope="module")
+def model():
+    data = examples(200)
+    return quick_score.train([ex for ex, _ in data], [s for _, s in data], epochs=150)
+
+
+def test_learns_a_separable_set(model):
+    test = examples(100, seed=2)
+    proba = quick_score.predict_proba(model, [ex for ex, _ in test])
+    assert proba.shape == (100, 5)
+    assert np.allclose(proba.sum(axis=1), 1.0)
+    pred = quick_score.SCORES[proba.argmax(axis=1)]
+    assert (pred == np.array([s for _, s in test])).mean() > 0.9
+
+
+def test_save_load_round_trip(model, tmp_path):
+    path = str(tmp_path / "qs.npz")
+    quick_score.save(model, path)
+    loaded = quick_score.load(path)
+    assert loaded["meta"] == model["meta"]
+    batch = [ex for ex, _ in examples(20, seed=3)]
+    assert np.allclose(quick_score.predict_proba(loaded, batch), quick_score.predict_proba(model, batch), atol=1e-6)
+
+
+def test_predict_serves_the_saved_model(model, tmp_path, monkeypatch):
+    path = str(tmp_path / "qs.npz")
+    monkeypatch.setattr(quick_score, "QUICK_SCORE_MODEL_PATH", path)
+    monkeypatch.setattr(quick_score, "_model", None)
+    monkeypatch.setattr(quick_score, "_model_mtime", None)
+    assert quick_score.predict("technical", "Q?", "anything") is None  # no model file yet
+
+    quick_score.save(model, path)
+    score, confidence = quick_score.predict("technical", "How do you find duplicates in a list?", WORDS[5])
+    assert score == 5
+    assert 0.2 < confidence <= 1.0
@@ -0,0 +1,62 @@
+import threading
+
+from services.streaming import JudgeStream, run_streamed
+
+
+def judge_events(deltas):
+    events = []
+    stream = JudgeStream(lambda event, data: events.append((event, data)))
+    for delta in deltas:
+        stream.feed(delta)
+    return events
+
+
+def feedback_text(events):
+    return "".join(data["text"] for event, data in events if event == "feedback")
+
+
+def test_score_and_feedback_in_one_delta():
+    events = judge_events(["Score: 4. Feedback: Clear structure, name the trade-offs."])
+    assert events[0] == ("score", {"score": 4})
+    assert feedback_text(events) == "Clear structure, name the trade-offs."
+
+
+def test_split_across_deltas():
+    events = judge_events(["Sco", "re", ": 2", ". Feed", "back:", " ", "Too", " vague."])
+    assert [e for e in events if e[0] == "score"] == [("score", {"score": 2})]
+    assert feedback_text(events) == "Too vague."
+    assert events.index(("score", {"score": 2})) < next(i for i, e in enumerate(events) if e[0] == "feedback")
+
+
+def test_score_sent_once_and_only_for_1_to_5():
+    assert judge_events(["Score: 9. Feedback: n/a"]) == [("feedback", {"text": "n/a"})]
+    events = judge_events(["score=5 ", "Feedback: good, score 3 in the rubric"])
+    assert [e for e in events if e[0] == "score"] == [("score", {"score": 5})]
+
+
+def test_run_streamed_relays_frames_and_calls_on_done():
+    done = threading.Event()
+
+    def work(emit):
+        emit("turn", {"ok": True})
+
+    frames = list(run_streamed("test", work, judge=False, on_done=done.set))
+    assert done.is_set()
+    assert frames == ['event: turn\ndata: {"ok": true}\n\n']
+
+
+def test_run_streamed_reports_failures_and_still_calls_on_done():
+    done = threading.Event()
+
+    def work(emit):
+        raise RuntimeError("boom")
+
+    frames = list(run_streamed("test", work, judge=False, on_done=done.set))
+    assert done.is_set()
+    assert len(frames) == 1 and frames[0].startswith("event: error\n")
+
+
+def test_on_done_runs_without_a_reader():
+    done = threading.Event()
+    run_streamed("test", lambda emit: None, judge=False, on_done=done.set)  # never iterated
+    assert done.wait(5)
@@ -0,0 +1,125 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from db import supabase_db
+from deadline import budget
+from services import turns
+
+
+class FakeUpdate:
+    """Just enough of a postgrest update builder for the turn-claim queries; execute() is atomic."""
+
+    def __init__(self, db, values):
+        self.db = db
+        self.values = values
+        self.filters = []
+
+    def eq(self, col, value):
+        self.filters.append(lambda row: row.get(col) == value)
+        return self
+
+    def is_(self, col, value):
+        assert value == "null"
+        self.filters.append(lambda row: row.get(col) is None)
+        return self
+
+    def or_(self, expr):
+        # e.g. "claim_token.is.null,claimed_at.lt.2024-01-01T00:00:00.000000Z"
+        tests = []
+        for part in expr.split(","):
+            col, op, value = part.split(".", 2)
+            if op == "is":
+                tests.append(lambda row, col=col: row.get(col) is None)
+            elif op == "lt":
+                tests.append(lambda row, col=col, value=value: row.get(col) is not None and row[col] < value)
+            else:
+                raise AssertionError(f"unsupported filter {part}")
+        self.filters.append(lambda row: any(t(row) for t in tests))
+        return self
+
+    def execute(self):
+        with self.db.lock:
+            hit = [row for row in self.db.rows if all(f(row) for f in self.filters)]
+            for row in hit:
+                row.update(self.values)
+            return SimpleNamespace(data=[dict(row) for row in hit])
+
+
+class FakeDB:
+    def __init__(self, rows):
+        self.rows = rows
+        self.lock = threading.Lock()
+
+    def table(self, name):
+        assert name == "qa_pairs"
+        return SimpleNamespace(update=lambda values: FakeUpdate(self, values))
+
+
+def _ts(delta_seconds=0):
+    return (datetime.now(timezone.utc) + timedelta(seconds=delta_seconds)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+@pytest.fixture
+def qa(monkeypatch):
+    row = {"id": "qa-1", "answer": None, "claim_token": None, "claimed_at": None}
+    monkeypatch.setattr(supabase_db, "_sb", FakeDB([row]))
+    return row
+
+
+def test_only_one_concurrent_claim_wins(qa):
+    start = threading.Barrier(8)
+    wins = []
+
+    def race(token):
+        start.wait()
+        if supabase_db.claim_turn("qa-1", token, lease_seconds=60):
+            wins.append(token)
+
+    threads = [threading.Thread(target=race, args=(f"t{i}",)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(wins) == 1
+    assert qa["claim_token"] == wins[0]
+
+
+def test_live_claim_blocks_and_expired_claim_is_taken_over(qa):
+    assert supabase_db.claim_turn("qa-1", "first", lease_seconds=60)
+    assert not supabase_db.claim_turn("qa-1", "second", lease_seconds=60)
+    qa["claimed_at"] = _ts(-120)  # the first request went away
+    assert supabase_db.claim_turn("qa-1", "second", lease_seconds=60)
+    assert qa["claim_token"] == "second"
+    # the old holder can no longer save its answer
+    assert not supabase_db.save_claimed_answer("qa-1", "first", "late answer")
+
+
+def test_release_lets_a_retry_claim_at_once(qa):
+    assert supabase_db.claim_turn("qa-1", "first", lease_seconds=60)
+    supabase_db.release_turn_claim("qa-1", "someone-else")  # not the holder: no effect
+    assert not supabase_db.claim_turn("qa-1", "retry", lease_seconds=60)
+    supabase_db.release_turn_claim("qa-1", "first")
+    assert supabase_db.claim_turn("qa-1", "retry", lease_seconds=60)
+
+
+def test_answered_turn_cannot_be_claimed(qa):
+    assert supabase_db.claim_turn("qa-1", "first", lease_seconds=60)
+    assert supabase_db.save_claimed_answer("qa-1", "first", "my answer")
+    qa["claimed_at"] = _ts(-120)
+    assert not supabase_db.claim_turn("qa-1", "second", lease_seconds=60)
+    # a judging failure after the save gives the turn back, answer and all
+    supabase_db.release_turn_claim("qa-1", "first", clear_answer=True)
+    assert qa["answer"] is None
+    assert supabase_db.claim_turn("qa-1", "second", lease_seconds=60)
+
+
+def test_waiting_for_another_turn_ends_with_the_budget(monkeypatch):
+    monkeypatch.setattr(turns, "stored_turn_result", lambda session_id, turn_index: None)
+    start = time.monotonic()
+    with budget(0.3):
+        assert turns.wait_for_turn_result("s1", 1, timeout=150, poll_seconds=0.05) is None
+    assert time.monotonic() - start < 1
@@ -0,0 +1,36 @@
+from agents.turn_log import TurnLog
+
+def test_history_questions_and_judge_lines():
+    log = TurnLog().ask("Q1?").answer("first").judge("Score: 4. Feedback: fine").ask("Q2?")
+    assert list(log.history()) == ["Q: Q1?", "A: first", "Q: Q2?"]
+    assert list(log.questions()) == ["Q1?", "Q2?"]
+    assert list(log.judge_lines()) == ["Score: 4. Feedback: fine"]
+    assert len(log) == 4
+    assert log.history()[-1] == "Q: Q2?"
+    assert log.history()[1:] == ["A: first", "Q: Q2?"]
+
+def test_snapshots_keep_their_prefix():
+    first = TurnLog().ask("Q1?")
+    second = first.answer("A1")
+    third = second.judge("Score: 3").ask("Q2?")
+    assert list(first.history()) == ["Q: Q1?"]
+    assert list(second.history()) == ["Q: Q1?", "A: A1"]
+    assert list(second.judge_lines()) == []
+    assert list(third.questions()) == ["Q1?", "Q2?"]
+
+def test_appending_to_an_older_snapshot_diverges():
+    base = TurnLog().ask("Q1?")
+    left = base.answer("left")
+    right = base.answer("right")  # base is no longer the newest log on its store
+    assert list(left.history()) == ["Q: Q1?", "A: left"]
+    assert list(right.history()) == ["Q: Q1?", "A: right"]
+    assert list(base.history()) == ["Q: Q1?"]
+    # both branches keep growing independently
+    assert list(left.ask("L2?").questions()) == ["Q1?", "L2?"]
+    assert list(right.ask("R2?").questions()) == ["Q1?", "R2?"]
+
+def test_from_history_round_trip():
+    history = ["Q: What is a closure?", "A: A function with its environment.", "Q: Why use one?"]
+    log = TurnLog.from_history(history, ["Score: 5. Feedback: clear"])
+    assert list(log.history()) == history
+    assert list(log.judge_lines()) == ["Score: 5. Feedback: clear"]
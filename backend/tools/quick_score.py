@@ -0,0 +1,163 @@
+"""
+Train and evaluate the local answer scorer (services/quick_score.py).
+
+Labels are the judge's scores already stored in `evals` (the latest scored
+eval of each answered `qa_pairs` row), read in keyset-paginated pages, or
+the lines of a history export (`--from-export FILE`, see /api/interview/export).
+Answers are split into train and test sets by session, so no session
+contributes to both. `train` fits on the train set, reports on the test set
+and writes the model to QUICK_SCORE_MODEL_PATH (or --out), which running
+workers pick up without a restart. `eval` reports on a saved model.
+
+The report compares the model with always predicting the most common score,
+and shows, per confidence threshold, how many answers would get a provisional
+score (coverage) and how often it matches the judge. Pick
+QUICK_SCORE_MIN_CONFIDENCE from that table.
+
+Usage (from backend/):
+    python -m tools.quick_score train [--out storage/quick_score.npz] [--epochs 300]
+    python -m tools.quick_score eval [--model storage/quick_score.npz]
+    python -m tools.quick_score train --synthetic 3000 --out /tmp/qs.npz   # no database: scripted answers, stand-in judge
+"""
+import argparse
+import json
+import random
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from config import QUICK_SCORE_MODEL_PATH
+from services import quick_score
+
+THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.9)
+
+Example = Tuple[str, str, str, str, int]  # (session_id, track, question, answer, score)
+
+def _label(evals: List[Dict[str, Any]]) -> Optional[int]:
+    scored = [e for e in evals or [] if e.get("ai_interviewer_score") is not None]
+    if not scored:
+        return None
+    return max(scored, key=lambda e: e.get("created_at") or "")["ai_interviewer_score"]
+
+def db_examples(page_size: int) -> Iterator[Example]:
+    from db.supabase_db import get_answered_qas_page
+    after = None
+    while True:
+        page = get_answered_qas_page(after, page_size)
+        if not page:
+            return
+        for qa in page:
+            score = _label(qa.get("evals"))
+            if score is not None:
+                track = (qa.get("sessions") or {}).get("track") or "technical"
+                yield qa["session_id"], track, qa["question"], qa["answer"], score
+        after = page[-1]["id"]
+
+def export_examples(path: str) -> Iterator[Example]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            obj = json.loads(line)
+            if obj.get("type") != "session":
+                continue
+            for turn in obj.get("turns") or []:
+                score = _label(turn.get("evals"))
+                if score is not None and turn.get("answer"):
+                    yield obj["id"], obj.get("track") or "technical", turn["question"], turn["answer"], score
+
+def synthetic_examples(n: int, seed: int) -> Iterator[Example]:
+    from bench.simulate import scripted_answer
+    from tools.rescore import stand_in_judge
+    rng = random.Random(seed)
+    for i in range(n):
+        persona = rng.choice(("strong", "average", "weak", "rambling"))
+        track = rng.choice(("technical", "behavioral"))
+        question = f"Stand-in {track} question {i % 50}?"
+        answer = scripted_answer(persona, track, question, rng)
+        yield f"session-{i // 3}", track, question, answer, stand_in_judge(track, question, answer, "")[1]
+
+def split(examples: List[Example], test_share: float) -> Tuple[List[Example], List[Example]]:
+    """Deterministic split by session id."""
+    train, test = [], []
+    for ex in examples:
+        (test if zlib.crc32(ex[0].encode("utf-8")) % 1000 < test_share * 1000 else train).append(ex)
+    return train, test
+
+def report(model: Dict[str, Any], test: List[Example], train_scores: List[int]) -> Dict[str, Any]:
+    y = np.array([ex[4] for ex in test])
+    start = time.perf_counter()
+    proba = quick_score.predict_proba(model, [ex[1:4] for ex in test])
+    per_answer_ms = (time.perf_counter() - start) * 1000 / max(1, len(test))
+    pred = quick_score.SCORES[proba.argmax(axis=1)]
+    conf = proba.max(axis=1)
+    majority = int(np.bincount(train_scores or [3]).argmax())
+
+    def summary(mask: np.ndarray) -> Dict[str, Any]:
+        n = int(mask.sum())
+        if not n:
+            return {"n": 0}
+        d = pred[mask] - y[mask]
+        return {"n": n, "accuracy": round(float((d == 0).mean()), 3),
+                "within_1": round(float((np.abs(d) <= 1).mean()), 3), "mae": round(float(np.abs(d).mean()), 3)}
+
+    confusion = np.zeros((5, 5), dtype=np.int64)
+    np.add.at(confusion, (y - 1, pred - 1), 1)
+    every = np.ones(len(y), dtype=bool)
+    return {
+        "test_answers": len(y),
+        "majority_baseline": {"score": majority, "accuracy": round(float((y == majority).mean()), 3) if len(y) else None},
+        "all": summary(every),
+        "by_confidence": {str(t): {"coverage": round(float((conf >= t).mean()), 3), **summary(conf >= t)}
+                          for t in THRESHOLDS},
+        "confusion_judge_rows_model_cols": confusion.tolist(),
+        "ms_per_answer": round(per_answer_ms, 3),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("train", "eval"))
+    parser.add_argument("--out", default=QUICK_SCORE_MODEL_PATH, help="where train writes the model")
+    parser.add_argument("--model", default=QUICK_SCORE_MODEL_PATH, help="model for eval")
+    parser.add_argument("--from-export", help="read labeled answers from an NDJSON history export instead of the database")
+    parser.add_argument("--synthetic", type=int, default=0, help="use this many scripted answers with a stand-in judge")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--test-share", type=float, default=0.2)
+    parser.add_argument("--min-examples", type=int, default=200, help="refuse to train on fewer labeled answers")
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--lr", type=float, default=0.5)
+    parser.add_argument("--l2", type=float, default=1e-4)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        source = synthetic_examples(args.synthetic, args.seed)
+    elif args.from_export:
+        source = export_examples(args.from_export)
+    else:
+        source = db_examples(args.page_size)
+    examples = list(source)
+    train_set, test_set = split(examples, args.test_share)
+    print(f"{len(examples)} labeled answers: {len(train_set)} train, {len(test_set)} test")
+
+    if args.command == "train":
+        if len(train_set) < args.min_examples:
+            raise SystemExit(f"Only {len(train_set)} training answers (need {args.min_examples}); not writing a model")
+        start = time.perf_counter()
+        model = quick_score.train([ex[1:4] for ex in train_set], [ex[4] for ex in train_set],
+                                  epochs=args.epochs, lr=args.lr, l2=args.l2)
+        print(f"trained in {time.perf_counter() - start:.1f}s")
+        quick_score.save(model, args.out)
+        print(f"wrote {args.out}")
+    else:
+        model = quick_score.load(args.model)
+        print(f"model {args.model}: {model['meta']}")
+    out = report(model, test_set, [ex[4] for ex in train_set])
+    confusion = out.pop("confusion_judge_rows_model_cols")
+    print(json.dumps(out, indent=2))
+    print("confusion (rows: judge score 1-5, columns: model score 1-5):")
+    for row in confusion:
+        print("  " + " ".join(f"{c:>6}" for c in row))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Re-score stored answers with the current judge.
+
+Streams answered `qa_pairs` in keyset-paginated pages, judges each answer
+through a bounded thread pool and writes a new `evals` row tagged with the
+current `judge_version()`. Answers that already have an eval for this
+version are skipped, and progress is checkpointed after every page, so an
+interrupted run resumes where it stopped. The new evals supersede the old ones,
+so each page ends by rebuilding its users' rollups from their latest evals. At the end, score shifts against
+each answer's previous eval are summarized per judge model.
+
+A judge call that fails is logged to <checkpoint>.failed.jsonl and the run
+goes on. Those answers get no eval for this version, so a later run with a
+fresh --checkpoint judges only them (and anything answered since).
+
+Judge calls run at BATCH priority, capped by LLM_BATCH_MAX_CONCURRENT in this
+process's dispatcher. The server's dispatcher doesn't see them, so keep
+--workers low (or run off-peak) next to live traffic.
+
+Usage (from backend/):
+    python -m tools.rescore [--page-size 500] [--workers 8] [--checkpoint rescore.ckpt.json]
+    python -m tools.rescore --stand-in     # no model server, no writes (--stand-in implies --dry-run)
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from agents.agents import judge_answer, judge_version, judge_path_model
+from agents.scheduler import priority, BATCH
+from db.supabase_db import get_answered_qas_page, insert_evals
+from services.rollups import rebuild_rollups
+
+STAND_IN_MODEL = "stand-in"
+
+def stand_in_judge(mode: str, question: str, answer: str, ai_feedback: str) -> Tuple[str, Optional[int], str]:
+    """Deterministic local judge for dry runs: scores by answer length and structure."""
+    words = len(answer.split())
+    score = 1 + min(4, words // 40)
+    if mode == "behavioral" and any(k in answer.lower() for k in ("result", "outcome", "%")):
+        score = min(5, score + 1)
+    return f"Score: {score}. Feedback: stand-in judge ({words} words).", score, STAND_IN_MODEL
+
+def _previous_score(qa: Dict[str, Any]) -> Optional[int]:
+    evals = [e for e in (qa.get("evals") or []) if e.get("ai_interviewer_score") is not None]
+    if not evals:
+        return None
+    return max(evals, key=lambda e: e.get("created_at") or "")["ai_interviewer_score"]
+
+def _has_version(qa: Dict[str, Any], version: str) -> bool:
+    return any(e.get("judge_version") == version for e in (qa.get("evals") or []))
+
+def load_checkpoint(path: str, version: str) -> Dict[str, Any]:
+    if os.path.exists(path):
+        with open(path) as f:
+            ckpt = json.load(f)
+        if ckpt.get("judge_version") == version:
+            return ckpt
+        print(f"Checkpoint {path} is for judge {ckpt.get('judge_version')}; starting over for {version}")
+    return {"judge_version": version, "after_id": None, "scanned": 0, "rescored": 0, "skipped": 0, "failed": 0}
+
+def save_checkpoint(path: str, ckpt: Dict[str, Any]):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(ckpt, f)
+    os.replace(tmp, path)
+
+def shift_stats(shifts_path: str) -> Dict[str, Dict[str, Any]]:
+    """Per-model score-shift statistics over every (old, new) pair recorded in `shifts_path`."""
+    if not os.path.exists(shifts_path):
+        return {}
+    with open(shifts_path, newline="") as f:
+        rows = [r for r in csv.DictReader(f) if r["old_score"] and r["new_score"]]
+    if not rows:
+        return {}
+    models = np.array([r["model"] for r in rows])
+    old = np.array([int(r["old_score"]) for r in rows], dtype=np.float64)
+    new = np.array([int(r["new_score"]) for r in rows], dtype=np.float64)
+
+    out = {}
+    for model in np.unique(models):
+        m = models == model
+        o, n = old[m], new[m]
+        d = n - o
+        confusion = np.zeros((5, 5), dtype=np.int64)
+        np.add.at(confusion, (o.astype(int) - 1, n.astype(int) - 1), 1)
+        out[str(model)] = {
+            "n": int(m.sum()),
+            "mean_old": float(o.mean()),
+            "mean_new": float(n.mean()),
+            "mean_shift": float(d.mean()),
+            "std_shift": float(d.std()),
+            "mean_abs_shift": float(np.abs(d).mean()),
+            "changed": float((d != 0).mean()),
+            "up": float((d > 0).mean()),
+            "down": float((d < 0).mean()),
+            "corr": float(np.corrcoef(o, n)[0, 1]) if o.std() > 0 and n.std() > 0 else None,
+            "confusion_old_rows_new_cols": confusion.tolist(),
+        }
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=8, help="concurrent judge calls")
+    parser.add_argument("--checkpoint", default="rescore.ckpt.json")
+    parser.add_argument("--limit", type=int, default=0, help="stop after this many answers (0 = all)")
+    parser.add_argument("--stand-in", action="store_true",
+                        help="use a deterministic local judge instead of the model server (never writes)")
+    parser.add_argument("--dry-run", action="store_true", help="judge but don't write eval rows")
+    args = parser.parse_args()
+    if args.stand_in and not args.dry_run:
+        # stand-in scores would become the newest, user-visible evals
+        print("--stand-in implies --dry-run: no eval rows will be written")
+        args.dry_run = True
+
+    judge = stand_in_judge if args.stand_in else judge_answer
+    version = STAND_IN_MODEL if args.stand_in else judge_version()
+    shifts_path = os.path.splitext(args.checkpoint)[0] + ".shifts.csv"
+    failed_path = os.path.splitext(args.checkpoint)[0] + ".failed.jsonl"
+
+    ckpt = load_checkpoint(args.checkpoint, version)
+    if ckpt["after_id"] is None:
+        # fresh run: don't mix in shifts or failures from an earlier judge
+        for path in (shifts_path, failed_path):
+            if os.path.exists(path):
+                os.remove(path)
+    print(f"Re-scoring with judge {version}, resuming after {ckpt['after_id'] or 'start'}")
+
+    def score_one(qa: Dict[str, Any]) -> Dict[str, Any]:
+        mode = (qa.get("sessions") or {}).get("track") or "technical"
+        try:
+            with priority(BATCH):  # pool threads don't inherit the priority, so set it here
+                judge_eval, score, path = judge(mode, qa["question"], qa["answer"], "")
+        except Exception as e:
+            return {"qa": qa, "error": f"{type(e).__name__}: {e}"}
+        model = STAND_IN_MODEL if args.stand_in else judge_path_model(path)
+        return {"qa": qa, "line": judge_eval, "score": score, "model": model}
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        while True:
+            page = get_answered_qas_page(ckpt["after_id"], args.page_size)
+            if not page:
+                break
+            todo = [qa for qa in page if not _has_version(qa, version)]
+            if args.limit and len(todo) > args.limit - ckpt["rescored"]:
+                todo = todo[:max(0, args.limit - ckpt["rescored"])]
+                page = page[:page.index(todo[-1]) + 1] if todo else page[:0]
+                if not page:
+                    break
+
+            results: List[Dict[str, Any]] = list(pool.map(score_one, todo))
+            failures = [r for r in results if "error" in r]
+            if failures:
+                with open(failed_path, "a") as f:
+                    for r in failures:
+                        f.write(json.dumps({"qa_id": r["qa"]["id"], "judge_version": version, "error": r["error"]}) + "\n")
+                print(f"{len(failures)} judge calls failed on this page (see {failed_path}), e.g. {failures[0]['error']}")
+            results = [r for r in results if "error" not in r]
+            rows = [{
+                "qa_id": r["qa"]["id"],
+                "ai_interviewer_score": r["score"],
+                "ai_interviewer_feedback": r["line"],
+                "judge_model": r["model"],
+                "judge_version": version,
+            } for r in results if r["score"] is not None]
+            if not args.dry_run:
+                insert_evals(rows)
+                rebuild_rollups([r["qa"]["sessions"]["user_id"] for r in results
+                                 if r["score"] is not None and r["qa"].get("sessions")])
+
+            new_file = not os.path.exists(shifts_path)
+            with open(shifts_path, "a", newline="") as f:
+                w = csv.writer(f)
+                if new_file:
+                    w.writerow(["qa_id", "model", "old_score", "new_score"])
+                for r in results:
+                    old = _previous_score(r["qa"])
+                    w.writerow([r["qa"]["id"], r["model"], "" if old is None else old,
+                                "" if r["score"] is None else r["score"]])
+
+            ckpt["after_id"] = page[-1]["id"]
+            ckpt["scanned"] += len(page)
+            ckpt["skipped"] += len(page) - len(todo)
+            ckpt["rescored"] += len(rows)
+            ckpt["failed"] = ckpt.get("failed", 0) + len(failures)
+            save_checkpoint(args.checkpoint, ckpt)
+
+            rate = ckpt["rescored"] / max(1e-9, time.time() - started)
+            print(f"scanned {ckpt['scanned']}, rescored {ckpt['rescored']}, skipped {ckpt['skipped']}, "
+                  f"failed {ckpt['failed']} ({rate:.1f}/s)")
+            if args.limit and ckpt["rescored"] >= args.limit:
+                break
+
+    print(json.dumps(shift_stats(shifts_path), indent=2))
+
+if __name__ == "__main__":
+    main()
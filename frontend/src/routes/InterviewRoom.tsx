@@ -1,13 +1,29 @@
-import { useState, useEffect, useRef, useMemo } from "react";
+import { useState, useEffect, useRef, useMemo, useCallback } from "react";
 import { useParams, useLocation, useNavigate } from "react-router-dom";
 import "../styles/InterviewRoom.css";
 import {
   startInterview,
-  submitAudioAnswer,
+  submitAudioAnswerStream,
+  getEvaluation,
+  type Evaluation,
 } from "../services/interviewService";
 
 import Navbar from '../components/Navbar'
 
+const JUDGE_POLL_MS = 2000;
+const JUDGE_POLL_ATTEMPTS = 60;
+
+// Feedback line for an evaluation; scores are out of 5
+const describeEvaluation = (evaluation: Evaluation) => {
+  if (evaluation.score === null || evaluation.score === undefined) {
+    return evaluation.feedback || "Scoring your answer...";
+  }
+  if (evaluation.provisional) {
+    return `Provisional score: ${evaluation.score}/5 (the final score is on its way) - ${evaluation.feedback}`;
+  }
+  return `Score: ${evaluation.score}/5 - ${evaluation.feedback}`;
+};
+
 export default function InterviewRoom() {
   const { sessionId } = useParams();
   const location = useLocation();
@@ -46,6 +62,60 @@ export default function InterviewRoom() {
   const videoRef = useRef<HTMLVideoElement>(null);
   const streamRef = useRef<MediaStream | null>(null);
 
+  // Question on screen, for the recorder's callbacks (set up once per question)
+  const currentQuestionRef = useRef<string>("");
+  useEffect(() => {
+    currentQuestionRef.current = currentQuestion;
+  }, [currentQuestion]);
+
+  // Pending evaluation whose score may still replace the feedback shown
+  const judgeEvalRef = useRef<string | null>(null);
+
+  // Poll a pending evaluation until the judge's score is stored
+  const pollJudgeScore = useCallback(async (evalId: string) => {
+    judgeEvalRef.current = evalId;
+    for (let attempt = 0; attempt < JUDGE_POLL_ATTEMPTS; attempt++) {
+      await new Promise((resolve) => setTimeout(resolve, JUDGE_POLL_MS));
+      if (judgeEvalRef.current !== evalId) {
+        return; // another answer's feedback is showing now
+      }
+      try {
+        const stored = await getEvaluation(evalId);
+        if (judgeEvalRef.current !== evalId) {
+          return;
+        }
+        if (!stored) {
+          break;
+        }
+        if (!stored.pending) {
+          setFeedback(
+            describeEvaluation({
+              score: stored.score,
+              feedback: stored.feedback,
+            })
+          );
+          judgeEvalRef.current = null;
+          return;
+        }
+      } catch (error) {
+        console.error("Error polling evaluation:", error);
+      }
+    }
+    if (judgeEvalRef.current === evalId) {
+      judgeEvalRef.current = null;
+      setFeedback(
+        (current) =>
+          current && `${current} (The final score will be in your summary.)`
+      );
+    }
+  }, []);
+
+  useEffect(() => {
+    return () => {
+      judgeEvalRef.current = null; // stop polling on unmount
+    };
+  }, []);
+
   // Sample behavioral interview questions wrapped in useMemo to avoid dependency array issues
   const behavioralQuestions = useMemo(
     () => [
@@ -202,21 +272,51 @@ export default function InterviewRoom() {
                 console.log(
                   `Submitting answer for question ${questionIndex + 1}`
                 );
-                const response = await submitAudioAnswer(
+                // Show the judge's feedback and the next question while they are
+                // generated; the final turn result below replaces both
+                const askedQuestion = currentQuestionRef.current;
+                let feedbackPreview = "";
+                let questionPreview = "";
+                const response = await submitAudioAnswerStream(
                   interviewSessionId,
-                  audioBlob
-                );
+                  audioBlob,
+                  {
+                    onTranscript: (text) => console.log(`Transcript: ${text}`),
+                    onScore: (score) => {
+                      feedbackPreview = `Score: ${score}/5 - `;
+                      setFeedback(feedbackPreview);
+                      setFeedbackReviewed(false);
+                    },
+                    onFeedback: (delta) => {
+                      feedbackPreview += delta;
+                      setFeedback(feedbackPreview);
+                    },
+                    onEvaluation: (evaluation) => {
+                      judgeEvalRef.current = null;
+                      setFeedback(describeEvaluation(evaluation));
+                      setFeedbackReviewed(false);
+                    },
+                    onQuestion: (delta) => {
+                      questionPreview += delta;
+                      setCurrentQuestion(questionPreview);
+                    },
+                  }
+                ).catch((error) => {
+                  setCurrentQuestion(askedQuestion); // the previewed question wasn't stored
+                  throw error;
+                });
                 console.log("Got response from server:", response);
 
                 // Handle the response from Groq transcription
                 if (response.evaluation) {
-                  setFeedback(
-                    `Score: ${response.evaluation.score}/10 - ${response.evaluation.feedback}`
-                  );
-                  console.log(
-                    `Feedback received: ${response.evaluation.feedback}`
-                  );
+                  const evaluation: Evaluation = response.evaluation;
+                  judgeEvalRef.current = null;
+                  setFeedback(describeEvaluation(evaluation));
+                  console.log(`Feedback received: ${evaluation.feedback}`);
                   setFeedbackReviewed(false); // Reset feedback review state
+                  if (evaluation.pending && evaluation.eval_id) {
+                    pollJudgeScore(evaluation.eval_id);
+                  }
                 }
 
                 // Move to next question or end interview
@@ -278,7 +378,7 @@ export default function InterviewRoom() {
 
       setMediaRecorder(null);
     };
-  }, [interviewSessionId, questionIndex, totalQuestions]);
+  }, [interviewSessionId, questionIndex, totalQuestions, pollJudgeScore]);
 
   // Function to handle moving to the next question
   const handleNextQuestion = () => {
@@ -287,6 +387,7 @@ export default function InterviewRoom() {
     setHasRecorded(false);
     setFeedback(null);
     setFeedbackReviewed(false);
+    judgeEvalRef.current = null;
 
     // Start recording for the next question
     // We're relying on the current question and index set by the API response
@@ -306,6 +407,7 @@ export default function InterviewRoom() {
       if (hasRecorded) {
         setFeedback(null);
         setFeedbackReviewed(false);
+        judgeEvalRef.current = null;
       }
 
       if (mediaRecorder) {
@@ -1,5 +1,24 @@
 import { supabase } from "../supabaseClient";
 const API_BASE_URL = "http://localhost:5000";
+
+// Last history version token seen per session; the server then sends only new lines
+const historyVersions = new Map<string, string>();
+// Turn being answered per session; lets a retried POST get the original result back
+const turnIndexes = new Map<string, number>();
+const rememberHistoryVersion = <
+  T extends { history_version?: string; turn_index?: number }
+>(
+  sessionId: string,
+  data: T
+): T => {
+  if (data.history_version) {
+    historyVersions.set(sessionId, data.history_version);
+  }
+  if (data.turn_index) {
+    turnIndexes.set(sessionId, data.turn_index);
+  }
+  return data;
+};
 // Get the current auth token
 const getAuthHeader = async () => {
   const session = await supabase.auth.getSession();
@@ -34,7 +53,8 @@ export const startInterview = async (
       throw new Error("Failed to start interview");
     }
 
-    return await response.json();
+    const data = await response.json();
+    return rememberHistoryVersion(data.session_id, data);
   } catch (error) {
     console.error("Error starting interview:", error);
     throw error;
@@ -52,20 +72,66 @@ export const submitTextAnswer = async (sessionId: string, answer: string) => {
         "Content-Type": "application/json",
         ...headers,
       },
-      body: JSON.stringify({ session_id: sessionId, answer }),
+      body: JSON.stringify({
+        session_id: sessionId,
+        answer,
+        history_version: historyVersions.get(sessionId),
+        turn_index: turnIndexes.get(sessionId),
+      }),
     });
 
     if (!response.ok) {
       throw new Error("Failed to submit answer");
     }
 
-    return await response.json();
+    return rememberHistoryVersion(sessionId, await response.json());
   } catch (error) {
     console.error("Error submitting answer:", error);
     throw error;
   }
 };
 
+// Form fields of an audio answer: the recording plus the session's turn and history state
+const audioAnswerForm = (sessionId: string, audioBlob: Blob) => {
+  // Validate the audio blob
+  if (!audioBlob || audioBlob.size === 0) {
+    throw new Error("Empty audio recording");
+  }
+
+  console.log(
+    `Preparing audio: ${audioBlob.size} bytes, type: ${audioBlob.type}`
+  );
+
+  // Create a new FormData instance
+  const formData = new FormData();
+
+  // Use a more specific file name with timestamp
+  const timestamp = new Date().getTime();
+  const fileName = `recording_${timestamp}.webm`;
+
+  // Append the audio file to the form data
+  formData.append("audio", audioBlob, fileName);
+  formData.append("session_id", sessionId);
+  const historyVersion = historyVersions.get(sessionId);
+  if (historyVersion) {
+    formData.append("history_version", historyVersion);
+  }
+  const turnIndex = turnIndexes.get(sessionId);
+  if (turnIndex) {
+    formData.append("turn_index", String(turnIndex));
+  }
+
+  // Log FormData entries for debugging
+  for (const entry of formData.entries()) {
+    console.log(
+      `FormData entry - ${entry[0]}: ${typeof entry[1]} (${
+        entry[1] instanceof Blob ? `${entry[1].size} bytes` : "text"
+      })`
+    );
+  }
+  return formData;
+};
+
 // Submit an audio recording to be transcribed by Groq on the backend
 export const submitAudioAnswer = async (sessionId: string, audioBlob: Blob) => {
   try {
@@ -73,34 +139,7 @@ export const submitAudioAnswer = async (sessionId: string, audioBlob: Blob) => {
     const headers = await getAuthHeader();
     console.log("Authentication successful");
 
-    // Validate the audio blob
-    if (!audioBlob || audioBlob.size === 0) {
-      throw new Error("Empty audio recording");
-    }
-
-    console.log(
-      `Preparing audio: ${audioBlob.size} bytes, type: ${audioBlob.type}`
-    );
-
-    // Create a new FormData instance
-    const formData = new FormData();
-
-    // Use a more specific file name with timestamp
-    const timestamp = new Date().getTime();
-    const fileName = `recording_${timestamp}.webm`;
-
-    // Append the audio file to the form data
-    formData.append("audio", audioBlob, fileName);
-    formData.append("session_id", sessionId);
-
-    // Log FormData entries for debugging
-    for (const entry of formData.entries()) {
-      console.log(
-        `FormData entry - ${entry[0]}: ${typeof entry[1]} (${
-          entry[1] instanceof Blob ? `${entry[1].size} bytes` : "text"
-        })`
-      );
-    }
+    const formData = audioAnswerForm(sessionId, audioBlob);
 
     console.log("Submitting audio to server for transcription...");
     const startTime = Date.now();
@@ -124,13 +163,186 @@ export const submitAudioAnswer = async (sessionId: string, audioBlob: Blob) => {
     }
 
     console.log("Successfully processed audio response");
-    return await response.json();
+    return rememberHistoryVersion(sessionId, await response.json());
   } catch (error) {
     console.error("Error submitting audio:", error);
     throw error;
   }
 };
 
+// Evaluation of one answer, as returned by /answer. While the judge is still
+// scoring, `pending` is true and `eval_id` names the eval to poll; a pending
+// evaluation with a score carries the local scorer's provisional estimate.
+export interface Evaluation {
+  score: number | null;
+  feedback: string;
+  pending?: boolean;
+  provisional?: boolean;
+  confidence?: number;
+  eval_id?: string;
+}
+
+// Result of one answered turn: /answer's response, or /answer/stream's `turn` event
+export interface TurnResult {
+  evaluation: Evaluation;
+  code_result: unknown;
+  done: boolean;
+  next_question: string | null;
+  turn_index: number;
+  history_version?: string;
+}
+
+// Stored evaluation of one answer, as returned by /evals/<eval_id>
+export interface StoredEvaluation {
+  eval_id: string;
+  score: number | null;
+  feedback: string;
+  pending: boolean;
+}
+
+// Live events of a streamed answer (/answer/stream). Feedback and question
+// text arrive as deltas and are only a preview: the evaluation and the turn
+// result returned at the end are final.
+export interface AnswerStreamHandlers {
+  onTranscript?: (text: string) => void;
+  onScore?: (score: number) => void;
+  onFeedback?: (delta: string) => void;
+  onEvaluation?: (evaluation: Evaluation) => void;
+  onQuestion?: (delta: string) => void;
+}
+
+// Read a text/event-stream body, calling onEvent with each event's name and JSON data
+const readEventStream = async (
+  body: ReadableStream<Uint8Array>,
+  onEvent: (event: string, data: Record<string, unknown>) => void
+) => {
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) {
+      return;
+    }
+    buffer += decoder.decode(value, { stream: true }).replace(/\r\n/g, "\n");
+    let end = buffer.indexOf("\n\n");
+    while (end >= 0) {
+      const frame = buffer.slice(0, end);
+      buffer = buffer.slice(end + 2);
+      end = buffer.indexOf("\n\n");
+      let event = "message";
+      const data: string[] = [];
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event:")) {
+          event = line.slice(6).trim();
+        } else if (line.startsWith("data:")) {
+          data.push(line.slice(5).trimStart());
+        }
+      }
+      if (data.length > 0) {
+        // comment-only frames are keep-alives
+        onEvent(event, JSON.parse(data.join("\n")));
+      }
+    }
+  }
+};
+
+// Submit an audio recording to /answer/stream, reporting the transcript,
+// evaluation and next question as they are produced; resolves with the same
+// result as submitAudioAnswer once the turn is stored
+export const submitAudioAnswerStream = async (
+  sessionId: string,
+  audioBlob: Blob,
+  handlers: AnswerStreamHandlers
+) => {
+  try {
+    const headers = await getAuthHeader();
+    const formData = audioAnswerForm(sessionId, audioBlob);
+
+    const response = await fetch(`${API_BASE_URL}/api/interview/answer/stream`, {
+      method: "POST",
+      headers: {
+        ...headers,
+        Accept: "text/event-stream",
+      },
+      body: formData,
+    });
+
+    // errors before the turn starts (auth, admission, retries) are plain JSON
+    if (!response.ok || !response.body) {
+      const errorText = await response.text();
+      console.error("API error response:", errorText);
+      throw new Error(`Failed to submit audio: ${errorText}`);
+    }
+
+    const outcome: { turn?: TurnResult; error?: string } = {};
+    await readEventStream(response.body, (event, data) => {
+      switch (event) {
+        case "transcript":
+          handlers.onTranscript?.(data.text as string);
+          break;
+        case "score":
+          handlers.onScore?.(data.score as number);
+          break;
+        case "feedback":
+          handlers.onFeedback?.(data.text as string);
+          break;
+        case "evaluation":
+          handlers.onEvaluation?.(data as unknown as Evaluation);
+          break;
+        case "question":
+          handlers.onQuestion?.(data.text as string);
+          break;
+        case "turn":
+          outcome.turn = data as unknown as TurnResult;
+          break;
+        case "error":
+          outcome.error = (data.error as string) || "Failed to process answer";
+          break;
+      }
+    });
+
+    if (outcome.error) {
+      throw new Error(outcome.error);
+    }
+    if (!outcome.turn) {
+      throw new Error("The answer stream ended before the turn was stored");
+    }
+    return rememberHistoryVersion(sessionId, outcome.turn);
+  } catch (error) {
+    console.error("Error streaming audio answer:", error);
+    throw error;
+  }
+};
+
+// Get one of the user's evaluations (e.g. a pending one); null if it doesn't exist
+export const getEvaluation = async (
+  evalId: string
+): Promise<StoredEvaluation | null> => {
+  try {
+    const headers = await getAuthHeader();
+
+    const response = await fetch(`${API_BASE_URL}/api/interview/evals/${evalId}`, {
+      method: "GET",
+      headers: {
+        ...headers,
+      },
+    });
+
+    if (response.status === 404) {
+      return null;
+    }
+    if (!response.ok) {
+      throw new Error("Failed to get evaluation");
+    }
+
+    return await response.json();
+  } catch (error) {
+    console.error("Error getting evaluation:", error);
+    throw error;
+  }
+};
+
 // Get interview summary
 export const getInterviewSummary = async (sessionId: string) => {
   try {